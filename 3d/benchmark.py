@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Throughput benchmark for the conversion stages on synthetic data.
+
+Generated once per run into --workdir (same ground-truth people for every file):
+  results_bench.json   RTMPose3D results ({"meta_info", "instance_info"}), input of convert_4bot
+  bench_botsort.txt    MOT txt (frame,id,x,y,w,h,score,-1,-1,-1) with box jitter and dropouts
+  bench_convert.json   convert_4bot keypoint JSON, input of json_plus_track
+  bench_tracked.json   tracked keypoint JSON (track_id per instance), input of json2_shiftgcn
+
+Every stage runs in a fresh (spawned) process, so its peak RSS is its own:
+  convert, convert_stream, convert_store   convert_4bot.convert (per-frame / --stream / --format store)
+  track_greedy, track_hungarian, track_batched   json_plus_track.assign_track_ids
+  skeleton_lines                           json2_shiftgcn.convert_frames_to_lines
+  skeleton_write                           PoseSequence.from_frames + skeleton_chunks (json2_shiftgcn / pipeline)
+  tensor                                   PoseSequence.from_frames + to_tensor (json2_shiftgcn --export-tensor)
+
+Each stage reports the best of --repeat runs: seconds, frames/s, peak RSS (MB, whole
+process incl. inputs) and output bytes. Results go to --out as JSON; --compare OLD.json
+prints the speed-up against an earlier run. More stages: register_stage(name, fn), where
+fn(workdir, params) -> (seconds, output_bytes).
+
+Usage
+-----
+python benchmark.py --frames 5000 --people 4 --joints 17 --out bench.json
+python benchmark.py --frames 5000 --stages convert,track_batched --compare bench.json
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+Params = Dict[str, Any]
+StageFn = Callable[[str, Params], Tuple[float, Optional[int]]]
+
+# ---------- 합성 데이터 ----------
+def synth_people(frames: int, people: int, joints: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """
+    사람별로 화면을 가로지르는 궤적 + 고정 포즈에 노이즈.
+    반환: present (F,P) bool, bboxes (F,P,4) xyxy, keypoints (F,P,V,3), scores (F,P,V)
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames)[:, None]
+    x0 = rng.uniform(0, 1500, people)
+    y0 = rng.uniform(100, 600, people)
+    vx = rng.uniform(-4, 4, people)
+    w = rng.uniform(40, 120, people)
+    h = rng.uniform(120, 300, people)
+    cx = (x0 + vx * t) % 1800 + 60
+    cy = y0 + 5 * np.sin(t / 15.0 + np.arange(people))
+    bboxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=-1)
+    base = rng.normal(scale=0.3, size=(people, joints, 3))
+    keypoints = base[None] + rng.normal(scale=0.01, size=(frames, people, joints, 3))
+    scores = rng.uniform(0.3, 1.0, size=(frames, people, joints))
+    present = rng.random((frames, people)) < 0.95
+    return {"present": present, "bboxes": bboxes, "keypoints": keypoints, "scores": scores}
+
+def write_results_json(path: str, s: Dict[str, np.ndarray]) -> None:
+    """convert_4bot 입력 (bbox 는 RTMPose3D 처럼 한 겹 더 감싼 [[x1,y1,x2,y2]])"""
+    info = []
+    F, P = s["present"].shape
+    for f in range(F):
+        insts = []
+        for p in np.flatnonzero(s["present"][f]).tolist():
+            insts.append({"keypoints": s["keypoints"][f, p].round(5).tolist(),
+                          "keypoint_scores": s["scores"][f, p].round(4).tolist(),
+                          "bbox": [s["bboxes"][f, p].round(2).tolist()],
+                          "bbox_score": 0.9})
+        info.append({"frame_id": f + 1, "instances": insts})
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"meta_info": {"dataset_name": "synthetic"}, "instance_info": info}, fh)
+
+def write_mot_txt(path: str, s: Dict[str, np.ndarray], seed: int = 0) -> None:
+    rng = np.random.default_rng(seed + 1)
+    F, P = s["present"].shape
+    keep = s["present"] & (rng.random((F, P)) < 0.9)
+    f_idx, p_idx = np.nonzero(keep)
+    b = s["bboxes"][f_idx, p_idx] + rng.uniform(-5, 5, size=(len(f_idx), 4))
+    rows = np.column_stack([f_idx + 1, p_idx + 1, b[:, 0], b[:, 1], b[:, 2] - b[:, 0], b[:, 3] - b[:, 1],
+                            np.full(len(f_idx), 0.9), -np.ones((len(f_idx), 3))])
+    np.savetxt(path, rows, fmt=["%d", "%d", "%.2f", "%.2f", "%.2f", "%.2f", "%.2f", "%d", "%d", "%d"], delimiter=",")
+
+def kp_frames(s: Dict[str, np.ndarray], with_track_ids: bool = False) -> List[Dict[str, Any]]:
+    frames = []
+    F, P = s["present"].shape
+    for f in range(F):
+        insts = []
+        for p in np.flatnonzero(s["present"][f]).tolist():
+            inst = {"bbox": s["bboxes"][f, p].round(2).tolist(), "score": 0.9,
+                    "keypoints": s["keypoints"][f, p].round(5).tolist(),
+                    "keypoint_scores": s["scores"][f, p].round(4).tolist()}
+            if with_track_ids:
+                inst["track_id"] = p + 1
+            insts.append(inst)
+        frames.append({"frame_id": f + 1, "instances": insts})
+    return frames
+
+def generate(workdir: str, frames: int, people: int, joints: int, seed: int) -> Dict[str, str]:
+    os.makedirs(workdir, exist_ok=True)
+    s = synth_people(frames, people, joints, seed)
+    paths = {"results": os.path.join(workdir, "results_bench.json"),
+             "mot": os.path.join(workdir, "bench_botsort.txt"),
+             "convert": os.path.join(workdir, "bench_convert.json"),
+             "tracked": os.path.join(workdir, "bench_tracked.json")}
+    write_results_json(paths["results"], s)
+    write_mot_txt(paths["mot"], s, seed)
+    for key, tracked in (("convert", False), ("tracked", True)):
+        with open(paths[key], "w", encoding="utf-8") as fh:
+            json.dump(kp_frames(s, with_track_ids=tracked), fh)
+    return paths
+
+# ---------- 단계 ----------
+STAGES: Dict[str, StageFn] = {}
+
+def register_stage(name: str, fn: StageFn) -> None:
+    STAGES[name] = fn
+
+def path_bytes(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(e.stat().st_size for e in Path(path).rglob("*") if e.is_file())
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+def _convert_stage(stream: bool, out_format: str) -> StageFn:
+    def _run(workdir: str, params: Params) -> Tuple[float, Optional[int]]:
+        from convert_4bot import convert
+        out = tempfile.mkdtemp(dir=workdir, prefix="convert_")
+        outputs = {"out_json_path": os.path.join(out, "bench_4bot.json"),
+                   "out_json_kps_path": os.path.join(out, "bench_kps.json"),
+                   "out_npy_dir": os.path.join(out, "botsort_dets_npy"),
+                   "out_npz_dir": os.path.join(out, "dets_kps_npz"),
+                   "out_store_dir": os.path.join(out, "dets_kps_store")}
+        t0 = time.perf_counter()
+        convert(os.path.join(workdir, "results_bench.json"), stream=stream, out_format=out_format, **outputs)
+        secs = time.perf_counter() - t0
+        nbytes = sum(path_bytes(p) for p in outputs.values())
+        shutil.rmtree(out)
+        return secs, nbytes
+    return _run
+
+def _track_stage(matcher: str) -> StageFn:
+    def _run(workdir: str, params: Params) -> Tuple[float, Optional[int]]:
+        from json_plus_track import assign_track_ids, load_botsort_array
+        with open(os.path.join(workdir, "bench_convert.json"), "r", encoding="utf-8") as fh:
+            frames = json.load(fh)
+        t0 = time.perf_counter()
+        assign_track_ids(frames, load_botsort_array(os.path.join(workdir, "bench_botsort.txt")),
+                         min_iou=0.05, use_center_fallback=True, matcher=matcher)
+        return time.perf_counter() - t0, None
+    return _run
+
+def _load_tracked(workdir: str) -> List[Dict[str, Any]]:
+    with open(os.path.join(workdir, "bench_tracked.json"), "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+def _skeleton_lines(workdir: str, params: Params) -> Tuple[float, Optional[int]]:
+    from json2_shiftgcn import convert_frames_to_lines
+    frames = _load_tracked(workdir)
+    t0 = time.perf_counter()
+    lines = convert_frames_to_lines(frames, params["joints"])
+    secs = time.perf_counter() - t0
+    return secs, sum(len(line) + 1 for line in lines)
+
+def _skeleton_write(workdir: str, params: Params) -> Tuple[float, Optional[int]]:
+    from json2_shiftgcn import write_skeleton_chunks
+    from pose_sequence import PoseSequence
+    frames = _load_tracked(workdir)
+    out = os.path.join(workdir, "bench.skeleton")
+    t0 = time.perf_counter()
+    seq = PoseSequence.from_frames(frames, dtype=np.float64)
+    write_skeleton_chunks(seq.skeleton_chunks(params["joints"]), Path(out))
+    secs = time.perf_counter() - t0
+    nbytes = path_bytes(out)
+    os.remove(out)
+    return secs, nbytes
+
+def _tensor(workdir: str, params: Params) -> Tuple[float, Optional[int]]:
+    from pose_sequence import PoseSequence
+    frames = _load_tracked(workdir)
+    t0 = time.perf_counter()
+    seq = PoseSequence.from_frames(frames, dtype=np.float64)
+    data = seq.to_tensor(params["joints"], max_frames=len(frames), max_bodies=2)
+    return time.perf_counter() - t0, data.nbytes
+
+register_stage("convert", _convert_stage(stream=False, out_format="per-frame"))
+register_stage("convert_stream", _convert_stage(stream=True, out_format="per-frame"))
+register_stage("convert_store", _convert_stage(stream=True, out_format="store"))
+register_stage("track_greedy", _track_stage("greedy"))
+register_stage("track_hungarian", _track_stage("hungarian"))
+register_stage("track_batched", _track_stage("batched"))
+register_stage("skeleton_lines", _skeleton_lines)
+register_stage("skeleton_write", _skeleton_write)
+register_stage("tensor", _tensor)
+
+# ---------- 측정 ----------
+def _maxrss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / 1024.0   # macOS 는 bytes, Linux 는 KB
+
+def _run_in_child(name: str, workdir: str, params: Params) -> Dict[str, Any]:
+    """spawn 된 자식 프로세스에서 실행 (이전 단계의 메모리가 섞이지 않게)"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    secs, nbytes = STAGES[name](workdir, params)
+    return {"seconds": secs, "output_bytes": nbytes, "peak_rss_mb": _maxrss_mb()}
+
+def run_stage(name: str, workdir: str, params: Params, repeat: int = 1) -> Dict[str, Any]:
+    runs = []
+    ctx = mp.get_context("spawn")
+    for _ in range(max(1, repeat)):
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ex:
+            runs.append(ex.submit(_run_in_child, name, workdir, params).result())
+    best = min(runs, key=lambda r: r["seconds"])
+    secs = best["seconds"]
+    return {"seconds": round(secs, 4),
+            "frames_per_sec": round(params["frames"] / secs, 1) if secs > 0 else None,
+            "peak_rss_mb": round(max(r["peak_rss_mb"] for r in runs), 1),
+            "output_bytes": best["output_bytes"],
+            "runs": [round(r["seconds"], 4) for r in runs]}
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    lines = [f"{'stage':<18}{'old s':>10}{'new s':>10}{'speed-up':>10}{'old MB':>10}{'new MB':>10}"]
+    for name, r in new["stages"].items():
+        o = old.get("stages", {}).get(name)
+        if o is None:
+            lines.append(f"{name:<18}{'-':>10}{r['seconds']:>10.3f}{'-':>10}{'-':>10}{r['peak_rss_mb']:>10.1f}")
+            continue
+        speed = o["seconds"] / r["seconds"] if r["seconds"] > 0 else float("inf")
+        lines.append(f"{name:<18}{o['seconds']:>10.3f}{r['seconds']:>10.3f}{speed:>9.2f}x"
+                     f"{o['peak_rss_mb']:>10.1f}{r['peak_rss_mb']:>10.1f}")
+    return lines
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark convert / track / skeleton stages on synthetic data.")
+    ap.add_argument("--frames", type=int, default=3000, help="Frames per synthetic video")
+    ap.add_argument("--people", type=int, default=4, help="People per frame")
+    ap.add_argument("--joints", type=int, default=17, help="Joints per person")
+    ap.add_argument("--seed", type=int, default=0, help="Random seed")
+    ap.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated stages ({', '.join(STAGES)})")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per stage (best time is reported)")
+    ap.add_argument("--workdir", default=None, help="Where synthetic inputs are written (default: temp dir, removed)")
+    ap.add_argument("--out", default=None, help="Write results JSON here")
+    ap.add_argument("--compare", default=None, help="Earlier results JSON to compare against")
+    args = ap.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        print(f"[ERROR] Unknown stage(s): {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(1)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench_")
+    params = {"frames": args.frames, "people": args.people, "joints": args.joints, "seed": args.seed}
+    try:
+        t0 = time.perf_counter()
+        paths = generate(workdir, args.frames, args.people, args.joints, args.seed)
+        print(f">>> synthetic data in {workdir} ({time.perf_counter() - t0:.1f}s): "
+              + ", ".join(f"{os.path.basename(p)} {path_bytes(p) / 1e6:.1f} MB" for p in paths.values()))
+
+        results = {}
+        for name in stages:
+            r = run_stage(name, workdir, params, args.repeat)
+            results[name] = r
+            out_mb = "-" if r["output_bytes"] is None else f"{r['output_bytes'] / 1e6:.1f} MB"
+            print(f"[OK] {name:<16} {r['seconds']:8.3f}s {r['frames_per_sec']:>10} frames/s "
+                  f"peak {r['peak_rss_mb']:7.1f} MB out {out_mb}")
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {"git_commit": _git_commit(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "python": platform.python_version(), "numpy": np.__version__,
+                 "platform": platform.platform(), "cpu_count": os.cpu_count(), "repeat": args.repeat, **params},
+        "stages": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"[OK] {args.out}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            print("\n".join(compare(json.load(fh), report)))
+
+if __name__ == "__main__":
+    main()
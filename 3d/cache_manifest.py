@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache manifest for incremental re-runs of convert_4bot / json_plus_track / json2_shiftgcn.
+
+A manifest is a JSON file kept next to the outputs (MANIFEST_NAME in the output folder):
+
+  {"version": 1,
+   "entries": {
+     "<tool>:<key>": {
+       "inputs":  [{"path": str, "size": int, "mtime_ns": int, "sha256": str}, ...],
+       "options": {...},          # every option that changes the output
+       "outputs": [str, ...]      # files/dirs produced; all must still exist
+     }, ...}}
+
+An entry is fresh when the options are identical, every output exists and every input
+has the recorded size and content. The hash is only recomputed when size matches but
+mtime changed (e.g. the file was copied or touched), so the common check is a stat().
+
+    manifest = CacheManifest.for_dir(out_dir)
+    if not manifest.is_fresh(key, [in_path], options):
+        ... do the work ...
+        manifest.record(key, [fingerprint(in_path)], options, [out_path])
+        manifest.save()
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+MANIFEST_NAME = ".cache_manifest.json"
+_VERSION = 1
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def fingerprint(path: str) -> Dict[str, Any]:
+    """입력 파일의 (절대경로, 크기, mtime, 내용 해시)"""
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns, "sha256": file_sha256(path)}
+
+def _normalize(options: Dict[str, Any]) -> Dict[str, Any]:
+    """tuple/Path 등을 JSON 표현으로 맞춰 비교 가능하게 한다."""
+    return json.loads(json.dumps(options, sort_keys=True, default=str))
+
+class CacheManifest:
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        if os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == _VERSION:
+                    self.entries = data.get("entries", {})
+            except (OSError, ValueError):
+                self.entries = {}  # 깨진 manifest 는 무시하고 새로 만든다
+
+    @classmethod
+    def for_dir(cls, out_dir: str) -> "CacheManifest":
+        return cls(os.path.join(out_dir or ".", MANIFEST_NAME))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(key)
+
+    def is_fresh(self, key: str, inputs: List[str], options: Dict[str, Any]) -> bool:
+        entry = self.entries.get(key)
+        if entry is None or entry.get("options") != _normalize(options):
+            return False
+        if not all(os.path.exists(p) for p in entry.get("outputs", [])):
+            return False
+        recorded = {fp["path"]: fp for fp in entry.get("inputs", [])}
+        if sorted(recorded) != sorted(os.path.abspath(p) for p in inputs):
+            return False
+        for fp in recorded.values():
+            try:
+                st = os.stat(fp["path"])
+            except OSError:
+                return False
+            if st.st_size != fp["size"]:
+                return False
+            if st.st_mtime_ns != fp["mtime_ns"]:
+                if file_sha256(fp["path"]) != fp["sha256"]:
+                    return False
+                fp["mtime_ns"] = st.st_mtime_ns  # 내용은 같음 → 다음엔 stat 만으로 판정
+                self.dirty = True
+        return True
+
+    def record(self, key: str, input_fingerprints: List[Dict[str, Any]],
+               options: Dict[str, Any], outputs: List[str]) -> None:
+        self.entries[key] = {
+            "inputs": input_fingerprints,
+            "options": _normalize(options),
+            "outputs": [os.path.abspath(p) for p in outputs],
+        }
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": _VERSION, "entries": self.entries}, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self.dirty = False
@@ -17,6 +17,9 @@ Outputs
                               - bboxes_xyxy5: (N,5)
                               - keypoints_xyz: (N,K,3)  (K can vary per file; we pad with NaNs to max-K in the frame)
                               - keypoint_scores: (N,K)  (NaN padded if lengths differ)
+- <out_store_dir>/            (--format store|both) the whole video as a few contiguous .npy arrays
+                              (bboxes_xyxy5, keypoints_xyz, keypoint_scores, frame_ids, frame_offsets);
+                              open with kps_store.open_store() / np.load(mmap_mode='r')
 
 Usage
 -----
@@ -25,7 +28,16 @@ python convert_json_with_kps.py --input results_output_*.json \
        --out-npy-dir botsort_dets_npy \
        --out-json-kps dets_with_all_keypoints.json \
        --out-npz-dir dets_kps_npz \
-       --min-score 0.0
+       --min-score 0.0 [--stream] [--format store --out-store-dir dets_kps_store] [--track] [--pretty]
+
+--stream parses instance_info incrementally and writes every output as soon as a
+frame is decoded, so peak memory is bounded by one frame instead of the whole video.
+instance_info must then be in frame_id order (as RTMPose3D writes it); otherwise the
+run fails instead of writing frames in a different order than without --stream.
+--track assigns "track_id" to every instance with the built-in online tracker
+(online_tracker.py), so no separate BoT-SORT + json_plus_track pass is needed.
+JSON goes through fastjson (orjson / msgspec when installed, stdlib otherwise); the JSON
+outputs are compact unless --pretty asks for the previous indent=2 layout.
 """
 
 import argparse
@@ -33,7 +45,15 @@ import json
 import os
 from collections import defaultdict
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import fastjson
+import instrument
+from cache_manifest import CacheManifest, fingerprint
+from kps_store import StoreWriter
+from online_tracker import OnlineTracker, track_instances
+
+OUT_FORMATS = ("per-frame", "store", "both")
 
 def extract_xyxy_from_bbox(bbox_field):
     """
@@ -71,101 +91,354 @@ def pad_sequences(arrs: List[np.ndarray], pad_value: float = np.nan) -> np.ndarr
         out[i, :k, :a.shape[1]] = a.astype(np.float32)
     return out
 
+# ---------- 프레임 단위 파싱 ----------
+def parse_frame_entry(frame_entry: Dict[str, Any],
+                      min_score: float = 0.0) -> Tuple[int, List[List[float]], List[Dict[str, Any]]]:
+    """
+    instance_info 의 한 항목을 (frame_id, xyxy5 리스트, instances 리스트)로 변환.
+    frame_id가 없거나 음수이면 frame_id=-1 과 빈 리스트를 반환한다.
+    """
+    xyxy5: List[List[float]] = []
+    instances_out: List[Dict[str, Any]] = []
+
+    frame_id = int(frame_entry.get("frame_id", -1))
+    if frame_id < 0:
+        return -1, xyxy5, instances_out
+
+    instances = frame_entry.get("instances", [])
+    for inst in instances:
+        bbox_xyxy = extract_xyxy_from_bbox(inst.get("bbox"))
+        if bbox_xyxy is None:
+            continue
+
+        score = inst.get("bbox_score", inst.get("score", None))
+        if score is None:
+            score = 1.0
+        score = float(score)
+        if score < min_score:
+            continue
+
+        # bbox + score (BoT-SORT)
+        x1, y1, x2, y2 = bbox_xyxy
+        xyxy5.append([x1, y1, x2, y2, score])
+
+        # full keypoints (모든 인스턴스 보존)
+        kps = inst.get("keypoints", []) or []
+        kps_scores = inst.get("keypoint_scores", []) or []
+        instances_out.append({
+            "bbox": [x1, y1, x2, y2],
+            "score": score,
+            "keypoints": kps,
+            "keypoint_scores": kps_scores
+        })
+    return frame_id, xyxy5, instances_out
+
+class _InstanceInfoScanner:
+    """
+    results_*.json 을 chunk 단위로 읽으면서 최상위 "instance_info" 배열의
+    원소(프레임)를 하나씩 디코딩하는 증분 디코더.
+    버퍼에는 아직 소비하지 않은 텍스트만 남기므로 메모리는 한 프레임 크기로 제한된다.
+    """
+    _WS = " \t\n\r"
+
+    def __init__(self, f, chunk_size: int = 1 << 20):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> None:
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def _peek(self) -> str:
+        """공백을 건너뛰고 다음 문자를 반환(EOF면 빈 문자열)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in self._WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ""
+            self._fill()
+
+    def _expect(self, ch: str) -> None:
+        got = self._peek()
+        if got != ch:
+            raise ValueError(f"Malformed JSON: expected {ch!r}, got {got!r}")
+        self.pos += 1
+
+    def _decode_value(self) -> Any:
+        while True:
+            self._peek()
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()  # 값이 chunk 경계에서 잘림 → 더 읽고 재시도
+                continue
+            # 숫자는 버퍼 끝에서 잘려도 디코딩된다 ("12|3", "1|.5", "1.5e|+3") → 끝 2글자 안이면 더 읽는다
+            if end + 2 >= len(self.buf) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return obj
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self._expect("{")
+        while True:
+            ch = self._peek()
+            if ch == "}":
+                return
+            if ch == ",":
+                self.pos += 1
+                continue
+            key = self._decode_value()
+            self._expect(":")
+            if key != "instance_info":
+                self._decode_value()  # meta_info 등 다른 키는 건너뜀
+                continue
+            self._expect("[")
+            while True:
+                ch = self._peek()
+                if ch == "]":
+                    self.pos += 1
+                    break
+                if ch == ",":
+                    self.pos += 1
+                    continue
+                yield self._decode_value()
+
+def iter_instance_info(input_json_path: str, chunk_size: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+    """results_*.json 의 instance_info 항목을 파일 전체를 올리지 않고 순서대로 yield."""
+    with open(input_json_path, "r", encoding="utf-8") as f:
+        yield from _InstanceInfoScanner(f, chunk_size)
+
+def iter_frames(input_json_path: str,
+                min_score: float = 0.0,
+                stream: bool = False) -> Iterator[Tuple[int, List[List[float]], List[Dict[str, Any]]]]:
+    """
+    유효 인스턴스가 있는 프레임을 (frame_id, xyxy5, instances)로 yield.
+    - stream=False: 전체 로드 후 frame_id 기준 정렬/병합 (기존 동작)
+    - stream=True : 입력 순서대로 한 프레임씩 처리. RTMPose3D 출력은 frame_id 오름차순이므로
+                    연속된 동일 frame_id 항목만 병합한다. 유효 프레임의 frame_id 가 줄어들면
+                    (정렬되지 않은 입력) 출력이 stream=False 와 달라지므로 ValueError.
+    """
+    if not stream:
+        # 1) JSON 로드
+        with instrument.stage("parse"):
+            data = fastjson.load_results(input_json_path)
+
+        # 2) 프레임별 누적
+        per_frame_xyxy5: Dict[int, List[List[float]]] = defaultdict(list)
+        per_frame_instances: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        with instrument.stage("filter"):
+            for frame_entry in data.get("instance_info", []):
+                fid, xyxy5, insts = parse_frame_entry(frame_entry, min_score)
+                instrument.count("instances_in", len(frame_entry.get("instances", [])))
+                if fid < 0 or not xyxy5:
+                    continue
+                per_frame_xyxy5[fid].extend(xyxy5)
+                per_frame_instances[fid].extend(insts)
+        del data
+
+        # 3) 정렬
+        for fid in sorted(per_frame_xyxy5.keys()):
+            yield fid, per_frame_xyxy5[fid], per_frame_instances[fid]
+        return
+
+    cur_fid, cur_xyxy5, cur_insts = -1, [], []
+    for frame_entry in instrument.timed_iter("parse", iter_instance_info(input_json_path)):
+        with instrument.stage("filter"):
+            fid, xyxy5, insts = parse_frame_entry(frame_entry, min_score)
+        instrument.count("instances_in", len(frame_entry.get("instances", [])))
+        if fid < 0 or not xyxy5:
+            continue
+        if fid == cur_fid:
+            cur_xyxy5.extend(xyxy5)
+            cur_insts.extend(insts)
+            continue
+        if fid < cur_fid:   # 이미 내보낸 프레임과 겹칠 수 있다 (per-frame 파일 덮어쓰기)
+            raise ValueError(f"instance_info is not sorted by frame_id (frame {fid} after {cur_fid}); "
+                             "run without --stream")
+        if cur_xyxy5:
+            yield cur_fid, cur_xyxy5, cur_insts
+        cur_fid, cur_xyxy5, cur_insts = fid, xyxy5, insts
+    if cur_xyxy5:
+        yield cur_fid, cur_xyxy5, cur_insts
+
+def instance_arrays(insts: List[Dict[str, Any]]) -> Tuple[np.ndarray, List[np.ndarray], List[np.ndarray]]:
+    """
+    instances -> bboxes_xyxy5 (N,5), keypoints [(K_i,3), ...], keypoint_scores [(K_i,), ...]
+    """
+    bboxes = np.array([i["bbox"] + [i["score"]] for i in insts], dtype=np.float32).reshape(-1, 5)  # (N,5)
+    kps_list = [np.array(i["keypoints"], dtype=np.float32) if i["keypoints"] else np.zeros((0,3), dtype=np.float32) for i in insts]
+    kps_scores_list = [np.array(i["keypoint_scores"], dtype=np.float32) if i["keypoint_scores"] else np.zeros((0,), dtype=np.float32) for i in insts]
+    return bboxes, kps_list, kps_scores_list
+
+def frame_to_arrays(xyxy5: List[List[float]],
+                    insts: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    한 프레임을 NPY/NPZ 저장용 배열로 변환.
+    반환: dets (N,5), bboxes_xyxy5 (N,5), keypoints_xyz (N,K,3), keypoint_scores (N,K)
+    """
+    dets = np.array(xyxy5, dtype=np.float32) if xyxy5 else np.zeros((0, 5), dtype=np.float32)
+    if insts:
+        bboxes, kps_list, kps_scores_list = instance_arrays(insts)
+        kps_pad = pad_sequences(kps_list, pad_value=np.nan)                  # (N,K,3)
+        kps_scores_pad = pad_sequences([s.reshape(-1,1) for s in kps_scores_list], pad_value=np.nan)[:,:,0]  # (N,K)
+    else:
+        bboxes = np.zeros((0,5), dtype=np.float32)
+        kps_pad = np.zeros((0,0,3), dtype=np.float32)
+        kps_scores_pad = np.zeros((0,0), dtype=np.float32)
+    return dets, bboxes, kps_pad, kps_scores_pad
+
+class JsonArrayWriter:
+    """
+    리스트 원소를 하나씩 받아 fastjson.dump(list, indent) 와 동일한 텍스트를 점진적으로 기록.
+    indent=None 이면 compact, 2 이면 기존 json.dump(indent=2) 배치.
+    <path>.tmp 에 쓰고 정상 종료 시에만 <path> 로 교체한다(실패 시 반쪽 파일을 남기지 않음).
+    """
+    def __init__(self, path: str, indent: Optional[int] = None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.f = open(self.tmp_path, "wb")
+        self.count = 0
+        self.indent = indent
+        self._pad = b"\n" + b" " * indent if indent else b""   # 원소 앞 줄바꿈 + 들여쓰기
+
+    def write(self, obj: Any) -> None:
+        with instrument.stage("serialize"):
+            body = fastjson.dumps(obj, self.indent)
+            if self.indent:
+                body = body.replace(b"\n", self._pad)
+        with instrument.stage("write"):
+            self.f.write((b"[" if self.count == 0 else b",") + self._pad + body)
+        self.count += 1
+
+    def close(self) -> None:
+        self.f.write((b"\n]" if self.indent else b"]") if self.count else b"[]")
+        self.f.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        self.f.close()
+        os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
 def convert(input_json_path: str,
             out_json_path: str,
             out_npy_dir: str,
             out_json_kps_path: str,
             out_npz_dir: str,
-            min_score: float = 0.0) -> int:
+            min_score: float = 0.0,
+            stream: bool = False,
+            out_format: str = "per-frame",
+            out_store_dir: str = "dets_kps_store",
+            track: bool = False,
+            json_indent: Optional[int] = None) -> int:
     """
     results_output_*.json ->
       - BoT-SORT 입력 형식(JSON/NPY)
       - 전체 keypoints 포함 JSON/NPZ
+    stream=True 이면 instance_info를 프레임 단위로 읽어 바로 기록한다(피크 메모리 ≈ 한 프레임).
+    out_format:
+      - "per-frame": 프레임마다 .npy/.npz (기존)
+      - "store"    : 비디오당 하나의 스토어 디렉터리(kps_store 참고, mmap 으로 프레임 슬라이스)
+      - "both"     : 둘 다
+    track=True 이면 내장 온라인 트래커(online_tracker)로 변환 중에 instance마다 track_id를 부착한다
+    (keypoint JSON 과 스토어의 track_ids 에 기록; 외부 BoT-SORT 불필요).
+    json_indent: None 이면 compact JSON, 2 면 기존 indent=2 배치
     반환값: 유효 프레임 수
     """
-    # 1) JSON 로드
-    with open(input_json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    if out_format not in OUT_FORMATS:
+        raise ValueError(f"out_format must be one of {OUT_FORMATS}, got {out_format!r}")
+    per_frame = out_format in ("per-frame", "both")
+    store = StoreWriter(out_store_dir, with_track_ids=track) if out_format in ("store", "both") else None
+    tracker = OnlineTracker() if track else None
+    if per_frame:
+        os.makedirs(out_npy_dir, exist_ok=True)
+        os.makedirs(out_npz_dir, exist_ok=True)
 
-    # 2) 프레임별 누적
-    per_frame_xyxy5: Dict[int, List[List[float]]] = defaultdict(list)
-    per_frame_instances: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    nframes = 0
+    try:
+        with JsonArrayWriter(out_json_path, json_indent) as bbox_writer, \
+             JsonArrayWriter(out_json_kps_path, json_indent) as kps_writer:
+            for fid, xyxy5, insts in iter_frames(input_json_path, min_score, stream=stream):
+                instrument.count("frames")
+                instrument.count("instances", len(insts))
+                if tracker is not None:
+                    with instrument.stage("match"):
+                        track_instances(tracker, fid, insts)
 
-    inst_list = data.get("instance_info", [])
+                # 4) JSON 내보내기
+                bbox_writer.write({"frame_id": fid, "dets_xyxy5": xyxy5})
+                kps_writer.write({"frame_id": fid, "instances": insts})
 
-    for frame_entry in inst_list:
-        frame_id = int(frame_entry.get("frame_id", -1))
-        if frame_id < 0:
-            continue
+                # 5) NPY/NPZ 저장
+                if per_frame:
+                    with instrument.stage("serialize"):
+                        dets, bboxes, kps_pad, kps_scores_pad = frame_to_arrays(xyxy5, insts)
+                    with instrument.stage("write"):
+                        np.save(os.path.join(out_npy_dir, f"{fid:06d}.npy"), dets)
+                        np.savez_compressed(os.path.join(out_npz_dir, f"{fid:06d}.npz"),
+                                            bboxes_xyxy5=bboxes,
+                                            keypoints_xyz=kps_pad,
+                                            keypoint_scores=kps_scores_pad)
+                if store is not None:
+                    with instrument.stage("serialize"):
+                        arrays = instance_arrays(insts)
+                    with instrument.stage("write"):
+                        store.add_frame(fid, *arrays, track_ids=[i["track_id"] for i in insts] if track else None)
+                nframes += 1
 
-        instances = frame_entry.get("instances", [])
-        for inst in instances:
-            bbox_xyxy = extract_xyxy_from_bbox(inst.get("bbox"))
-            if bbox_xyxy is None:
-                continue
+        if store is not None:
+            with instrument.stage("write"):
+                store.close()
+    except BaseException:
+        if store is not None:
+            store.abort()   # JsonArrayWriter 와 같이 실패 시 반쪽 출력을 남기지 않는다
+        raise
+    return nframes
 
-            score = inst.get("bbox_score", inst.get("score", None))
-            if score is None:
-                score = 1.0
-            score = float(score)
-            if score < min_score:
-                continue
-
-            # bbox + score (BoT-SORT)
-            x1, y1, x2, y2 = bbox_xyxy
-            per_frame_xyxy5[frame_id].append([x1, y1, x2, y2, score])
-
-            # full keypoints (모든 인스턴스 보존)
-            kps = inst.get("keypoints", []) or []
-            kps_scores = inst.get("keypoint_scores", []) or []
-            per_frame_instances[frame_id].append({
-                "bbox": [x1, y1, x2, y2],
-                "score": score,
-                "keypoints": kps,
-                "keypoint_scores": kps_scores
-            })
-
-    # 3) 정렬
-    frames_sorted_ids = sorted(set(list(per_frame_xyxy5.keys()) + list(per_frame_instances.keys())))
-    frames_xyxy_export = [{"frame_id": fid, "dets_xyxy5": per_frame_xyxy5.get(fid, [])} for fid in frames_sorted_ids]
-    frames_kps_export = [{"frame_id": fid, "instances": per_frame_instances.get(fid, [])} for fid in frames_sorted_ids]
-
-    # 4) JSON 내보내기
-    os.makedirs(os.path.dirname(out_json_path) or ".", exist_ok=True)
-    with open(out_json_path, "w", encoding="utf-8") as f:
-        json.dump(frames_xyxy_export, f, indent=2, ensure_ascii=False)
-
-    os.makedirs(os.path.dirname(out_json_kps_path) or ".", exist_ok=True)
-    with open(out_json_kps_path, "w", encoding="utf-8") as f:
-        json.dump(frames_kps_export, f, indent=2, ensure_ascii=False)
-
-    # 5) NPY/NPZ 저장
-    os.makedirs(out_npy_dir, exist_ok=True)
-    os.makedirs(out_npz_dir, exist_ok=True)
-
-    for fid in frames_sorted_ids:
-        dets = np.array(per_frame_xyxy5.get(fid, []), dtype=np.float32) if per_frame_xyxy5.get(fid) else np.zeros((0, 5), dtype=np.float32)
-        np.save(os.path.join(out_npy_dir, f"{fid:06d}.npy"), dets)
-
-        # Build NPZ with keypoints
-        insts = per_frame_instances.get(fid, [])
-        if insts:
-            bboxes = np.array([i["bbox"] + [i["score"]] for i in insts], dtype=np.float32)  # (N,5)
-            kps_list = [np.array(i["keypoints"], dtype=np.float32) if i["keypoints"] else np.zeros((0,3), dtype=np.float32) for i in insts]
-            kps_scores_list = [np.array(i["keypoint_scores"], dtype=np.float32) if i["keypoint_scores"] else np.zeros((0,), dtype=np.float32) for i in insts]
-            kps_pad = pad_sequences(kps_list, pad_value=np.nan)                  # (N,K,3)
-            kps_scores_pad = pad_sequences([s.reshape(-1,1) for s in kps_scores_list], pad_value=np.nan)[:,:,0]  # (N,K)
-        else:
-            bboxes = np.zeros((0,5), dtype=np.float32)
-            kps_pad = np.zeros((0,0,3), dtype=np.float32)
-            kps_scores_pad = np.zeros((0,0), dtype=np.float32)
-
-        np.savez_compressed(os.path.join(out_npz_dir, f"{fid:06d}.npz"),
-                            bboxes_xyxy5=bboxes,
-                            keypoints_xyz=kps_pad,
-                            keypoint_scores=kps_scores_pad)
-
-    return len(frames_sorted_ids)
+def cache_entry(input_json_path: str,
+                out_json_path: str,
+                out_npy_dir: str,
+                out_json_kps_path: str,
+                out_npz_dir: str,
+                min_score: float = 0.0,
+                stream: bool = False,
+                out_format: str = "per-frame",
+                out_store_dir: str = "dets_kps_store",
+                track: bool = False,
+                json_indent: Optional[int] = None) -> Tuple[str, Dict[str, Any], List[str]]:
+    """
+    convert() 와 같은 인자로 cache manifest 의 (key, options, outputs) 를 만든다.
+    stream 은 출력에 영향이 없으므로 options 에서 제외 (정렬되지 않은 입력은 stream 이면 실패한다).
+    """
+    outputs = [out_json_path, out_json_kps_path]
+    if out_format in ("per-frame", "both"):
+        outputs += [out_npy_dir, out_npz_dir]
+    if out_format in ("store", "both"):
+        outputs.append(os.path.join(out_store_dir, "frame_offsets.npy"))
+    options = {"min_score": min_score, "out_format": out_format, "track": track, "json_indent": json_indent,
+               "outputs": [os.path.abspath(p) for p in outputs]}
+    return f"convert_4bot:{os.path.abspath(input_json_path)}", options, outputs
 
 def main():
     ap = argparse.ArgumentParser(description="Convert results_output_*.json to BoT-SORT det format and keep ALL keypoints.")
@@ -175,14 +448,47 @@ def main():
     ap.add_argument("--out-json-kps", default="dets_with_all_keypoints.json", help="Output JSON path WITH keypoints")
     ap.add_argument("--out-npz-dir", default="dets_kps_npz", help="Directory to save per-frame .npz (bbox+keypoints)")
     ap.add_argument("--min-score", type=float, default=0.0, help="Minimum bbox score filter")
+    ap.add_argument("--stream", action="store_true",
+                    help="Parse instance_info frame by frame (bounded memory; input must be in frame order)")
+    ap.add_argument("--format", dest="out_format", choices=OUT_FORMATS, default="per-frame",
+                    help="Array output: per-frame .npy/.npz files, one consolidated store dir, or both")
+    ap.add_argument("--out-store-dir", default="dets_kps_store",
+                    help="Directory for the consolidated per-video store (--format store/both)")
+    ap.add_argument("--track", action="store_true",
+                    help="Assign track_id with the built-in online tracker while converting")
+    ap.add_argument("--pretty", action="store_true",
+                    help="Write the JSON outputs with indent=2 (default: compact)")
+    ap.add_argument("--cache", action="store_true",
+                    help="Skip if the input content and options match the cache manifest next to --out-json")
+    instrument.add_instrument_args(ap)
     args = ap.parse_args()
+    instrument.setup(args, "convert_4bot")
+
+    conv_args = (args.input, args.out_json, args.out_npy_dir, args.out_json_kps, args.out_npz_dir, args.min_score)
+    conv_kwargs = dict(stream=args.stream, out_format=args.out_format, out_store_dir=args.out_store_dir,
+                       track=args.track, json_indent=2 if args.pretty else None)
+    manifest = CacheManifest.for_dir(os.path.dirname(args.out_json)) if args.cache else None
+    if manifest is not None:
+        key, options, outputs = cache_entry(*conv_args, **conv_kwargs)
+        if manifest.is_fresh(key, [args.input], options):
+            manifest.save()
+            print(f"[SKIP] up to date: {args.input}")
+            return
+        in_fp = fingerprint(args.input)
 
-    nframes = convert(args.input, args.out_json, args.out_npy_dir, args.out_json_kps, args.out_npz_dir, args.min_score)
+    with instrument.file(args.input):
+        nframes = convert(*conv_args, **conv_kwargs)
+    if manifest is not None:
+        manifest.record(key, [in_fp], options, outputs)
+        manifest.save()
     print(f"[OK] Converted {nframes} frames ->")
     print(f"     JSON (bbox-only)        : {args.out_json}")
     print(f"     JSON (with keypoints)   : {args.out_json_kps}")
-    print(f"     NPYs (bbox-only)        : {args.out_npy_dir}/000001.npy ...")
-    print(f"     NPZs (bbox+keypoints)   : {args.out_npz_dir}/000001.npz ...")
+    if args.out_format in ("per-frame", "both"):
+        print(f"     NPYs (bbox-only)        : {args.out_npy_dir}/000001.npy ...")
+        print(f"     NPZs (bbox+keypoints)   : {args.out_npz_dir}/000001.npz ...")
+    if args.out_format in ("store", "both"):
+        print(f"     Store (bbox+keypoints)  : {args.out_store_dir}/")
 
 if __name__ == "__main__":
     main()
@@ -2,41 +2,18 @@
 set -euo pipefail
 
 # ==== 경로 설정 ====
-CONVERTER="/root/dhyee/convert_4bot.py"       # convert_4bot.py의 실제 경로로 수정
+BATCH="/root/dhyee/convert_4bot_batch.py"     # convert_4bot_batch.py의 실제 경로로 수정 (convert_4bot.py와 같은 폴더)
 ROOT="/root/dhyee/output_rtm"                 # results_*.json들이 들어있는 상위 폴더
 MIN_SCORE="0.0"
+WORKERS="$(nproc)"                            # 동시 변환 프로세스 수
 
-# ROOT 하위 모든 results_*.json 순회
-# -print0 로 null-구분 → 특수문자/공백 안전
-find "$ROOT" -type f -name 'results_*.json' -print0 | \
-while IFS= read -r -d '' IN_JSON; do
-  # 예: IN_JSON=/root/dhyee/output_rtm/2247456/results_2247456.json
-  DIR="$(dirname "$IN_JSON")"                 # /root/dhyee/output_rtm/2247456
-  BASE="$(basename "$IN_JSON")"               # results_2247456.json
-
-  # name 추출: results_  접두어 / .json 접미어 제거 → 2247456
-  NAME="${BASE#results_}"
-  NAME="${NAME%.json}"
-
-  # 출력 경로들(폴더는 절대경로로 지정)
-  OUT_JSON="$DIR/${NAME}_4bot.json"
-  OUT_JSON_KPS="$DIR/${NAME}_convert.json"
-  OUT_NPY_DIR="$DIR/botsort_dets_npy"
-  OUT_NPZ_DIR="$DIR/dets_kps_npz"
-
-  mkdir -p "$OUT_NPY_DIR" "$OUT_NPZ_DIR"
-
-  echo ">>> Converting: $IN_JSON"
-  python "$CONVERTER" \
-    --input "$IN_JSON" \
-    --out-json "$OUT_JSON" \
-    --out-npy-dir "$OUT_NPY_DIR" \
-    --out-json-kps "$OUT_JSON_KPS" \
-    --out-npz-dir "$OUT_NPZ_DIR" \
-    --min-score "$MIN_SCORE"
-
-  echo ">>> Done: $OUT_JSON"
-done
+# ROOT 하위 모든 results_*.json 을 프로세스 풀로 병렬 변환
+# 출력 경로(<DIR>/<NAME>_4bot.json, <NAME>_convert.json, botsort_dets_npy/, dets_kps_npz/)는 기존과 동일
+# 단, 한 폴더에 results_*.json 이 여럿이면 <NAME>_botsort_dets_npy/ 처럼 입력별 폴더에 쓴다
+# 이미 최신인 출력은 건너뜀 (다시 만들려면 --force 추가)
+python "$BATCH" \
+  --root "$ROOT" \
+  --workers "$WORKERS" \
+  --min-score "$MIN_SCORE"
 
 echo "=== All conversions finished ==="
-
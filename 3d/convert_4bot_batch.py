@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch driver for convert_4bot.convert (replaces the serial loop in convert_4bot.sh).
+
+Finds every results_*.json under --root and converts them in a process pool, so
+NumPy import / interpreter start-up is paid once per worker instead of once per file.
+
+Per input  <DIR>/results_<NAME>.json  the outputs are (same names as convert_4bot.sh):
+  <DIR>/<NAME>_4bot.json       bbox-only JSON
+  <DIR>/<NAME>_convert.json    JSON with keypoints
+  <DIR>/botsort_dets_npy/      per-frame .npy  (--format per-frame|both)
+  <DIR>/dets_kps_npz/          per-frame .npz  (--format per-frame|both)
+  <DIR>/dets_kps_store/        consolidated store (--format store|both)
+
+When a folder holds more than one results_*.json, the three directories get a
+per-input prefix instead (<NAME>_botsort_dets_npy/, <NAME>_dets_kps_npz/,
+<NAME>_dets_kps_store/), so inputs converted in parallel never write the same files.
+
+Inputs whose content, options and outputs match the cache manifest
+(<DIR>/.cache_manifest.json, see cache_manifest.py) are skipped unless --force.
+
+Usage
+-----
+python convert_4bot_batch.py --root /root/dhyee/output_rtm --workers 8 --stream
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from cache_manifest import CacheManifest, fingerprint
+from convert_4bot import OUT_FORMATS, cache_entry, convert
+
+def find_inputs(root: str) -> List[str]:
+    """root 하위의 모든 results_*.json (정렬된 절대경로)"""
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for fn in filenames:
+            if fn.startswith("results_") and fn.endswith(".json"):
+                found.append(os.path.abspath(os.path.join(dirpath, fn)))
+    return sorted(found)
+
+def output_paths(in_json: str, per_input_dirs: bool = False) -> Dict[str, str]:
+    """
+    convert() 의 출력 경로. per_input_dirs=True 면 (폴더에 입력이 여럿일 때) 디렉터리 출력에도
+    <NAME>_ 접두사를 붙여 입력끼리 같은 파일을 쓰지 않게 한다.
+    """
+    d = os.path.dirname(in_json)
+    name = os.path.basename(in_json)[len("results_"):-len(".json")]
+    prefix = f"{name}_" if per_input_dirs else ""
+    return {
+        "out_json_path": os.path.join(d, f"{name}_4bot.json"),
+        "out_json_kps_path": os.path.join(d, f"{name}_convert.json"),
+        "out_npy_dir": os.path.join(d, f"{prefix}botsort_dets_npy"),
+        "out_npz_dir": os.path.join(d, f"{prefix}dets_kps_npz"),
+        "out_store_dir": os.path.join(d, f"{prefix}dets_kps_store"),
+    }
+
+def shared_dirs(inputs: List[str]) -> Set[str]:
+    """입력이 둘 이상 있는 폴더"""
+    counts = Counter(os.path.dirname(p) for p in inputs)
+    return {d for d, n in counts.items() if n > 1}
+
+def _convert_one(in_json: str, min_score: float, stream: bool, out_format: str,
+                 track: bool, per_input_dirs: bool) -> Tuple[str, int, float, Optional[str], Optional[Dict[str, Any]]]:
+    """워커 프로세스에서 실행. 반환: (입력, 프레임 수, 소요 초, 에러 메시지 or None, 입력 fingerprint)"""
+    t0 = time.perf_counter()
+    try:
+        in_fp = fingerprint(in_json)  # 변환 전에 찍어야 변환 도중 바뀐 입력을 놓치지 않는다
+        nframes = convert(in_json, min_score=min_score, stream=stream, out_format=out_format,
+                          track=track, **output_paths(in_json, per_input_dirs))
+        return in_json, nframes, time.perf_counter() - t0, None, in_fp
+    except Exception as e:
+        return in_json, 0, time.perf_counter() - t0, f"{type(e).__name__}: {e}", None
+
+def main():
+    ap = argparse.ArgumentParser(description="Convert all results_*.json under a root in parallel.")
+    ap.add_argument("--root", default="/root/dhyee/output_rtm", help="Folder containing results_*.json (searched recursively)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes")
+    ap.add_argument("--min-score", type=float, default=0.0, help="Minimum bbox score filter")
+    ap.add_argument("--stream", action="store_true", help="Use the bounded-memory streaming parser")
+    ap.add_argument("--format", dest="out_format", choices=OUT_FORMATS, default="per-frame",
+                    help="Array output format (see convert_4bot.py)")
+    ap.add_argument("--track", action="store_true", help="Assign track_id with the built-in online tracker")
+    ap.add_argument("--force", action="store_true", help="Convert even if outputs are up to date")
+    args = ap.parse_args()
+
+    inputs = find_inputs(args.root)
+    if not inputs:
+        print(f"[ERROR] No results_*.json under {args.root}", file=sys.stderr)
+        sys.exit(1)
+
+    manifests: Dict[str, CacheManifest] = {}
+    shared = shared_dirs(inputs)
+    for d in sorted(shared):
+        print(f"[INFO] several results_*.json in {d}: array outputs go to <NAME>_botsort_dets_npy/ etc.")
+
+    def _entry(in_json: str):
+        d = os.path.dirname(in_json)
+        if d not in manifests:
+            manifests[d] = CacheManifest.for_dir(d)
+        return (manifests[d],) + cache_entry(in_json, min_score=args.min_score, out_format=args.out_format,
+                                             track=args.track, **output_paths(in_json, d in shared))
+
+    todo = []
+    for p in inputs:
+        manifest, key, options, _ = _entry(p)
+        if args.force or not manifest.is_fresh(key, [p], options):
+            todo.append(p)
+    skipped = len(inputs) - len(todo)
+    print(f">>> {len(inputs)} inputs, {skipped} up to date, {len(todo)} to convert with {args.workers} workers")
+
+    t0 = time.perf_counter()
+    done, failed, total_frames, busy = 0, 0, 0, 0.0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as ex:
+        futures = [ex.submit(_convert_one, p, args.min_score, args.stream, args.out_format, args.track,
+                             os.path.dirname(p) in shared) for p in todo]
+        for fut in as_completed(futures):
+            in_json, nframes, secs, err, in_fp = fut.result()
+            busy += secs
+            if err is not None:
+                failed += 1
+                print(f"[FAIL] {in_json} ({secs:.2f}s): {err}", file=sys.stderr)
+                continue
+            done += 1
+            total_frames += nframes
+            manifest, key, options, outputs = _entry(in_json)
+            manifest.record(key, [in_fp], options, outputs)
+            manifest.save()
+            fps = nframes / secs if secs > 0 else 0.0
+            print(f"[OK] {in_json}: {nframes} frames in {secs:.2f}s ({fps:.1f} frames/s)")
+
+    for manifest in manifests.values():
+        manifest.save()  # is_fresh 가 갱신한 mtime 기록
+    wall = time.perf_counter() - t0
+    print(f"=== converted {done}, skipped {skipped}, failed {failed} | "
+          f"{total_frames} frames | wall {wall:.2f}s, worker time {busy:.2f}s ===")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
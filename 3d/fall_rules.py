@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rule-based fall candidates from tracked keypoints (cheap first stage before any GCN).
+
+All tracks are processed at once: instance rows are sorted by (track_id, frame_id) and
+every feature is a NumPy expression over that (N,) row axis, with differences taken
+`lag` rows back inside the same track (rows across a track boundary or a gap larger
+than max_gap frames get NaN).
+
+Features per row (COCO-17 indices; heights along --up-axis, normalised by the track's
+mean torso length so thresholds do not depend on the keypoint unit):
+  hip_height, head_height   hip centre (11,12) / nose (0) height
+  hip_vel, head_vel         height velocity [torso/s], negative = moving down
+  vert_acc                  hip vertical acceleration [torso/s^2]
+  torso_angle               angle between the torso (hip->shoulder centre) and the up axis [deg]
+  aspect, aspect_change     bbox w/h and its change over `lag` rows
+
+A row is a candidate when it moves down fast enough
+  (hip_vel <= -vel_thr or head_vel <= -vel_thr or vert_acc <= -acc_thr)
+and its posture is no longer upright
+  (torso_angle >= angle_thr or aspect_change >= aspect_thr).
+Candidate rows of a track closer than merge_gap frames are merged into segments.
+
+RTMPose3D keypoints are 3D; --up-axis picks the vertical component ("z", "-y", ...).
+The bbox is in image pixels, so the aspect features do not depend on it.
+
+Usage
+-----
+python fall_rules.py --input /root/dhyee/output_tracking/2247456/2247456_botsort.kps \
+       --fps 30 --up-axis z --out /root/dhyee/output_tracking/2247456/2247456_fall_candidates.json
+
+    rules = FallRules(fps=30, up_axis="z")
+    feats = rules.features(track_ids, frame_ids, keypoints, bboxes)   # dict of (N,) arrays
+    mask = rules.candidates(feats)
+    rules.window_mask(kps (B,T,V,3), boxes (B,T,4))                    # (B,) any candidate in window
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from json2_shiftgcn import kpts_array
+from kps_store import is_store_dir, open_store
+
+# COCO-17
+NOSE = 0
+L_SHOULDER, R_SHOULDER = 5, 6
+L_HIP, R_HIP = 11, 12
+MIN_JOINTS = max(NOSE, L_SHOULDER, R_SHOULDER, L_HIP, R_HIP) + 1   # 위 관절을 모두 담는 최소 V
+
+def check_joints(joints: int) -> None:
+    """V 가 COCO-17 의 코/어깨/엉덩이 index 를 담지 못하면 ValueError"""
+    if joints < MIN_JOINTS:
+        raise ValueError(f"fall rules need COCO-17 keypoints (nose 0, shoulders 5/6, hips 11/12): "
+                         f"joints={joints} < {MIN_JOINTS}")
+
+def up_vector(up_axis: str) -> np.ndarray:
+    """"z", "-y" 등 -> 단위 벡터 (3,)"""
+    sign = -1.0 if up_axis.startswith("-") else 1.0
+    axis = up_axis.lstrip("+-").lower()
+    if axis not in ("x", "y", "z"):
+        raise ValueError(f"up axis must be one of [-]x/y/z: {up_axis}")
+    u = np.zeros(3)
+    u["xyz".index(axis)] = sign
+    return u
+
+def _group_mean(values: np.ndarray, group: np.ndarray, n_groups: int) -> np.ndarray:
+    """NaN 을 제외한 그룹별 평균 (n_groups,)"""
+    valid = ~np.isnan(values)
+    s = np.bincount(group, weights=np.where(valid, values, 0.0), minlength=n_groups)
+    c = np.bincount(group, weights=valid.astype(np.float64), minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return s / c
+
+class FallRules:
+    def __init__(self,
+                 fps: float = 30.0,
+                 up_axis: str = "z",
+                 lag: int = 5,
+                 max_gap: Optional[int] = None,
+                 vel_thr: float = 1.0,
+                 acc_thr: float = 6.0,
+                 angle_thr: float = 45.0,
+                 aspect_thr: float = 0.3,
+                 merge_gap: int = 15):
+        self.fps = fps
+        self.up = up_vector(up_axis)
+        self.lag = max(1, lag)
+        self.max_gap = max_gap if max_gap is not None else 3 * self.lag
+        self.vel_thr = vel_thr
+        self.acc_thr = acc_thr
+        self.angle_thr = angle_thr
+        self.aspect_thr = aspect_thr
+        self.merge_gap = merge_gap
+
+    def _lagged(self, track_start: np.ndarray, frame_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """행 i 의 lag 행 앞 index, 유효 여부, 시간차[s] (정렬된 행 기준)"""
+        idx = np.arange(len(frame_ids))
+        prev = idx - self.lag
+        valid = prev >= track_start
+        prev = np.where(valid, prev, idx)
+        gap = frame_ids - frame_ids[prev]
+        valid &= (gap > 0) & (gap <= self.max_gap)
+        return prev, valid, np.where(valid, gap, 1) / self.fps
+
+    def features(self,
+                 track_ids: np.ndarray,
+                 frame_ids: np.ndarray,
+                 keypoints: np.ndarray,
+                 bboxes: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        track_ids/frame_ids: (N,), keypoints: (N,V,3) (V>=13, 없는 관절은 NaN), bboxes: (N,4) xyxy
+        반환: 입력 행 순서의 (N,) feature 배열 dict
+        """
+        track_ids = np.asarray(track_ids)
+        frame_ids = np.asarray(frame_ids, dtype=np.int64)
+        order = np.lexsort((frame_ids, track_ids))
+        t, f = track_ids[order], frame_ids[order]
+        kps = np.asarray(keypoints, dtype=np.float64)[order]
+        check_joints(kps.shape[1] if kps.ndim == 3 else 0)
+        box = np.asarray(bboxes, dtype=np.float64)[order]
+        n = len(order)
+
+        new_track = np.ones(n, dtype=bool)
+        new_track[1:] = t[1:] != t[:-1]
+        track_start = np.maximum.accumulate(np.where(new_track, np.arange(n), 0))
+        group = np.cumsum(new_track) - 1
+
+        hip = (kps[:, L_HIP] + kps[:, R_HIP]) * 0.5
+        sho = (kps[:, L_SHOULDER] + kps[:, R_SHOULDER]) * 0.5
+        torso = sho - hip
+        torso_len = np.linalg.norm(torso, axis=1)
+        scale = _group_mean(torso_len, group, int(group[-1]) + 1 if n else 0)[group]
+        scale = np.where(scale > 0, scale, np.nan)
+        hip_h = hip @ self.up / scale
+        head_h = kps[:, NOSE] @ self.up / scale
+        with np.errstate(invalid="ignore", divide="ignore"):
+            angle = np.degrees(np.arccos(np.clip(torso @ self.up / torso_len, -1.0, 1.0)))
+            w = box[:, 2] - box[:, 0]
+            h = box[:, 3] - box[:, 1]
+            aspect = np.where(h > 0, w / h, np.nan)
+
+        prev, valid, dt = self._lagged(track_start, f)
+        nan = np.full(n, np.nan)
+        hip_vel = np.where(valid, (hip_h - hip_h[prev]) / dt, nan)
+        head_vel = np.where(valid, (head_h - head_h[prev]) / dt, nan)
+        vert_acc = np.where(valid & valid[prev], (hip_vel - hip_vel[prev]) / dt, nan)
+        aspect_change = np.where(valid, aspect - aspect[prev], nan)
+
+        feats = {"hip_height": hip_h, "head_height": head_h, "hip_vel": hip_vel, "head_vel": head_vel,
+                 "vert_acc": vert_acc, "torso_angle": angle, "aspect": aspect, "aspect_change": aspect_change}
+        inv = np.empty(n, dtype=np.int64)
+        inv[order] = np.arange(n)
+        return {k: v[inv] for k, v in feats.items()}
+
+    def candidates(self, feats: Dict[str, np.ndarray]) -> np.ndarray:
+        """(N,) bool. NaN 비교는 False 이므로 정보가 부족한 행은 후보가 아니다."""
+        with np.errstate(invalid="ignore"):
+            down = ((feats["hip_vel"] <= -self.vel_thr) | (feats["head_vel"] <= -self.vel_thr)
+                    | (feats["vert_acc"] <= -self.acc_thr))
+            posture = (feats["torso_angle"] >= self.angle_thr) | (feats["aspect_change"] >= self.aspect_thr)
+        return down & posture
+
+    def segments(self, track_ids: np.ndarray, frame_ids: np.ndarray, mask: np.ndarray,
+                 feats: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """후보 행을 트랙별 구간 [{track_id, start_frame, end_frame, peak_frame, peak_hip_vel, rows}] 으로 병합"""
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return []
+        rows = rows[np.lexsort((np.asarray(frame_ids)[rows], np.asarray(track_ids)[rows]))]
+        t, f = np.asarray(track_ids)[rows], np.asarray(frame_ids)[rows]
+        vel = np.nan_to_num(feats["hip_vel"][rows], nan=0.0)
+        brk = np.ones(len(rows), dtype=bool)
+        brk[1:] = (t[1:] != t[:-1]) | (f[1:] - f[:-1] > self.merge_gap)
+        starts = np.flatnonzero(brk)
+        ends = np.append(starts[1:], len(rows))
+        out = []
+        for s, e in zip(starts.tolist(), ends.tolist()):
+            p = s + int(np.argmin(vel[s:e]))
+            out.append({"track_id": int(t[s]), "start_frame": int(f[s]), "end_frame": int(f[e - 1]),
+                        "peak_frame": int(f[p]), "peak_hip_vel": round(float(vel[p]), 4), "rows": e - s})
+        return out
+
+    def window_mask(self, keypoints: np.ndarray, bboxes: np.ndarray,
+                    frame_ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """윈도우 배치 keypoints (B,T,V,3), bboxes (B,T,4) -> (B,) 윈도우 안에 후보 행이 있는지"""
+        B, T = keypoints.shape[:2]
+        if frame_ids is None:
+            frame_ids = np.broadcast_to(np.arange(T), (B, T))
+        tids = np.repeat(np.arange(B), T)
+        feats = self.features(tids, np.asarray(frame_ids).reshape(-1),
+                              keypoints.reshape(B * T, *keypoints.shape[2:]), bboxes.reshape(B * T, 4))
+        return self.candidates(feats).reshape(B, T).any(axis=1)
+
+# ---------- 입력 ----------
+def load_tracked_rows(path: str, joints: int = 17) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    json_plus_track 출력(스토어 디렉터리 또는 JSON) -> track_ids, frame_ids, keypoints (N,joints,3), bboxes (N,4)
+    track_id < 0 (미매칭) 인 인스턴스는 제외.
+    """
+    if is_store_dir(path):
+        store = open_store(path)
+        if "track_ids" not in store.arrays:
+            raise ValueError(f"Store has no track_ids.npy (not a json_plus_track output): {path}")
+        counts = np.diff(store.frame_offsets)
+        frame_ids = np.repeat(np.asarray(store.frame_ids), counts)
+        track_ids = np.asarray(store.arrays["track_ids"])
+        kps = np.full((len(track_ids), joints, 3), np.nan)
+        src = store.arrays["keypoints_xyz"]
+        k = min(joints, src.shape[1])
+        kps[:, :k] = src[:, :k]
+        bboxes = np.asarray(store.arrays["bboxes_xyxy5"][:, :4], dtype=np.float64)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            frames = json.load(f)
+        tids, fids, kp_rows, box_rows = [], [], [], []
+        for fr in frames:
+            for inst in fr.get("instances", []):
+                if inst.get("bbox") is None or "track_id" not in inst:
+                    continue
+                a = kpts_array(inst.get("keypoints") or [])
+                row = np.full((joints, 3), np.nan)
+                row[:min(joints, len(a))] = a[:joints]
+                tids.append(int(inst["track_id"]))
+                fids.append(int(fr.get("frame_id", -1)))
+                kp_rows.append(row)
+                box_rows.append(inst["bbox"][:4])
+        track_ids = np.asarray(tids, dtype=np.int64)
+        frame_ids = np.asarray(fids, dtype=np.int64)
+        kps = np.asarray(kp_rows, dtype=np.float64).reshape(-1, joints, 3)
+        bboxes = np.asarray(box_rows, dtype=np.float64).reshape(-1, 4)
+    keep = track_ids >= 0
+    return track_ids[keep], frame_ids[keep], kps[keep], bboxes[keep]
+
+def main():
+    ap = argparse.ArgumentParser(description="Vectorized rule-based fall candidates over all tracks.")
+    ap.add_argument("--input", required=True, help="json_plus_track output (store dir or JSON)")
+    ap.add_argument("--out", default=None, help="Write candidate segments (JSON); default: print")
+    ap.add_argument("--fps", type=float, default=30.0, help="Video frame rate")
+    ap.add_argument("--joints", type=int, default=17,
+                    help=f"Joint count V of the input (extra joints are cut, missing are NaN; at least {MIN_JOINTS})")
+    ap.add_argument("--up-axis", default="z", help="Vertical keypoint axis: x, y, z with optional '-' (default: z)")
+    ap.add_argument("--lag", type=int, default=5, help="Rows back (same track) used for differences")
+    ap.add_argument("--vel-thr", type=float, default=1.0, help="Downward hip/head speed [torso lengths/s]")
+    ap.add_argument("--acc-thr", type=float, default=6.0, help="Downward hip acceleration [torso lengths/s^2]")
+    ap.add_argument("--angle-thr", type=float, default=45.0, help="Torso angle from vertical [deg]")
+    ap.add_argument("--aspect-thr", type=float, default=0.3, help="Increase of bbox w/h over --lag rows")
+    ap.add_argument("--merge-gap", type=int, default=15, help="Merge candidate rows closer than N frames")
+    args = ap.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"[ERROR] Not found: {args.input}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        check_joints(args.joints)
+        rules = FallRules(fps=args.fps, up_axis=args.up_axis, lag=args.lag, vel_thr=args.vel_thr,
+                          acc_thr=args.acc_thr, angle_thr=args.angle_thr, aspect_thr=args.aspect_thr,
+                          merge_gap=args.merge_gap)
+        track_ids, frame_ids, kps, bboxes = load_tracked_rows(args.input, joints=args.joints)
+        feats = rules.features(track_ids, frame_ids, kps, bboxes)
+        mask = rules.candidates(feats)
+        segs = rules.segments(track_ids, frame_ids, mask, feats)
+    except Exception as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(1)
+
+    text = json.dumps(segs, ensure_ascii=False, indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"[OK] {args.out}")
+    else:
+        print(text)
+    n = len(mask)
+    print(f"[stats] rows {n}, tracks {len(np.unique(track_ids))}, candidate rows {int(mask.sum())} "
+          f"({100.0 * mask.mean() if n else 0.0:.2f}%), segments {len(segs)}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Long-running fall-detection service over a live keypoint stream.
+
+Input is one frame per line in the convert_4bot keypoint schema
+(frames_kps_export: {"frame_id": int, "instances": [{"bbox", "score", "keypoints", ...}]}),
+read from a TCP socket, a growing file (tail -f) or stdin:
+
+  --source tcp://0.0.0.0:9000     newline-delimited JSON, one client at a time
+  --source /path/frames.jsonl     file tail; waits for new lines (--no-follow: replay to EOF)
+  --source -                      stdin
+
+Per frame:
+  1) track   : --track-ids input uses the instances' "track_id", tracker the built-in
+               online tracker (online_tracker.py); auto (default) picks one of the two
+               from the first frame with instances. The source never changes afterwards
+               (both id spaces start at 1), so with input ids a frame with an instance
+               lacking "track_id" is skipped as a bad frame
+  2) buffer  : each track keeps its last --window frames (keypoints, scores, bbox)
+               in a preallocated TrackRingBuffer (track_buffer.py);
+               tracks unseen for --max-age frames are evicted
+  3) classify: every --stride frames, tracks with a full window are stacked into
+               one (B,T,V,3) batch and scored by the classifier (--classifier);
+               with --gate rules only windows flagged by fall_rules.py are scored
+  4) events  : score >= --threshold emits a JSON line
+               {"frame_id", "track_id", "score", "latency_ms"} (then --cooldown frames of silence)
+
+Latency is kept bounded by a reader thread that parses lines into a queue of at most
+--max-queue frames; when the worker falls behind the oldest frames are dropped (counted
+in the metrics) instead of letting the delay grow. A file replay (--no-follow) blocks
+the reader instead, so every frame is processed. Per-stage latency percentiles
+(queue, track, buffer, classify, total) are printed every --report-every seconds and
+written to --metrics on exit. Lines that are not JSON (bad_lines) and frames the service
+cannot use, e.g. an instance without a bbox (bad_frames), are counted and skipped.
+
+Classifiers (--classifier)
+  bbox        : heuristic on the window's bbox (centre drop + box flattening), no model
+  torchscript : TorchScript Shift-GCN style model (--model), input (B,3,T,V,1),
+                score = softmax[:, --fall-class]; needs torch
+
+Other classifiers can be plugged in with register_classifier(name, factory), where
+factory(args) returns fn(keypoints (B,T,V,3), bboxes (B,T,4)) -> scores (B,).
+
+Usage
+-----
+python fall_service.py --source tcp://0.0.0.0:9000 --joints 17 --events falls.jsonl
+python fall_service.py --source /root/dhyee/live/cam1.jsonl --classifier torchscript --model shiftgcn.pt
+"""
+
+import argparse
+import json
+import signal
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from fall_rules import FallRules, check_joints
+from json2_shiftgcn import kpts_array
+from online_tracker import OnlineTracker
+from track_buffer import TrackRingBuffer
+
+Classifier = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+# ---------- 입력 소스 ----------
+def iter_socket_lines(host: str, port: int, stop: threading.Event) -> Iterator[str]:
+    """TCP 서버. 한 번에 클라이언트 하나, 연결이 끊기면 다음 연결을 기다린다."""
+    srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    srv.bind((host, port))
+    srv.listen(1)
+    srv.settimeout(0.5)
+    try:
+        while not stop.is_set():
+            try:
+                conn, _ = srv.accept()
+            except socket.timeout:
+                continue
+            with conn, conn.makefile("r", encoding="utf-8", newline="\n") as f:
+                for line in f:
+                    yield line
+                    if stop.is_set():
+                        return
+    finally:
+        srv.close()
+
+def iter_file_lines(path: str, stop: threading.Event, follow: bool = True, poll: float = 0.02) -> Iterator[str]:
+    """tail -f. 아직 개행이 안 붙은 마지막 줄은 완성될 때까지 보류."""
+    with open(path, "r", encoding="utf-8") as f:
+        partial = ""
+        while not stop.is_set():
+            line = f.readline()
+            if not line:
+                if not follow:
+                    break
+                time.sleep(poll)
+                continue
+            partial += line
+            if partial.endswith("\n"):
+                yield partial
+                partial = ""
+        if partial and not follow:
+            yield partial
+
+def open_source(source: str, stop: threading.Event, follow: bool = True) -> Iterator[str]:
+    if source == "-":
+        return iter(sys.stdin.readline, "")
+    if source.startswith("tcp://"):
+        host, _, port = source[len("tcp://"):].rpartition(":")
+        return iter_socket_lines(host or "0.0.0.0", int(port), stop)
+    return iter_file_lines(source, stop, follow=follow)
+
+class FrameQueue:
+    """
+    크기 제한 큐. 가득 차면 가장 오래된 프레임을 버려 지연이 쌓이지 않게 한다.
+    drop=False 면 (파일 재생) 버리지 않고 reader 가 기다린다.
+    """
+    def __init__(self, maxsize: int, drop: bool = True):
+        self.items: Deque[Tuple[float, Dict[str, Any]]] = deque()
+        self.maxsize = max(1, maxsize)
+        self.drop = drop
+        self.cond = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item: Tuple[float, Dict[str, Any]]) -> None:
+        with self.cond:
+            if self.drop and len(self.items) >= self.maxsize:
+                self.items.popleft()
+                self.dropped += 1
+            while not self.drop and len(self.items) >= self.maxsize:
+                self.cond.wait()
+            self.items.append(item)
+            self.cond.notify()
+
+    def get(self, timeout: float = 0.5) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """다음 프레임. 비어 있으면 None (닫혔으면 StopIteration)"""
+        with self.cond:
+            if not self.items and not self.closed:
+                self.cond.wait(timeout)
+            if self.items:
+                item = self.items.popleft()
+                self.cond.notify_all()
+                return item
+            if self.closed:
+                raise StopIteration
+            return None
+
+    def close(self) -> None:
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+def _reader(lines: Iterator[str], queue: FrameQueue, metrics: "LatencyStats") -> None:
+    try:
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            t_arrive = time.perf_counter()
+            try:
+                frame = json.loads(line)
+            except ValueError:
+                metrics.count("bad_lines")
+                continue
+            metrics.add("parse", time.perf_counter() - t_arrive)
+            queue.put((t_arrive, frame))
+    finally:
+        queue.close()
+
+# ---------- 지표 ----------
+class LatencyStats:
+    """단계별 최근 maxlen 개 지연(초)과 카운터"""
+    def __init__(self, maxlen: int = 10000):
+        self.maxlen = maxlen
+        self.samples: Dict[str, Deque[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def add(self, stage: str, secs: float) -> None:
+        with self.lock:
+            self.samples.setdefault(stage, deque(maxlen=self.maxlen)).append(secs)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            stages = {}
+            for stage, xs in self.samples.items():
+                a = np.asarray(xs) * 1e3
+                p50, p95, p99 = np.percentile(a, [50, 95, 99])
+                stages[stage] = {"n": len(a), "p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3),
+                                 "p99_ms": round(float(p99), 3), "max_ms": round(float(a.max()), 3)}
+            return {"stages": stages, "counters": dict(self.counters)}
+
+# ---------- 프레임 검사 ----------
+def frame_instances(frame: Any) -> Tuple[int, List[Dict[str, Any]]]:
+    """(frame_id, instances). 서비스가 처리할 수 없는 프레임은 ValueError"""
+    if not isinstance(frame, dict):
+        raise ValueError(f"frame is not a JSON object ({type(frame).__name__})")
+    try:
+        frame_id = int(frame.get("frame_id", 0))
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid frame_id: {frame.get('frame_id')!r}") from None
+    insts = frame.get("instances") or []
+    if not isinstance(insts, list) or not all(isinstance(i, dict) for i in insts):
+        raise ValueError(f"frame {frame_id}: 'instances' must be a list of objects")
+    for i in insts:
+        bbox = i.get("bbox")
+        if not isinstance(bbox, list) or len(bbox) < 4 or \
+                not all(isinstance(v, (int, float)) for v in bbox[:4]):
+            raise ValueError(f"frame {frame_id}: instance without a [x1,y1,x2,y2] bbox")
+        if "track_id" in i and not isinstance(i["track_id"], (int, float)):
+            raise ValueError(f"frame {frame_id}: invalid track_id {i['track_id']!r}")
+    return frame_id, insts
+
+# ---------- 트랙별 버퍼 ----------
+def _fit_joints(kps: np.ndarray, joints: int) -> np.ndarray:
+    out = np.zeros((joints, 3), dtype=np.float32)
+    n = min(joints, len(kps))
+    out[:n] = kps[:n]
+    return out
+
+# ---------- 분류기 레지스트리 ----------
+CLASSIFIERS: Dict[str, Callable[[argparse.Namespace], Classifier]] = {}
+
+def register_classifier(name: str, factory: Callable[[argparse.Namespace], Classifier]) -> None:
+    CLASSIFIERS[name] = factory
+
+def _bbox_classifier(args: argparse.Namespace) -> Classifier:
+    """
+    박스 기반 휴리스틱: 윈도우 동안 중심이 처음 박스 높이 대비 얼마나 내려갔는지(drop)와
+    세로로 긴 박스가 얼마나 납작해졌는지(flatten)의 평균을 0~1 점수로.
+    """
+    def _score(kps: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        w = np.maximum(boxes[..., 2] - boxes[..., 0], 1e-6)
+        h = np.maximum(boxes[..., 3] - boxes[..., 1], 1e-6)
+        cy = (boxes[..., 1] + boxes[..., 3]) * 0.5
+        drop = (cy[:, -1] - cy[:, 0]) / h[:, 0]
+        flatten = w[:, -1] / h[:, -1] - w[:, 0] / h[:, 0]
+        return np.clip(0.5 * np.clip(drop, 0, 1) + 0.5 * np.clip(flatten, 0, 1), 0.0, 1.0)
+    return _score
+
+def _torchscript_classifier(args: argparse.Namespace) -> Classifier:
+    if not args.model:
+        raise ValueError("--classifier torchscript requires --model <file.pt>")
+    try:
+        import torch
+    except ImportError as e:
+        raise RuntimeError("--classifier torchscript needs PyTorch installed") from e
+    model = torch.jit.load(args.model, map_location=args.device).eval()
+
+    def _score(kps: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        x = torch.from_numpy(np.ascontiguousarray(kps.transpose(0, 3, 1, 2)[..., None]))  # (B,3,T,V,1)
+        with torch.inference_mode():
+            logits = model(x.to(args.device))
+        return torch.softmax(logits, dim=1)[:, args.fall_class].cpu().numpy()
+    return _score
+
+register_classifier("bbox", _bbox_classifier)
+register_classifier("torchscript", _torchscript_classifier)
+
+# ---------- 서비스 ----------
+class FallService:
+    def __init__(self, args: argparse.Namespace, classifier: Classifier, events_out):
+        self.args = args
+        self.classifier = classifier
+        self.events_out = events_out
+        self.tracker = OnlineTracker()
+        self.buffers = TrackRingBuffer(args.window, args.joints, max_age=args.max_age)
+        self.since_scored: Dict[int, int] = {}
+        self.cooldown_until: Dict[int, int] = {}
+        self.metrics = LatencyStats()
+        self.id_source: Optional[str] = None if args.track_ids == "auto" else args.track_ids
+        self.rules = None
+        if args.gate == "rules":
+            check_joints(args.joints)   # 첫 윈도우에서 IndexError 가 나기 전에 시작 단계에서 실패
+            self.rules = FallRules(fps=args.fps, up_axis=args.up_axis)
+
+    def _check_id_source(self, frame_id: int, insts: List[Dict[str, Any]]) -> None:
+        """
+        트랙 id 출처는 서비스 전체에서 하나. 프레임마다 바꾸면 입력 id 와 트래커 id (둘 다 1부터) 가
+        같은 버퍼 슬롯에서 섞인다. auto 는 인스턴스가 있는 첫 프레임으로 정하고, 맞지 않는 프레임은 ValueError.
+        """
+        if not insts:
+            return
+        has = ["track_id" in i for i in insts]
+        if self.id_source is None:
+            if any(has) and not all(has):
+                raise ValueError(f"frame {frame_id}: only some instances have track_id "
+                                 "(cannot pick --track-ids auto; set input or tracker)")
+            self.id_source = "input" if all(has) else "tracker"
+        elif self.id_source == "input" and not all(has):
+            raise ValueError(f"frame {frame_id}: instance without track_id (track ids come from the input)")
+
+    def _track_ids(self, frame_id: int, insts: List[Dict[str, Any]], kps: List[np.ndarray]) -> List[int]:
+        if self.id_source == "input":
+            return [int(i["track_id"]) for i in insts]
+        boxes = np.asarray([i["bbox"][:4] for i in insts], dtype=np.float64).reshape(-1, 4)
+        poses = np.stack(kps) if kps else None
+        return self.tracker.update(frame_id, boxes, poses).tolist()
+
+    def process(self, t_arrive: float, frame: Dict[str, Any]) -> Tuple[List[int], List[np.ndarray]]:
+        """
+        한 프레임 처리. 반환: 인스턴스별 track_id 와 (V,3) keypoints
+        잘못된 프레임은 상태를 바꾸기 전에 ValueError (호출한 쪽에서 bad_frames 로 세고 넘어간다)
+        """
+        m = self.metrics
+        t0 = time.perf_counter()
+        frame_id, insts = frame_instances(frame)
+        m.add("queue", t0 - t_arrive)
+
+        kps = [_fit_joints(kpts_array(i.get("keypoints", [])), self.args.joints) for i in insts]
+        self._check_id_source(frame_id, insts)
+        tids = self._track_ids(frame_id, insts, kps)
+        t1 = time.perf_counter()
+        m.add("track", t1 - t0)
+
+        for inst, tid, k in zip(insts, tids, kps):
+            if tid < 0:
+                continue
+            self.buffers.append(frame_id, tid, k, inst.get("keypoint_scores"), inst["bbox"][:4])
+            self.since_scored[tid] = self.since_scored.get(tid, 0) + 1
+        evicted = self.buffers.evict(frame_id)
+        if evicted:
+            m.count("evicted_tracks", len(evicted))
+            for tid in evicted:
+                self.since_scored.pop(tid, None)
+        t2 = time.perf_counter()
+        m.add("buffer", t2 - t1)
+
+        ready = [t for t in self.buffers.full_tracks() if self.since_scored.get(t, 0) >= self.args.stride]
+        for tid in ready:
+            self.since_scored[tid] = 0
+        if ready:
+            win_kps, win_boxes = self.buffers.windows(ready)
+            m.count("windows", len(ready))
+            if self.rules is not None:
+                # 규칙 기반 1차 필터: 후보 행이 있는 윈도우만 분류기로
+                keep = self.rules.window_mask(win_kps, win_boxes, self.buffers.window_frame_ids(ready))
+                ready = [t for t, k in zip(ready, keep.tolist()) if k]
+                win_kps, win_boxes = win_kps[keep], win_boxes[keep]
+                m.count("gated_out", int((~keep).sum()))
+                m.add("gate", time.perf_counter() - t2)
+        if ready:
+            scores = np.asarray(self.classifier(win_kps, win_boxes), dtype=np.float64).reshape(-1)
+            t3 = time.perf_counter()
+            m.add("classify", t3 - t2)
+            m.count("classified", len(ready))
+            for tid, score in zip(ready, scores.tolist()):
+                if score >= self.args.threshold and frame_id >= self.cooldown_until.get(tid, -1):
+                    self.cooldown_until[tid] = frame_id + self.args.cooldown
+                    self._emit({"frame_id": frame_id, "track_id": tid, "score": round(score, 4),
+                                "latency_ms": round((t3 - t_arrive) * 1e3, 3)})
+
+        total = time.perf_counter() - t_arrive
+        m.add("total", total)
+        m.count("frames")
+        if self.args.budget_ms > 0 and total * 1e3 > self.args.budget_ms:
+            m.count("over_budget")
+        return tids, kps
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        self.metrics.count("events")
+        self.events_out.write(json.dumps(event) + "\n")
+        self.events_out.flush()
+
+def skip_bad_frame(metrics: LatencyStats, err: Exception, name: str = "") -> None:
+    """잘못된 프레임은 세고 넘어간다. 메시지는 처음 한 번만 (스트림이 계속 깨져 있어도 로그가 넘치지 않게)"""
+    metrics.count("bad_frames")
+    if metrics.counters.get("bad_frames") == 1:
+        print(f"[SKIP] {name + ': ' if name else ''}bad frame ({err}); further ones are only counted",
+              file=sys.stderr)
+
+def _report(metrics: LatencyStats, queue: FrameQueue) -> Dict[str, Any]:
+    s = metrics.summary()
+    s["counters"]["dropped_frames"] = queue.dropped
+    return s
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def run_service(args: argparse.Namespace) -> Dict[str, Any]:
+    classifier = CLASSIFIERS[args.classifier](args)
+    events_out = open(args.events, "a", encoding="utf-8") if args.events else sys.stdout
+    service = FallService(args, classifier, events_out)
+    stop = threading.Event()
+    queue = FrameQueue(args.max_queue, drop=not args.no_follow)
+    reader = threading.Thread(target=_reader, daemon=True,
+                              args=(open_source(args.source, stop, follow=not args.no_follow), queue, service.metrics))
+    reader.start()
+
+    signal.signal(signal.SIGTERM, _interrupt)   # 서비스 종료 시에도 지표를 남긴다
+    next_report = time.monotonic() + args.report_every
+    try:
+        while True:
+            try:
+                item = queue.get()
+            except StopIteration:
+                break
+            if item is not None:
+                try:
+                    service.process(*item)
+                except ValueError as e:
+                    skip_bad_frame(service.metrics, e)
+            if args.report_every > 0 and time.monotonic() >= next_report:
+                next_report = time.monotonic() + args.report_every
+                print(f"[stats] {json.dumps(_report(service.metrics, queue))}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        if events_out is not sys.stdout:
+            events_out.close()
+
+    report = _report(service.metrics, queue)
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+def add_detection_args(ap: argparse.ArgumentParser) -> None:
+    """트랙/윈도우/분류기 옵션 (multicam_fusion 과 공유)"""
+    ap.add_argument("--joints", type=int, default=17, help="Joint count V (extra joints are cut, missing are zero)")
+    ap.add_argument("--window", type=int, default=30, help="Frames per classification window T")
+    ap.add_argument("--stride", type=int, default=5, help="Score a track every N new frames")
+    ap.add_argument("--max-age", type=int, default=30, help="Evict tracks unseen for N frames")
+    ap.add_argument("--track-ids", choices=("auto", "input", "tracker"), default="auto",
+                    help="Track id source for the whole run: the instances' track_id, the built-in "
+                         "tracker, or auto (decided by the first frame with instances)")
+    ap.add_argument("--budget-ms", type=float, default=0.0, help="Count frames whose end-to-end latency exceeds this")
+
+    ap.add_argument("--gate", choices=("none", "rules"), default="none",
+                    help="rules: only classify windows with a fall_rules.py candidate frame")
+    ap.add_argument("--fps", type=float, default=30.0, help="Stream frame rate (for --gate rules)")
+    ap.add_argument("--up-axis", default="z", help="Vertical keypoint axis for --gate rules (e.g. z, -y)")
+    ap.add_argument("--classifier", choices=sorted(CLASSIFIERS), default="bbox", help="Window classifier")
+    ap.add_argument("--model", default=None, help="TorchScript model for --classifier torchscript")
+    ap.add_argument("--device", default="cpu", help="Torch device for --classifier torchscript")
+    ap.add_argument("--fall-class", type=int, default=1, help="Output index of the fall class")
+    ap.add_argument("--threshold", type=float, default=0.5, help="Emit an event when score >= threshold")
+    ap.add_argument("--cooldown", type=int, default=30, help="Frames of silence per track after an event")
+
+def main():
+    ap = argparse.ArgumentParser(description="Real-time fall detection over a per-frame keypoint stream.")
+    ap.add_argument("--source", required=True, help="tcp://HOST:PORT, a JSONL file to tail, or - for stdin")
+    ap.add_argument("--no-follow", action="store_true", help="For a file source, replay it to EOF without dropping frames")
+    ap.add_argument("--max-queue", type=int, default=64, help="Max queued frames; older ones are dropped beyond this")
+    add_detection_args(ap)
+
+    ap.add_argument("--events", default=None, help="Append events (JSON lines) here instead of stdout")
+    ap.add_argument("--metrics", default=None, help="Write the final latency report (JSON) here")
+    ap.add_argument("--report-every", type=float, default=10.0, help="Print latency stats every N seconds (0 = off)")
+    args = ap.parse_args()
+
+    try:
+        report = run_service(args)
+    except Exception as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"[stats] {json.dumps(report)}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
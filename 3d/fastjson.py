@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared JSON I/O for convert_4bot / json_plus_track / json2_shiftgcn.
+
+Uses the fastest codec that is installed and falls back to the stdlib json module:
+  decode: msgspec > orjson > json
+  encode: orjson > msgspec > json
+(pip install orjson msgspec; neither is required.) JSON_BACKEND=json forces the stdlib.
+
+    frames = fastjson.load(path)                  # any JSON document
+    results = fastjson.load_results(path)         # RTMPose3D results_*.json, typed decode
+    fastjson.dump(frames, path)                   # compact (no whitespace)
+    fastjson.dump(frames, path, indent=2)         # the old indent=2 layout
+    b = fastjson.dumps(obj)                       # bytes, UTF-8
+
+load_results / load_frames decode against the instance_info schema with msgspec: only the fields
+the converters read are kept (bbox, bbox_score/score, keypoints, keypoint_scores,
+track ids), so extra per-instance fields never become Python objects. Documents that do
+not match the schema are decoded untyped instead, so the result is always plain
+dicts/lists, as with json.load.
+
+Decoding runs with the cyclic garbage collector paused: a results file becomes millions
+of lists/dicts, and the collections they trigger cost more than the decoding itself
+(e.g. 57 MB: msgspec 2.7s -> 0.5s, stdlib 3.4s -> 1.2s). The decoded tree has no cycles,
+so nothing is leaked.
+
+Output is compact by default; indent=2 gives the same layout as json.dump(indent=2).
+The backends differ only in number formatting details (e.g. orjson/msgspec write NaN as
+null), and every backend reads what any other wrote.
+"""
+
+import gc
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, TypedDict, Union
+
+try:
+    import orjson
+except ImportError:  # orjson 없으면 msgspec 또는 stdlib
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec 없으면 orjson 또는 stdlib
+    msgspec = None
+
+if os.environ.get("JSON_BACKEND", "").lower() == "json":
+    orjson = msgspec = None
+
+DECODER = "msgspec" if msgspec is not None else "orjson" if orjson is not None else "json"
+ENCODER = "orjson" if orjson is not None else "msgspec" if msgspec is not None else "json"
+
+# ---------- results_*.json 스키마 (msgspec typed decode) ----------
+if msgspec is not None:
+    class _Instance(TypedDict, total=False):
+        bbox: List[Any]
+        bbox_score: Optional[float]
+        score: Optional[float]
+        keypoints: List[Any]
+        keypoint_scores: List[Any]
+        track_id: Any
+        tracking_id: Any
+        id: Any
+        person_id: Any
+
+    class _Frame(TypedDict, total=False):
+        frame_id: int
+        instances: List[_Instance]
+
+    class _Results(TypedDict, total=False):
+        meta_info: Dict[str, Any]
+        instance_info: List[_Frame]
+
+    _decode = msgspec.json.Decoder().decode
+    _decode_results = msgspec.json.Decoder(_Results).decode
+    _decode_frames = msgspec.json.Decoder(Union[List[_Frame], _Results]).decode
+    _encode = msgspec.json.Encoder().encode
+else:
+    _decode_results = _decode_frames = None
+
+# ---------- decode ----------
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """디코딩 중에는 순환 GC 를 멈춘다 (이미 꺼져 있으면 그대로)"""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+def loads(data: Union[bytes, str]) -> Any:
+    with _gc_paused():
+        if msgspec is not None:
+            return _decode(data)
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def load(path: str) -> Any:
+    return loads(_read(path))
+
+def _load_typed(path: str, decode) -> Any:
+    data = _read(path)
+    if decode is not None:
+        try:
+            with _gc_paused():
+                return decode(data)
+        except msgspec.ValidationError:
+            pass  # 스키마와 다름 (frame_id 가 float 등) → 타입 없이 디코딩
+    return loads(data)
+
+def load_results(path: str) -> Any:
+    """RTMPose3D results_*.json ({"meta_info", "instance_info"}) 을 스키마 필드만 남겨 로드"""
+    return _load_typed(path, _decode_results)
+
+def load_frames(path: str) -> Any:
+    """프레임 리스트 [{"frame_id", "instances"}, ...] 또는 results 형식을 스키마 필드만 남겨 로드"""
+    return _load_typed(path, _decode_frames)
+
+# ---------- encode ----------
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def dumps(obj: Any, indent: Optional[int] = None) -> bytes:
+    """UTF-8 bytes. indent=None 이면 공백 없는 compact, 2 이면 json.dump(indent=2) 와 같은 배치"""
+    if orjson is not None and indent in (None, 2):
+        return orjson.dumps(obj, option=_ORJSON_OPTS | (orjson.OPT_INDENT_2 if indent else 0))
+    if msgspec is not None:
+        out = _encode(obj)
+        return msgspec.json.format(out, indent=indent) if indent else out
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=indent).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def dump(obj: Any, path: str, indent: Optional[int] = None) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(dumps(obj, indent))
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Opt-in per-stage timing for convert_4bot / json_plus_track / json2_shiftgcn.
+
+The converters mark their phases with module-level helpers that do nothing (one global
+lookup) unless a run enabled instrumentation:
+
+    with instrument.stage("parse"):
+        data = json.load(f)
+    instrument.count("instances", len(insts))
+    for entry in instrument.timed_iter("parse", iter_instance_info(path)):   # time spent in next()
+        ...
+
+Stage names used by the converters: parse, filter, match, serialize, write, build.
+Stages should not nest; an inner stage's time is also counted in the outer one.
+
+Enabled from the CLI (add_instrument_args / setup):
+  --instrument REPORT.json   write the report below when the process exits
+  --profile-dir DIR          also run cProfile per stage, DIR/<stage>.prof (pstats format;
+                             python -m pstats DIR/parse.prof)
+
+Report:
+  {"tool": str, "argv": [...], "started": iso time, "wall_seconds": float,
+   "files":  {input: {"seconds": float, "stages": {name: {"seconds", "calls"}}, "counters": {...}}},
+   "totals": {"seconds": float, "stages": {...}, "counters": {...}},
+   "profiles": {stage: path}}
+
+Work done in worker processes is attributed per input file: wrap the task function with
+per_file(fn) before submitting and pass each result through collect().
+"""
+
+import atexit
+import cProfile
+import glob
+import json
+import os
+import pstats
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+_NULL = nullcontext()
+_NO_FILE = "-"
+
+def _empty_record() -> Dict[str, Any]:
+    return {"stages": {}, "counters": {}}
+
+def _merge_record(dst: Dict[str, Any], src: Dict[str, Any]) -> None:
+    for name, s in src["stages"].items():
+        d = dst["stages"].setdefault(name, {"seconds": 0.0, "calls": 0})
+        d["seconds"] += s["seconds"]
+        d["calls"] += s["calls"]
+    for name, n in src["counters"].items():
+        dst["counters"][name] = dst["counters"].get(name, 0) + n
+
+class Instrument:
+    def __init__(self, tool: str = "", profile_dir: Optional[str] = None):
+        self.tool = tool
+        self.profile_dir = profile_dir
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._file = _NO_FILE
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._profiling = False
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    def _record(self) -> Dict[str, Any]:
+        rec = self.files.get(self._file)
+        if rec is None:
+            rec = self.files[self._file] = _empty_record()
+        return rec
+
+    @contextmanager
+    def file(self, name: str) -> Iterator[None]:
+        """이 블록 안의 stage/count 를 입력 파일 name 에 기록"""
+        prev, self._file = self._file, str(name)
+        try:
+            yield
+        finally:
+            self._file = prev
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        prof = None
+        if self.profile_dir and not self._profiling:   # cProfile 은 한 번에 하나만 켤 수 있다
+            prof = self._profiles.get(name)
+            if prof is None:
+                prof = self._profiles[name] = cProfile.Profile()
+            self._profiling = True
+            prof.enable()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            if prof is not None:
+                prof.disable()
+                self._profiling = False
+            s = self._record()["stages"].setdefault(name, {"seconds": 0.0, "calls": 0})
+            s["seconds"] += dt
+            s["calls"] += 1
+
+    def count(self, name: str, n: int = 1) -> None:
+        counters = self._record()["counters"]
+        counters[name] = counters.get(name, 0) + int(n)
+
+    def merge(self, files: Dict[str, Dict[str, Any]]) -> None:
+        """다른 프로세스에서 모은 files 기록을 합친다"""
+        for name, rec in files.items():
+            _merge_record(self.files.setdefault(name, _empty_record()), rec)
+
+    def dump_profiles(self, suffix: str = "") -> Dict[str, str]:
+        """profile_dir/<stage><suffix>.prof 로 저장하고 {stage: path} 반환"""
+        out = {}
+        for name, prof in self._profiles.items():
+            path = os.path.join(self.profile_dir, f"{name}{suffix}.prof")
+            prof.dump_stats(path)
+            out[name] = path
+        return out
+
+    def _combine_profiles(self) -> Dict[str, str]:
+        """이 프로세스의 프로파일과 워커가 남긴 <stage>.<pid>.<n>.prof 를 <stage>.prof 하나로 합친다"""
+        if not self.profile_dir:
+            return {}
+        self.dump_profiles()
+        parts: Dict[str, List[str]] = {}
+        for p in glob.glob(os.path.join(self.profile_dir, "*.*.*.prof")):
+            parts.setdefault(os.path.basename(p).split(".", 1)[0], []).append(p)
+        out = {}
+        for name in sorted(set(parts) | set(self._profiles)):
+            path = os.path.join(self.profile_dir, f"{name}.prof")
+            files = ([path] if name in self._profiles else []) + sorted(parts.get(name, []))
+            pstats.Stats(*files).dump_stats(path)
+            for p in parts.get(name, []):
+                os.remove(p)
+            out[name] = path
+        return out
+
+    def report(self) -> Dict[str, Any]:
+        totals = _empty_record()
+        files = {}
+        for name, rec in self.files.items():
+            _merge_record(totals, rec)
+            files[name] = {"seconds": round(sum(s["seconds"] for s in rec["stages"].values()), 6), **rec}
+        totals["seconds"] = round(sum(s["seconds"] for s in totals["stages"].values()), 6)
+        return {"tool": self.tool, "argv": sys.argv,
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "wall_seconds": round(time.perf_counter() - self._t0, 6),
+                "files": files, "totals": totals}
+
+    def save(self, path: str) -> Dict[str, Any]:
+        rep = self.report()
+        rep["profiles"] = self._combine_profiles()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rep, f, indent=2, ensure_ascii=False)
+        return rep
+
+def summary_lines(rep: Dict[str, Any]) -> List[str]:
+    """'[stats] parse 12.30s (41.2% of wall, 1 calls)' 형태의 요약 (시간 내림차순)"""
+    wall = rep["wall_seconds"] or 1e-12
+    stages = sorted(rep["totals"]["stages"].items(), key=lambda kv: -kv[1]["seconds"])
+    lines = [f"[stats] {name:<10} {s['seconds']:9.3f}s ({100 * s['seconds'] / wall:5.1f}% of wall, {s['calls']} calls)"
+             for name, s in stages]
+    lines.append(f"[stats] {'wall':<10} {rep['wall_seconds']:9.3f}s, {len(rep['files'])} file(s)")
+    if rep["totals"]["counters"]:
+        lines.append("[stats] " + ", ".join(f"{k}={v}" for k, v in sorted(rep["totals"]["counters"].items())))
+    return lines
+
+# ---------- 전역 on/off ----------
+_active: Optional[Instrument] = None
+
+def enable(tool: str = "", profile_dir: Optional[str] = None) -> Instrument:
+    global _active
+    _active = Instrument(tool, profile_dir)
+    return _active
+
+def disable() -> None:
+    global _active
+    _active = None
+
+def active() -> Optional[Instrument]:
+    return _active
+
+def stage(name: str):
+    return _NULL if _active is None else _active.stage(name)
+
+def count(name: str, n: int = 1) -> None:
+    if _active is not None:
+        _active.count(name, n)
+
+def file(name: str):
+    return _NULL if _active is None else _active.file(name)
+
+def timed_iter(name: str, it: Iterable[Any]) -> Iterator[Any]:
+    """it 의 next() 에 걸린 시간을 stage name 으로 기록 (비활성이면 it 그대로)"""
+    if _active is None:
+        yield from it
+        return
+    it = iter(it)
+    while True:
+        with _active.stage(name):
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+        yield item
+
+# ---------- 워커 프로세스 ----------
+class _Remote:
+    """워커에서 돌아온 (결과, 기록)"""
+    def __init__(self, result: Any, files: Dict[str, Dict[str, Any]]):
+        self.result = result
+        self.files = files
+
+class _FileTask:
+    """
+    fn(*args) 를 args[0] (입력 파일) 의 기록으로 실행한다.
+    워커 프로세스에서는 새 Instrument 로 기록하고 프로파일은 <stage>.<pid>.<n>.prof 로 남긴다.
+    """
+    def __init__(self, fn: Callable[..., Any], tool: str, profile_dir: Optional[str]):
+        self.fn = fn
+        self.tool = tool
+        self.profile_dir = profile_dir
+        self.parent_pid = os.getpid()
+
+    def __call__(self, *args: Any) -> Any:
+        if os.getpid() == self.parent_pid and _active is not None:
+            with _active.file(args[0]):
+                return self.fn(*args)
+        inst = enable(self.tool, self.profile_dir)
+        try:
+            with inst.file(args[0]):
+                result = self.fn(*args)
+            if self.profile_dir:
+                inst.dump_profiles(f".{os.getpid()}.{time.perf_counter_ns()}")
+            return _Remote(result, inst.files)
+        finally:
+            disable()
+
+def per_file(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """활성 상태면 fn 을 파일별 기록 래퍼로 감싼다 (pickle 가능, 비활성이면 fn 그대로)"""
+    if _active is None:
+        return fn
+    return _FileTask(fn, _active.tool, _active.profile_dir)
+
+def collect(result: Any) -> Any:
+    """per_file 로 감싼 작업의 결과에서 워커 기록을 합치고 원래 결과를 돌려준다"""
+    if isinstance(result, _Remote):
+        if _active is not None:
+            _active.merge(result.files)
+        return result.result
+    return result
+
+# ---------- CLI ----------
+def add_instrument_args(ap) -> None:
+    ap.add_argument("--instrument", default=None, metavar="REPORT.json",
+                    help="Record per-stage time/counters per input file and write a JSON report on exit")
+    ap.add_argument("--profile-dir", default=None,
+                    help="With --instrument: also cProfile every stage into DIR/<stage>.prof")
+
+def setup(args, tool: str) -> Optional[Instrument]:
+    """--instrument 가 있으면 켜고, 프로세스 종료 시 리포트 저장 + 요약 출력"""
+    if not getattr(args, "instrument", None):
+        return None
+    inst = enable(tool, args.profile_dir)
+
+    def _finish() -> None:
+        rep = inst.save(args.instrument)
+        for line in summary_lines(rep):
+            print(line, file=sys.stderr)
+        print(f"[OK] instrument report: {args.instrument}", file=sys.stderr)
+
+    atexit.register(_finish)
+    return inst
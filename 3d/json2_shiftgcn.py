@@ -17,6 +17,39 @@ Naming scheme for output files:
     n = --action-index  (zero-padded by --pad-n, default 3)
     m = sequential number starting from --start-num (zero-padded by --pad-m, default 3)
 
+Tensor export (--export-tensor NAME):
+  Instead of .skeleton text, write the Shift-GCN training arrays directly into --outdir,
+  in the same layout as Shift-GCN's NTU data generator:
+    NAME_data_joint.npy : float32 (N, C=3, T=--max-frames, V=--joints, M=--max-bodies), zero padded
+    NAME_label.pkl      : pickle of (sample_names, labels), label = --action-index - 1
+  Bodies are chosen per track_id: the --max-bodies tracks with the largest motion energy
+  (sum of x/y/z std over non-zero frames), frames beyond --max-frames are dropped.
+
+Windowed clips (--export-tensor NAME --window T [--stride S | --overlap O]):
+  Each track of each video is cut into fixed-length windows instead (one person per sample):
+    NAME_data_joint.npy : float32 (N, 3, T, V, 1), one row per window
+    NAME_label.pkl      : (sample_names, labels), names like 001A001_t3_f000120
+                          (video name, track_id, first frame index of the window)
+    NAME_index.npy      : int64 (N, 3) = (input file index, track_id, first frame index)
+  A track's sequence spans its first to last frame (zeros where it is missing); windows
+  start every S frames (default T // 2, i.e. 50% overlap) and are kept when the track is
+  present in at least --min-coverage of their frames. Windows are strided views of the
+  sequence (numpy sliding_window_view) that are copied once, into the output file.
+
+Ragged sequences (--export-sequences NAME):
+  Every track's whole sequence, concatenated along the frame axis (no padding):
+    NAME_seq_joint.npy   : float32 (total_frames, V, 3)
+    NAME_seq_offsets.npy : int64 (N+1,), sample i = rows [offsets[i], offsets[i+1])
+    NAME_seq_label.pkl   : (sample_names, labels), names like 001A001_t3
+    NAME_seq_index.npy   : int64 (N, 3) as for windows
+  (own file names, so a window export with the same NAME in the same --outdir is kept intact)
+  skeleton_dataset.SkeletonDataset reads both layouts through np.memmap.
+
+Each input is loaded as a pose_sequence.PoseSequence (struct-of-arrays: keypoints
+(N,V,3), track ids, per-frame offsets), so the per-joint lists of the JSON are dropped
+right after decoding and every export works on whole columns. JSON values are kept as
+float64 and stores as float32, so the text is the same as from the frame dicts.
+
 Key constraints:
 - Every instance must have exactly --joints keypoints. If not, stop with an error.
 - By default, any keypoint values are considered "valid".
@@ -25,12 +58,23 @@ Key constraints:
 """
 
 import argparse
-import json
+import os
+import pickle
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 import glob as _glob
 
+import numpy as np
+
+import fastjson
+import instrument
+from cache_manifest import CacheManifest, fingerprint
+from kps_store import is_store_dir, open_store, store_to_frames
+from pose_sequence import PoseSequence, load_sequence
+
 TrackIdKeys = ("track_id", "tracking_id", "id", "person_id")
 
 # ---------------------------
@@ -38,21 +82,27 @@ TrackIdKeys = ("track_id", "tracking_id", "id", "person_id")
 # ---------------------------
 
 def list_input_files(input_arg: str) -> List[Path]:
-    """Return sorted list of JSON files from a path/glob (absolute/relative, ** supported)."""
+    """
+    Return sorted list of inputs from a path/glob (absolute/relative, ** supported).
+    Inputs are JSON files or keypoint store directories (json_plus_track --format store).
+    """
     p = Path(input_arg)
     files: List[Path] = []
 
     if any(ch in input_arg for ch in "*?[]"):
         for f in _glob.glob(input_arg, recursive=True):
             fp = Path(f)
-            if fp.is_file() and fp.suffix.lower() == ".json":
+            if (fp.is_file() and fp.suffix.lower() == ".json") or is_store_dir(str(fp)):
                 files.append(fp)
+    elif is_store_dir(str(p)):
+        files = [p]
     elif p.is_dir():
         files = [fp for fp in p.rglob("*.json") if fp.is_file()]
+        files += [fp.parent for fp in p.rglob("frame_offsets.npy") if is_store_dir(str(fp.parent))]
     elif p.is_file() and p.suffix.lower() == ".json":
         files = [p]
     else:
-        raise FileNotFoundError(f"Input not found or not a .json: {input_arg}")
+        raise FileNotFoundError(f"Input not found or not a .json / keypoint store: {input_arg}")
 
     return sorted(files, key=lambda x: str(x.resolve()))
 
@@ -61,8 +111,25 @@ def list_input_files(input_arg: str) -> List[Path]:
 # ---------------------------
 
 def load_json(path: Path) -> Any:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    """Decode with fastjson; only the frame/instance fields used here are materialised."""
+    return fastjson.load_frames(str(path))
+
+def load_frames(path: Path) -> List[Dict[str, Any]]:
+    """Load frames from a JSON file or a keypoint store directory."""
+    with instrument.stage("parse"):
+        if is_store_dir(str(path)):
+            frames = store_to_frames(open_store(str(path)))
+        else:
+            frames = extract_frames(load_json(path))
+    instrument.count("frames", len(frames))
+    return frames
+
+def load_pose_sequence(path: Path) -> PoseSequence:
+    """Load a JSON file or keypoint store as an array-backed PoseSequence (no per-joint Python objects)."""
+    with instrument.stage("parse"):
+        seq = load_sequence(str(path))
+    instrument.count("frames", seq.num_frames)
+    return seq
 
 def extract_frames(obj: Any) -> List[Dict[str, Any]]:
     """
@@ -146,6 +213,41 @@ def next_free_outpath(
             return path, m
         m += 1
 
+class NameAllocator:
+    """
+    Hand out free 00nA00m names from memory.
+
+    The output directory is listed once; the m values already used for this action index
+    (with the same zero padding and extension) are kept in a set, so allocating a name costs
+    no filesystem calls, unlike probing path.exists() per candidate in next_free_outpath.
+    Names handed out are recorded as used, so later allocations never collide with them.
+    """
+
+    def __init__(self, out_dir: Path, action_index: int, pad_n: int, pad_m: int, ext: str):
+        self.out_dir = Path(out_dir)
+        self.action_index = action_index
+        self.pad_n = pad_n
+        self.pad_m = pad_m
+        self.ext = ext
+        n_str = str(action_index).zfill(pad_n)
+        pattern = re.compile(rf"^{re.escape(n_str)}A(\d+){re.escape(ext)}$")
+        self.used = set()
+        if self.out_dir.is_dir():
+            for entry in os.scandir(self.out_dir):
+                mt = pattern.match(entry.name)
+                if mt and mt.group(1) == str(int(mt.group(1))).zfill(pad_m):
+                    self.used.add(int(mt.group(1)))
+
+    def allocate(self, start_m: int, overwrite: bool = False) -> Tuple[Path, int]:
+        """Same result as next_free_outpath(start_m, overwrite) against the scanned directory."""
+        m = start_m
+        if not overwrite:
+            while m in self.used:
+                m += 1
+        self.used.add(m)
+        name = build_name(self.action_index, m, self.pad_n, self.pad_m)
+        return self.out_dir / f"{name}{self.ext}", m
+
 # ---------------------------
 # Core conversion
 # ---------------------------
@@ -197,6 +299,311 @@ def convert_frames_to_lines(
 
     return lines
 
+# ---------------------------
+# Streaming writer
+# ---------------------------
+
+def kpts_array(kpts: Any) -> np.ndarray:
+    """Like normalize_kpts, but returns a (V,3) float64 array in one NumPy conversion."""
+    if isinstance(kpts, list) and len(kpts) == 1 and isinstance(kpts[0], list):
+        kpts = kpts[0]
+    try:
+        arr = np.asarray(kpts, dtype=np.float64)
+    except (ValueError, TypeError):
+        arr = None
+    if arr is None or arr.ndim != 2 or arr.shape[1] < 3:
+        # ragged / malformed input: defer to normalize_kpts for validation and error messages
+        return np.asarray(normalize_kpts(kpts), dtype=np.float64).reshape(-1, 3)
+    return arr[:, :3]
+
+def iter_skeleton_chunks(
+    frames: List[Dict[str, Any]],
+    joints: int,
+    require_nonzero: bool = False,
+) -> Iterator[str]:
+    """
+    Same text as convert_frames_to_lines (joined with newlines), yielded one frame at a time:
+    first "T\n", then per frame "N\n" followed by each person's block.
+    Thin wrapper over PoseSequence.skeleton_chunks (float64, so JSON values print exactly).
+    """
+    return PoseSequence.from_frames(frames, dtype=np.float64).skeleton_chunks(joints, require_nonzero)
+
+def write_skeleton(
+    frames: List[Dict[str, Any]],
+    out_path: Path,
+    joints: int,
+    require_nonzero: bool = False,
+    buffer_size: int = 1 << 20,
+) -> None:
+    """
+    Stream the skeleton text to out_path through a buffered handle (bounded memory).
+    Written to <out_path>.tmp first, so a validation error never leaves a partial file.
+    """
+    write_skeleton_chunks(iter_skeleton_chunks(frames, joints, require_nonzero), out_path, buffer_size)
+
+def write_skeleton_chunks(chunks: Iterable[str], out_path: Path, buffer_size: int = 1 << 20) -> None:
+    """Write skeleton text chunks (iter_skeleton_chunks / PoseSequence.skeleton_chunks) like write_skeleton."""
+    out_path = Path(out_path)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8", buffering=buffer_size) as f:
+            for chunk in instrument.timed_iter("serialize", chunks):
+                with instrument.stage("write"):
+                    f.write(chunk)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, out_path)
+
+# ---------------------------
+# Parallel execution
+# ---------------------------
+
+def _ordered_map(fn, arg_tuples: List[Tuple], workers: int) -> Iterator[Any]:
+    """
+    Yield fn(*args) for each tuple in input order. workers > 1 runs them in a process pool;
+    the first exception is re-raised (in input order) and pending work is cancelled.
+    With --instrument, each call is recorded under its first argument (the input file).
+    """
+    fn = instrument.per_file(fn)
+    if workers <= 1:
+        for a in arg_tuples:
+            yield fn(*a)
+        return
+    ex = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [ex.submit(fn, *a) for a in arg_tuples]
+        for fut in futures:
+            yield instrument.collect(fut.result())
+    finally:
+        ex.shutdown(wait=True, cancel_futures=True)
+
+def _convert_one(in_fp: Path, out_path: Path, joints: int, require_nonzero: bool,
+                 with_fingerprint: bool = False) -> Tuple[Path, List[Dict[str, Any]]]:
+    fps = [fingerprint(p) for p in cache_input_files(in_fp)] if with_fingerprint else []
+    write_skeleton_chunks(load_pose_sequence(in_fp).skeleton_chunks(joints, require_nonzero), out_path)
+    return out_path, fps
+
+def cache_input_files(in_fp: Path) -> List[str]:
+    """Files whose content defines an input: the JSON itself, or every .npy of a keypoint store."""
+    if is_store_dir(str(in_fp)):
+        return sorted(str(p) for p in Path(in_fp).glob("*.npy"))
+    return [str(in_fp)]
+
+# ---------------------------
+# Tensor export (N, C, T, V, M)
+# ---------------------------
+
+def frames_to_tensor(
+    frames: List[Dict[str, Any]],
+    joints: int,
+    max_frames: int = 300,
+    max_bodies: int = 2,
+    require_nonzero: bool = False,
+) -> np.ndarray:
+    """Return one sample as float32 (C=3, max_frames, joints, max_bodies). Wrapper over PoseSequence.to_tensor."""
+    seq = PoseSequence.from_frames(frames[:max_frames], dtype=np.float64)
+    return seq.to_tensor(joints, max_frames, max_bodies, require_nonzero)
+
+def track_sequences(
+    frames: List[Dict[str, Any]],
+    joints: int,
+    require_nonzero: bool = False,
+) -> Dict[int, Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Per track: (first frame index, (F,V,3) float32 keypoints, (F,) bool present),
+    F = last - first + 1 frames of the video, zeros where the track is missing.
+    Instances with a negative track_id are skipped. Wrapper over PoseSequence.track_sequences.
+    """
+    return PoseSequence.from_frames(frames, dtype=np.float64).track_sequences(joints, require_nonzero)
+
+def track_windows(
+    seq: np.ndarray,
+    present: np.ndarray,
+    window: int,
+    stride: int,
+    min_coverage: float = 0.5,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    seq (F,V,3) -> windows (n,3,T,V) as a strided view of seq (no copy unless F < T
+    or some windows are filtered out), and their start offsets (n,).
+    """
+    if len(seq) < window:  # short track: one zero-padded window
+        pad = window - len(seq)
+        seq = np.concatenate([seq, np.zeros((pad,) + seq.shape[1:], dtype=seq.dtype)])
+        present = np.concatenate([present, np.zeros(pad, dtype=bool)])
+    starts = np.arange(0, len(seq) - window + 1, stride)
+    views = np.lib.stride_tricks.sliding_window_view(seq, window, axis=0)[::stride]   # (n,V,3,T)
+    csum = np.concatenate([[0], np.cumsum(present)])
+    keep = (csum[starts + window] - csum[starts]) >= min_coverage * window
+    views = views.transpose(0, 2, 3, 1)                                               # (n,3,T,V)
+    if keep.all():
+        return views, starts
+    return views[keep], starts[keep]
+
+def _sequences_one(in_fp: Path, joints: int, require_nonzero: bool) -> Dict[int, Tuple[int, np.ndarray, np.ndarray]]:
+    seq = load_pose_sequence(in_fp)
+    with instrument.stage("build"):
+        return seq.track_sequences(joints, require_nonzero)
+
+def export_windows(
+    files: List[Path],
+    outdir: Path,
+    name: str,
+    sample_names: List[str],
+    label: int,
+    joints: int,
+    window: int,
+    stride: int,
+    min_coverage: float = 0.5,
+    require_nonzero: bool = False,
+    workers: int = 1,
+    chunk_windows: int = 4096,
+) -> Tuple[Path, Path, Path]:
+    """
+    Write NAME_data_joint.npy (N,3,T,V,1), NAME_label.pkl and NAME_index.npy for
+    per-track windows of every input. Track sequences are built in worker processes;
+    windows are appended to a temporary raw file as they arrive (like export_sequences),
+    so memory holds one input at a time.
+    """
+    data_path = outdir / f"{name}_data_joint.npy"
+    label_path = outdir / f"{name}_label.pkl"
+    index_path = outdir / f"{name}_index.npy"
+    raw_path = outdir / f".{name}_data_joint.bin"
+
+    index: List[np.ndarray] = []
+    names: List[str] = []
+    args = [(fp, joints, require_nonzero) for fp in files]
+    try:
+        with raw_path.open("wb") as raw:
+            for i, tracks in enumerate(_ordered_map(_sequences_one, args, workers)):
+                for tid in sorted(tracks):
+                    first, seq, present = tracks[tid]
+                    with instrument.file(files[i]), instrument.stage("build"):
+                        views, starts = track_windows(seq, present, window, stride, min_coverage)
+                    if not len(views):
+                        continue
+                    with instrument.file(files[i]), instrument.stage("write"):
+                        for a in range(0, len(views), chunk_windows):   # 겹치는 윈도우는 복사하면 T/stride 배
+                            np.ascontiguousarray(views[a:a + chunk_windows], dtype=np.float32).tofile(raw)
+                    instrument.count("windows", len(views))
+                    index.append(np.stack([np.full(len(starts), i), np.full(len(starts), tid), first + starts], axis=1))
+                    names.extend(f"{sample_names[i]}_t{tid}_f{first + s:06d}" for s in starts.tolist())
+                del tracks
+
+        total = len(names)
+        data = np.lib.format.open_memmap(
+            str(data_path), mode="w+", dtype=np.float32, shape=(total, 3, window, joints, 1),
+        )
+        with instrument.stage("write"), raw_path.open("rb") as raw:
+            for a in range(0, total, chunk_windows):
+                b = min(total, a + chunk_windows)
+                data[a:b] = np.fromfile(raw, dtype=np.float32, count=(b - a) * 3 * window * joints).reshape(
+                    b - a, 3, window, joints, 1)
+        data.flush()
+        del data
+    finally:
+        if raw_path.exists():
+            raw_path.unlink()
+
+    np.save(index_path, np.concatenate(index).astype(np.int64) if index else np.zeros((0, 3), dtype=np.int64))
+    write_label_pkl(label_path, names, [label] * total)
+    return data_path, label_path, index_path
+
+def export_sequences(
+    files: List[Path],
+    outdir: Path,
+    name: str,
+    sample_names: List[str],
+    label: int,
+    joints: int,
+    require_nonzero: bool = False,
+    workers: int = 1,
+    chunk_frames: int = 65536,
+) -> Tuple[Path, Path, Path, Path]:
+    """
+    Write NAME_seq_joint.npy (total_frames,V,3) + NAME_seq_offsets.npy (N+1,) with one
+    sample per track, plus NAME_seq_label.pkl and NAME_seq_index.npy. Sequences are appended
+    to a temporary raw file as they arrive, so memory holds one input at a time.
+    """
+    data_path = outdir / f"{name}_seq_joint.npy"
+    offsets_path = outdir / f"{name}_seq_offsets.npy"
+    label_path = outdir / f"{name}_seq_label.pkl"
+    index_path = outdir / f"{name}_seq_index.npy"
+    raw_path = outdir / f".{name}_seq_joint.bin"
+
+    offsets = [0]
+    index: List[Tuple[int, int, int]] = []
+    names: List[str] = []
+    args = [(fp, joints, require_nonzero) for fp in files]
+    try:
+        with raw_path.open("wb") as raw:
+            for i, tracks in enumerate(_ordered_map(_sequences_one, args, workers)):
+                for tid in sorted(tracks):
+                    first, seq, _ = tracks[tid]
+                    with instrument.file(files[i]), instrument.stage("write"):
+                        seq.tofile(raw)
+                    offsets.append(offsets[-1] + len(seq))
+                    index.append((i, tid, first))
+                    names.append(f"{sample_names[i]}_t{tid}")
+
+        total = offsets[-1]
+        data = np.lib.format.open_memmap(str(data_path), mode="w+", dtype=np.float32, shape=(total, joints, 3))
+        with instrument.stage("write"), raw_path.open("rb") as raw:
+            for a in range(0, total, chunk_frames):
+                b = min(total, a + chunk_frames)
+                data[a:b] = np.fromfile(raw, dtype=np.float32, count=(b - a) * joints * 3).reshape(b - a, joints, 3)
+        data.flush()
+        del data
+    finally:
+        if raw_path.exists():
+            raw_path.unlink()
+
+    np.save(offsets_path, np.asarray(offsets, dtype=np.int64))
+    np.save(index_path, np.asarray(index, dtype=np.int64).reshape(-1, 3))
+    write_label_pkl(label_path, names, [label] * len(names))
+    return data_path, offsets_path, label_path, index_path
+
+def _tensor_one(in_fp: Path, joints: int, max_frames: int, max_bodies: int, require_nonzero: bool) -> np.ndarray:
+    seq = load_pose_sequence(in_fp)
+    with instrument.stage("build"):
+        return seq.to_tensor(joints, max_frames, max_bodies, require_nonzero)
+
+def write_label_pkl(path: Path, sample_names: List[str], labels: List[int]) -> None:
+    with Path(path).open("wb") as f:
+        pickle.dump((sample_names, list(labels)), f)
+
+def export_tensor(
+    files: List[Path],
+    outdir: Path,
+    name: str,
+    sample_names: List[str],
+    label: int,
+    joints: int,
+    max_frames: int,
+    max_bodies: int,
+    require_nonzero: bool = False,
+    workers: int = 1,
+) -> Tuple[Path, Path]:
+    """
+    Write NAME_data_joint.npy (memory-mapped while filling) and NAME_label.pkl.
+    With workers > 1, samples are built in worker processes and written back in input order.
+    """
+    data_path = outdir / f"{name}_data_joint.npy"
+    label_path = outdir / f"{name}_label.pkl"
+    data = np.lib.format.open_memmap(
+        str(data_path), mode="w+", dtype=np.float32,
+        shape=(len(files), 3, max_frames, joints, max_bodies),
+    )
+    args = [(fp, joints, max_frames, max_bodies, require_nonzero) for fp in files]
+    for i, sample in enumerate(_ordered_map(_tensor_one, args, workers)):
+        with instrument.file(files[i]), instrument.stage("write"):
+            data[i] = sample
+    data.flush()
+    del data
+    write_label_pkl(label_path, sample_names, [label] * len(files))
+    return data_path, label_path
+
 # ---------------------------
 # CLI
 # ---------------------------
@@ -206,7 +613,7 @@ def main():
         description="Convert frame-wise JSON to Shift-GCN skeleton text (N = count of valid persons)."
     )
     ap.add_argument("--input", required=True,
-                    help="Input file, directory, or glob pattern (absolute/relative, ** supported).")
+                    help="Input JSON / keypoint store dir, directory, or glob pattern (absolute/relative, ** supported).")
     ap.add_argument("--outdir", required=True, help="Output directory (single fixed folder).")
     ap.add_argument("--joints", type=int, required=True, help="Joint count V (e.g., 17).")
 
@@ -225,7 +632,42 @@ def main():
     ap.add_argument("--require-nonzero", action="store_true", default=False,
                     help="Exclude persons whose ALL joints are (0,0,0) from N and from output.")
 
+    # Tensor export
+    ap.add_argument("--export-tensor", default=None, metavar="NAME",
+                    help="Write NAME_data_joint.npy (N,C,T,V,M) + NAME_label.pkl instead of .skeleton files.")
+    ap.add_argument("--export-sequences", default=None, metavar="NAME",
+                    help="Write every track's whole sequence as NAME_seq_joint.npy + NAME_seq_offsets.npy (ragged).")
+    ap.add_argument("--max-frames", type=int, default=300, help="T for --export-tensor (default: 300).")
+    ap.add_argument("--max-bodies", type=int, default=2, help="M for --export-tensor (default: 2).")
+    ap.add_argument("--window", type=int, default=None, metavar="T",
+                    help="With --export-tensor: cut each track into T-frame windows (N,3,T,V,1).")
+    win_step = ap.add_mutually_exclusive_group()
+    win_step.add_argument("--stride", type=int, default=None, help="Window start step (default: T // 2).")
+    win_step.add_argument("--overlap", type=int, default=None, help="Frames shared by consecutive windows (stride = T - overlap).")
+    ap.add_argument("--min-coverage", type=float, default=0.5,
+                    help="Keep a window if the track is present in at least this fraction of its frames (default: 0.5).")
+
+    # Parallelism
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Convert files in N worker processes; output names stay in input order (default: 1).")
+    ap.add_argument("--cache", action="store_true", default=False,
+                    help="Skip inputs whose content and options match the cache manifest in --outdir.")
+    instrument.add_instrument_args(ap)
+
     args = ap.parse_args()
+    instrument.setup(args, "json2_shiftgcn")
+
+    if args.export_tensor and args.export_sequences:
+        ap.error("--export-tensor and --export-sequences are mutually exclusive")
+    if args.window is not None:
+        if not args.export_tensor:
+            ap.error("--window requires --export-tensor NAME")
+        if args.overlap is not None:
+            args.stride = args.window - args.overlap
+        elif args.stride is None:
+            args.stride = max(1, args.window // 2)
+        if args.window < 1 or args.stride < 1:
+            ap.error("--window and --stride must be >= 1 (--overlap must be < --window)")
 
     outdir = Path(args.outdir)
     outdir.mkdir(parents=True, exist_ok=True)
@@ -236,36 +678,98 @@ def main():
         sys.exit(1)
 
     next_m = args.start_num
+    manifest = CacheManifest.for_dir(str(outdir)) if args.cache else None
+    options = {"joints": args.joints, "require_nonzero": args.require_nonzero,
+               "action_index": args.action_index, "pad_n": args.pad_n, "pad_m": args.pad_m, "ext": args.ext}
+
+    if args.export_tensor or args.export_sequences:
+        names = [build_name(args.action_index, args.start_num + i, args.pad_n, args.pad_m)
+                 for i in range(len(files))]
+        if args.export_sequences:
+            data_path = outdir / f"{args.export_sequences}_seq_joint.npy"
+        else:
+            data_path = outdir / f"{args.export_tensor}_data_joint.npy"
+        if manifest is not None:
+            key = f"json2_shiftgcn:tensor:{data_path.resolve()}"
+            inputs = [p for fp in files for p in cache_input_files(fp)]
+            options.update(start_num=args.start_num, max_frames=args.max_frames, max_bodies=args.max_bodies)
+            if args.window is not None:
+                options.update(window=args.window, stride=args.stride, min_coverage=args.min_coverage)
+            if manifest.is_fresh(key, inputs, options):
+                manifest.save()
+                print(f"[SKIP] up to date: {data_path}")
+                return
+            in_fps = [fingerprint(p) for p in inputs]
+        try:
+            if args.export_sequences:
+                outputs = export_sequences(
+                    files, outdir, args.export_sequences, names,
+                    label=args.action_index - 1,
+                    joints=args.joints,
+                    require_nonzero=args.require_nonzero,
+                    workers=args.workers,
+                )
+            elif args.window is not None:
+                outputs = export_windows(
+                    files, outdir, args.export_tensor, names,
+                    label=args.action_index - 1,
+                    joints=args.joints,
+                    window=args.window,
+                    stride=args.stride,
+                    min_coverage=args.min_coverage,
+                    require_nonzero=args.require_nonzero,
+                    workers=args.workers,
+                )
+            else:
+                outputs = export_tensor(
+                    files, outdir, args.export_tensor, names,
+                    label=args.action_index - 1,
+                    joints=args.joints,
+                    max_frames=args.max_frames,
+                    max_bodies=args.max_bodies,
+                    require_nonzero=args.require_nonzero,
+                    workers=args.workers,
+                )
+        except Exception as e:
+            print(f"[ERROR] {e}", file=sys.stderr)
+            sys.exit(1)
+        if manifest is not None:
+            manifest.record(key, in_fps, options, [str(p) for p in outputs])
+            manifest.save()
+        for p in outputs:
+            print(p)
+        return
 
     try:
+        # Names are allocated up front in input order, so they do not depend on --workers.
+        allocator = NameAllocator(outdir, args.action_index, args.pad_n, args.pad_m, args.ext)
+        jobs = []
         for in_fp in files:
-            data = load_json(in_fp)
-            frames = extract_frames(data)
-            lines = convert_frames_to_lines(
-                frames=frames,
-                joints=args.joints,
-                require_nonzero=args.require_nonzero,
-            )
-
-            out_path, used_m = next_free_outpath(
-                out_dir=outdir,
-                action_index=args.action_index,
-                start_m=next_m,
-                pad_n=args.pad_n,
-                pad_m=args.pad_m,
-                ext=args.ext,
-                overwrite=args.overwrite,
-            )
+            if manifest is not None:
+                key = f"json2_shiftgcn:{Path(in_fp).resolve()}"
+                if manifest.is_fresh(key, cache_input_files(in_fp), options):
+                    print(f"[SKIP] up to date: {manifest.get(key)['outputs'][0]}")
+                    continue
+                entry = manifest.get(key)
+                if entry is not None and entry["options"] == options:
+                    # Modified input: rewrite the file it produced last time instead of taking a new name
+                    jobs.append((in_fp, Path(entry["outputs"][0]), args.joints, args.require_nonzero, True))
+                    continue
+            out_path, used_m = allocator.allocate(next_m, overwrite=args.overwrite)
             next_m = used_m + 1  # advance for the next file
+            jobs.append((in_fp, out_path, args.joints, args.require_nonzero, manifest is not None))
 
-            with out_path.open("w", encoding="utf-8") as f:
-                f.write("\n".join(lines) + "\n")
-
+        for (in_fp, *_), (out_path, in_fps) in zip(jobs, _ordered_map(_convert_one, jobs, args.workers)):
+            if manifest is not None:
+                manifest.record(f"json2_shiftgcn:{Path(in_fp).resolve()}", in_fps, options, [str(out_path)])
             print(out_path)
 
     except Exception as e:
         print(f"[ERROR] {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if manifest is not None:
+            manifest.save()
 
 if __name__ == "__main__":
     main()
@@ -8,29 +8,55 @@ BoT-SORT txt 결과를 RTMPose3D keypoint JSON에 병합하여
 - BoT-SORT TXT: frame,id,x,y,w,h,score, ... (MOTChallenge 형식)
 - keypoint JSON: [{ "frame_id": int, "instances": [ { "bbox":[x1,y1,x2,y2], ... }, ... ] }, ...]
 
-출력
-- track_id가 주입된 JSON
+출력 (--format)
+- store (기본): 컬럼형 스토어 디렉터리 (kps_store 참고)
+    frame_ids / frame_offsets / track_ids / bboxes_xyxy5 / keypoints_xyz / keypoint_scores (.npy)
+    np.load(mmap_mode='r') 로 복사 없이 읽힌다. json2_shiftgcn 입력으로 그대로 사용 가능.
+- json: track_id가 주입된 JSON (기존 형식, 기본 compact / --pretty 면 indent=2)
+JSON 입출력은 fastjson (orjson / msgspec 이 있으면 사용, 없으면 stdlib) 을 거친다.
 
 사용 예)
 python merge_tracks_into_keypoints.py \
   --botsort /path/to/2247456_botsort.txt \
   --keypoint /path/to/2247456_keypoint.json \
-  --out /path/to/2247456_keypoint_with_track.json
+  --out /path/to/2247456_keypoint_with_track.kps \
+  --matcher hungarian [--format json]
 """
 import argparse
 import csv
-import json
-from typing import Dict, List, Tuple
+import os
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+import fastjson
+import instrument
+from cache_manifest import CacheManifest, fingerprint
+from kps_store import StoreWriter
+
+try:
+    from scipy.optimize import linear_sum_assignment as _scipy_lsa
+except ImportError:  # scipy 없으면 내장 JV 구현 사용
+    _scipy_lsa = None
 
 def parse_args():
     p = argparse.ArgumentParser()
     p.add_argument("--botsort", required=True, help="BoT-SORT 결과 txt (frame,id,x,y,w,h,...)")
     p.add_argument("--keypoint", required=True, help="RTMPose3D keypoint json")
-    p.add_argument("--out", required=True, help="출력 json 경로")
+    p.add_argument("--out", required=True, help="출력 경로 (store: 디렉터리, json: 파일)")
+    p.add_argument("--format", choices=["store", "json"], default="store",
+                   help="store: 컬럼형 .npy 스토어 디렉터리(기본) / json: 기존 indent JSON")
+    p.add_argument("--pretty", action="store_true",
+                   help="json 출력을 indent=2 로 기록 (기본: compact)")
+    p.add_argument("--cache", action="store_true",
+                   help="입력 내용/옵션이 출력 폴더의 cache manifest 와 같으면 건너뜀")
     p.add_argument("--min_iou", type=float, default=0.0,
                    help="IoU 매칭 최소 임계값(기본 0.0; 0보다 작지 않음)")
     p.add_argument("--use_center_fallback", action="store_true",
                    help="IoU 매칭 실패 시 중심점 거리로 보조 매칭 수행")
+    p.add_argument("--matcher", choices=MATCHERS, default="greedy",
+                   help="greedy: 기존 순서 의존 매칭 / hungarian: IoU 행렬 최적 할당 / batched: 비디오 전체 일괄 할당")
+    instrument.add_instrument_args(p)
     return p.parse_args()
 
 # ---------- 기본 유틸 ----------
@@ -77,91 +103,516 @@ def load_botsort(path: str) -> Dict[int, List[dict]]:
             frames.setdefault(frame, []).append(det)
     return frames
 
+class BotsortTracks:
+    """
+    MOT 결과를 frame 순으로 정렬한 struct-of-arrays + frame offset index.
+      frame_ids (F,)  : 등장하는 frame (오름차순)
+      offsets   (F+1,): frame_ids[i] 의 행은 [offsets[i], offsets[i+1])
+      track_ids (K,), bboxes_xyxy (K,4)
+    get(frame_id, default) 은 load_botsort 와 같은 list-of-dict 를 돌려주므로 기존 코드와 호환된다.
+    """
+    def __init__(self, frames: np.ndarray, track_ids: np.ndarray, bboxes_xyxy: np.ndarray):
+        frames = np.asarray(frames, dtype=np.int64).reshape(-1)
+        order = np.argsort(frames, kind="stable")  # 같은 frame 안에서는 파일 순서 유지
+        frames = frames[order]
+        self.track_ids = np.asarray(track_ids, dtype=np.int64).reshape(-1)[order]
+        self.bboxes_xyxy = boxes_array(bboxes_xyxy)[order]
+        self.frame_ids, starts = np.unique(frames, return_index=True)
+        self.offsets = np.append(starts, len(frames)).astype(np.int64)
+
+    @classmethod
+    def from_frames(cls, frames: Dict[int, List[dict]]) -> "BotsortTracks":
+        fr, tids, boxes = [], [], []
+        for fid, dets in frames.items():
+            for d in dets:
+                fr.append(fid)
+                tids.append(d["track_id"])
+                boxes.append(d["bbox_xyxy"])
+        return cls(np.asarray(fr, dtype=np.int64), np.asarray(tids, dtype=np.int64), boxes_array(boxes))
+
+    def __len__(self) -> int:
+        return len(self.frame_ids)
+
+    def __contains__(self, frame_id) -> bool:
+        return self._index(frame_id) >= 0
+
+    def keys(self):
+        return self.frame_ids.tolist()
+
+    def _index(self, frame_id: int) -> int:
+        i = int(np.searchsorted(self.frame_ids, frame_id))
+        return i if i < len(self.frame_ids) and self.frame_ids[i] == frame_id else -1
+
+    def frame_slice(self, frame_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(track_ids (n,), bboxes_xyxy (n,4)) — 복사 없는 view"""
+        i = self._index(frame_id)
+        if i < 0:
+            return self.track_ids[:0], self.bboxes_xyxy[:0]
+        s, e = self.offsets[i], self.offsets[i + 1]
+        return self.track_ids[s:e], self.bboxes_xyxy[s:e]
+
+    def get(self, frame_id: int, default=None):
+        if self._index(frame_id) < 0:
+            return default
+        tids, boxes = self.frame_slice(frame_id)
+        return [{"track_id": t, "bbox_xyxy": tuple(b)} for t, b in zip(tids.tolist(), boxes.tolist())]
+
+    def rows_for_frames(self, frame_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        frame_ids[f] 마다 해당 det 행을 모아 (f, slot, row) 배열로 반환 (비디오 전체 일괄 매칭용).
+        """
+        frame_ids = np.asarray(frame_ids, dtype=np.int64)
+        if len(self.frame_ids) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        pos = np.minimum(np.searchsorted(self.frame_ids, frame_ids), len(self.frame_ids) - 1)
+        hit = self.frame_ids[pos] == frame_ids
+        starts = np.where(hit, self.offsets[pos], 0)
+        counts = np.where(hit, self.offsets[pos + 1] - self.offsets[pos], 0)
+        f_idx = np.repeat(np.arange(len(frame_ids)), counts)
+        slot = np.arange(len(f_idx)) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows = np.repeat(starts, counts) + slot
+        return f_idx, slot, rows
+
+def load_botsort_array(path: str) -> BotsortTracks:
+    """
+    MOT txt 를 np.loadtxt 한 번으로 읽어 BotsortTracks 로 반환 (BoT-SORT는 xywh → xyxy 변환).
+    열 개수가 들쭉날쭉한 파일은 load_botsort 로 대체 파싱한다.
+    """
+    if os.path.getsize(path) == 0:
+        return BotsortTracks(np.zeros(0), np.zeros(0), np.zeros((0, 4)))
+    try:
+        raw = np.loadtxt(path, delimiter=",", usecols=range(6), dtype=np.float64, ndmin=2)
+    except ValueError:
+        return BotsortTracks.from_frames(load_botsort(path))
+    xywh = raw[:, 2:6]
+    xyxy = np.concatenate([xywh[:, :2], xywh[:, :2] + xywh[:, 2:]], axis=1)
+    return BotsortTracks(raw[:, 0].astype(np.int64), raw[:, 1].astype(np.int64), xyxy)
+
 def load_keypoint(path: str) -> List[dict]:
     """
     예상 구조: [ { "frame_id":int, "instances":[ {"bbox":[x1,y1,x2,y2], ...}, ... ] }, ... ]
+    그대로 다시 기록하므로 스키마 없이 (모든 필드 보존) 디코딩한다.
+    """
+    return fastjson.load(path)
+
+# ---------- 벡터화 비용 행렬 ----------
+def boxes_array(boxes) -> np.ndarray:
+    """list of (x1,y1,x2,y2) -> (N,4) float64"""
+    return np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a: (N,4), b: (M,4) xyxy -> (N,M) IoU (iou_xyxy 와 동일한 정의)"""
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0.0, None) * np.clip(iy2 - iy1, 0.0, None)
+    area_a = np.clip(a[:, 2] - a[:, 0], 0.0, None) * np.clip(a[:, 3] - a[:, 1], 0.0, None)
+    area_b = np.clip(b[:, 2] - b[:, 0], 0.0, None) * np.clip(b[:, 3] - b[:, 1], 0.0, None)
+    denom = area_a[:, None] + area_b[None, :] - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denom > 0, inter / denom, 0.0)
+
+def center_dist2_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a: (N,4), b: (M,4) xyxy -> (N,M) 중심점 거리 제곱"""
+    ca = 0.5 * (a[:, :2] + a[:, 2:])
+    cb = 0.5 * (b[:, :2] + b[:, 2:])
+    d = ca[:, None, :] - cb[None, :, :]
+    return (d ** 2).sum(-1)
+
+# ---------- 최적 할당 ----------
+def _lsa_shortest_path(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Jonker-Volgenant 계열 최단 증가 경로(포텐셜 u, v) 최소 비용 할당. cost: (n,m), n <= m.
+    열 방향 갱신은 NumPy로 벡터화되어 한 행당 O(n*m).
     """
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)    # p[j]: 열 j에 할당된 행 (1-based, 0=없음)
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            upd = free & (cur < minv[1:])
+            minv[1:][upd] = cur[upd]
+            way[1:][upd] = j0
+            cand = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(cand)) + 1
+            delta = cand[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:  # 증가 경로를 따라 할당 갱신
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    cols = np.flatnonzero(p[1:])
+    rows = p[1:][cols] - 1
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+def linear_assignment(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    최소 비용 1:1 할당 (rows, cols). scipy가 있으면 linear_sum_assignment, 없으면 내장 JV 구현.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    if _scipy_lsa is not None:
+        rows, cols = _scipy_lsa(cost)
+        return rows.astype(np.int64), cols.astype(np.int64)
+    if cost.shape[0] <= cost.shape[1]:
+        return _lsa_shortest_path(cost)
+    cols, rows = _lsa_shortest_path(cost.T)
+    order = np.argsort(rows)
+    return rows[order], cols[order]
 
 # ---------- 매칭/병합 ----------
+def _match_frame_greedy(instances: List[dict], dets: List[dict], min_iou: float,
+                        use_center_fallback: bool, stats: Dict[str, int]) -> None:
+    used = set()  # 동일 프레임에서 같은 det 중복 할당 방지
+
+    for inst in instances:
+        bbox = inst.get("bbox", None)
+        if not bbox or len(bbox) != 4 or not dets:
+            inst["track_id"] = -1
+            stats["no_candidate"] += 1
+            continue
+
+        # 1) IoU로 최댓값 매칭
+        best_iou, best_idx = -1.0, -1
+        bb = tuple(map(float, bbox))
+        for idx, d in enumerate(dets):
+            if idx in used:
+                continue
+            iou = iou_xyxy(bb, d["bbox_xyxy"])
+            if iou > best_iou:
+                best_iou, best_idx = iou, idx
+
+        if best_idx != -1 and best_iou >= max(0.0, min_iou):
+            inst["track_id"] = dets[best_idx]["track_id"]
+            used.add(best_idx)
+            stats["matched_iou"] += 1
+            continue
+
+        # 2) (옵션) 중심점 거리 보조 매칭
+        if use_center_fallback and dets:
+            cx, cy = center_xyxy(bb)
+            best_d2, best_idx2 = float("inf"), -1
+            for idx, d in enumerate(dets):
+                if idx in used:
+                    continue
+                dcx, dcy = center_xyxy(d["bbox_xyxy"])
+                d2 = (cx - dcx)**2 + (cy - dcy)**2
+                if d2 < best_d2:
+                    best_d2, best_idx2 = d2, idx
+            if best_idx2 != -1:
+                inst["track_id"] = dets[best_idx2]["track_id"]
+                used.add(best_idx2)
+                stats["matched_center"] += 1
+                continue
+
+        # 매칭 실패
+        inst["track_id"] = -1
+        stats["no_candidate"] += 1
+
+def _match_frame_hungarian(instances: List[dict], tids: np.ndarray, b: np.ndarray, min_iou: float,
+                           use_center_fallback: bool, stats: Dict[str, int]) -> None:
+    """
+    프레임 전체 IoU 행렬에서 IoU 합이 최대가 되는 1:1 할당 → 남은 쌍은 (옵션) 중심점 거리 최소 할당.
+    greedy와 달리 IoU=0 쌍은 IoU 매칭으로 치지 않는다.
+    """
+    for inst in instances:
+        inst["track_id"] = -1
+    valid = [i for i, inst in enumerate(instances)
+             if inst.get("bbox") is not None and len(inst["bbox"]) == 4]
+    if not valid or not len(b):
+        stats["no_candidate"] += len(instances)
+        return
+
+    a = boxes_array([instances[i]["bbox"] for i in valid])
+    tids = tids.tolist()
+
+    # 1) IoU 최대 할당 (허용되지 않는 쌍은 비용 0 → 할당돼도 버림)
+    iou = iou_matrix(a, b)
+    allowed = (iou > 0.0) & (iou >= max(0.0, min_iou))
+    rows, cols = linear_assignment(np.where(allowed, -iou, 0.0))
+    keep = allowed[rows, cols]
+    rows, cols = rows[keep], cols[keep]
+    for r, c in zip(rows, cols):
+        instances[valid[r]]["track_id"] = tids[c]
+    stats["matched_iou"] += len(rows)
+
+    # 2) (옵션) 남은 인스턴스/det 사이 중심점 거리 최소 할당
+    n_center = 0
+    if use_center_fallback:
+        rest_r = np.setdiff1d(np.arange(len(valid)), rows)
+        rest_c = np.setdiff1d(np.arange(len(b)), cols)
+        if len(rest_r) and len(rest_c):
+            d2 = center_dist2_matrix(a[rest_r], b[rest_c])
+            r2, c2 = linear_assignment(d2)
+            for r, c in zip(rest_r[r2], rest_c[c2]):
+                instances[valid[r]]["track_id"] = tids[c]
+            n_center = len(r2)
+    stats["matched_center"] += n_center
+    stats["no_candidate"] += len(instances) - len(rows) - n_center
+
+# ---------- 비디오 전체 일괄 매칭 ----------
+def batched_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a: (F,N,4), b: (F,M,4) xyxy -> (F,N,M) IoU"""
+    ix1 = np.maximum(a[:, :, None, 0], b[:, None, :, 0])
+    iy1 = np.maximum(a[:, :, None, 1], b[:, None, :, 1])
+    ix2 = np.minimum(a[:, :, None, 2], b[:, None, :, 2])
+    iy2 = np.minimum(a[:, :, None, 3], b[:, None, :, 3])
+    inter = np.clip(ix2 - ix1, 0.0, None) * np.clip(iy2 - iy1, 0.0, None)
+    area_a = np.clip(a[..., 2] - a[..., 0], 0.0, None) * np.clip(a[..., 3] - a[..., 1], 0.0, None)
+    area_b = np.clip(b[..., 2] - b[..., 0], 0.0, None) * np.clip(b[..., 3] - b[..., 1], 0.0, None)
+    denom = area_a[:, :, None] + area_b[:, None, :] - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denom > 0, inter / denom, 0.0)
+
+def batched_center_dist2(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a: (F,N,4), b: (F,M,4) xyxy -> (F,N,M) 중심점 거리 제곱"""
+    ca = 0.5 * (a[..., :2] + a[..., 2:])
+    cb = 0.5 * (b[..., :2] + b[..., 2:])
+    d = ca[:, :, None, :] - cb[:, None, :, :]
+    return (d ** 2).sum(-1)
+
+def batched_best_first(score: np.ndarray, allowed: np.ndarray) -> np.ndarray:
+    """
+    모든 프레임에서 동시에 '남은 쌍 중 score 최대'를 하나씩 확정하는 1:1 할당.
+    반복 횟수는 min(N,M) (프레임 수와 무관). 반환: (F,N) 할당된 열 index, 없으면 -1
+    """
+    F, N, M = score.shape
+    assign = np.full((F, N), -1, dtype=np.int64)
+    if F == 0 or N == 0 or M == 0:
+        return assign
+    s = np.where(allowed, score, -np.inf)
+    fr = np.arange(F)
+    for _ in range(min(N, M)):
+        flat_s = s.reshape(F, -1)
+        flat = flat_s.argmax(axis=1)
+        ok = np.isfinite(flat_s[fr, flat])
+        if not ok.any():
+            break
+        fo = fr[ok]
+        ro, co = np.divmod(flat[ok], M)
+        assign[fo, ro] = co
+        s[fo, ro, :] = -np.inf
+        s[fo, :, co] = -np.inf
+    return assign
+
+def _pack(frame_idx: np.ndarray, slot_idx: np.ndarray, values: np.ndarray, F: int, fill) -> np.ndarray:
+    """(frame, slot) 좌표의 값들을 (F, max_slot+1, ...) 패딩 배열로 scatter"""
+    width = int(slot_idx.max()) + 1 if len(slot_idx) else 0
+    out = np.full((F, width) + values.shape[1:], fill, dtype=values.dtype)
+    out[frame_idx, slot_idx] = values
+    return out
+
+def _assign_batched(
+    kp_frames: List[dict],
+    botsort_frames: Union[Dict[int, List[dict]], BotsortTracks],
+    min_iou: float,
+    use_center_fallback: bool,
+    chunk_frames: int = 2048,
+) -> Dict[str, int]:
+    """
+    비디오 전체의 bbox를 (F,N,4)/(F,M,4) 패딩 텐서로 묶어 IoU와 할당을 chunk_frames 단위로 일괄 계산.
+    할당 규칙은 프레임별 IoU 큰 쌍부터 확정(best-first) → (옵션) 중심점 거리 작은 쌍부터.
+    """
+    stats = {"matched_iou": 0, "matched_center": 0, "no_candidate": 0}
+
+    # 1) 평탄화: 인스턴스/ det 를 (frame, slot) 좌표와 함께 1차원 배열로
+    tracks = as_tracks(botsort_frames)
+    inst_refs: List[dict] = []
+    a_f, a_s, a_boxes = [], [], []
+    for f, entry in enumerate(kp_frames):
+        slot = 0
+        for inst in entry.get("instances", []):
+            inst["track_id"] = -1
+            bbox = inst.get("bbox", None)
+            if bbox is None or len(bbox) != 4:
+                stats["no_candidate"] += 1
+                continue
+            inst_refs.append(inst)
+            a_f.append(f)
+            a_s.append(slot)
+            a_boxes.append(bbox)
+            slot += 1
+
+    a_f = np.asarray(a_f, dtype=np.int64)
+    a_s = np.asarray(a_s, dtype=np.int64)
+    a_boxes = boxes_array(a_boxes)
+    kp_fids = np.asarray([int(e.get("frame_id", -1)) for e in kp_frames], dtype=np.int64)
+    b_f, b_s, b_rows = tracks.rows_for_frames(kp_fids)
+    b_boxes = tracks.bboxes_xyxy[b_rows]
+    b_tids = tracks.track_ids[b_rows]
+    track_ids = np.full(len(inst_refs), -1, dtype=np.int64)
+
+    # 2) chunk 단위 일괄 매칭
+    F = len(kp_frames)
+    for f0 in range(0, F, chunk_frames):
+        f1 = min(F, f0 + chunk_frames)
+        ai0, ai1 = np.searchsorted(a_f, [f0, f1])
+        bi0, bi1 = np.searchsorted(b_f, [f0, f1])
+        if ai0 == ai1 or bi0 == bi1:
+            continue
+        fa, sa = a_f[ai0:ai1] - f0, a_s[ai0:ai1]
+        fb, sb = b_f[bi0:bi1] - f0, b_s[bi0:bi1]
+        A = _pack(fa, sa, a_boxes[ai0:ai1], f1 - f0, 0.0)
+        B = _pack(fb, sb, b_boxes[bi0:bi1], f1 - f0, 0.0)
+        T = _pack(fb, sb, b_tids[bi0:bi1], f1 - f0, -1)
+        valid = (_pack(fa, sa, np.ones(ai1 - ai0, bool), f1 - f0, False)[:, :, None]
+                 & _pack(fb, sb, np.ones(bi1 - bi0, bool), f1 - f0, False)[:, None, :])
+
+        iou = batched_iou(A, B)
+        assign = batched_best_first(iou, valid & (iou > 0.0) & (iou >= max(0.0, min_iou)))
+        stats["matched_iou"] += int((assign[fa, sa] >= 0).sum())
+
+        if use_center_fallback:
+            F_c, N, M = valid.shape
+            used_col = np.zeros((F_c, M + 1), dtype=bool)
+            used_col[np.arange(F_c)[:, None], assign] = True   # -1 → 마지막 더미 열
+            free = valid & (assign < 0)[:, :, None] & ~used_col[:, None, :M]
+            assign2 = batched_best_first(-batched_center_dist2(A, B), free)
+            stats["matched_center"] += int((assign2[fa, sa] >= 0).sum())
+            assign = np.where(assign >= 0, assign, assign2)
+
+        cols = assign[fa, sa]
+        hit = cols >= 0
+        track_ids[ai0:ai1][hit] = T[fa[hit], cols[hit]]
+
+    # 3) 결과를 dict 에 반영
+    for inst, tid in zip(inst_refs, track_ids.tolist()):
+        inst["track_id"] = tid
+    stats["no_candidate"] += int((track_ids < 0).sum())
+    return stats
+
+MATCHERS = ("greedy", "hungarian", "batched")
+
+def as_tracks(botsort_frames: Union[Dict[int, List[dict]], BotsortTracks]) -> BotsortTracks:
+    if isinstance(botsort_frames, BotsortTracks):
+        return botsort_frames
+    return BotsortTracks.from_frames(botsort_frames)
+
 def assign_track_ids(
     kp_frames: List[dict],
-    botsort_frames: Dict[int, List[dict]],
+    botsort_frames: Union[Dict[int, List[dict]], BotsortTracks],
     min_iou: float = 0.0,
-    use_center_fallback: bool = False
+    use_center_fallback: bool = False,
+    matcher: str = "greedy",
 ) -> Dict[str, int]:
     """
     각 frame의 instances에 track_id 필드를 부착한다.
-    greedy 1:1 매칭(IoU 최대) → (옵션) 중심점 거리 보조 매칭.
+    botsort_frames: load_botsort 의 dict 또는 load_botsort_array 의 BotsortTracks
+    matcher:
+      - "greedy"   : 인스턴스 순서대로 IoU 최대 det를 고르는 1:1 매칭 → (옵션) 중심점 거리 보조 매칭
+      - "hungarian": 프레임별 IoU/중심거리 행렬(NumPy) + 최적 할당 (linear_assignment)
+      - "batched"  : 비디오 전체를 (F,N,M) 텐서로 묶어 IoU 큰 쌍부터 일괄 할당 (가장 빠름)
     반환: 통계 dict
     """
+    if matcher not in MATCHERS:
+        raise ValueError(f"matcher must be one of {list(MATCHERS)}, got {matcher!r}")
+    if matcher == "batched":
+        return _assign_batched(kp_frames, botsort_frames, min_iou, use_center_fallback)
+    if matcher == "hungarian":
+        botsort_frames = as_tracks(botsort_frames)
     stats = {"matched_iou": 0, "matched_center": 0, "no_candidate": 0}
     for entry in kp_frames:
         frame_id = int(entry.get("frame_id", -1))
         instances = entry.get("instances", [])
-        dets = botsort_frames.get(frame_id, [])
-        used = set()  # 동일 프레임에서 같은 det 중복 할당 방지
-
-        for inst in instances:
-            bbox = inst.get("bbox", None)
-            if not bbox or len(bbox) != 4 or not dets:
-                inst["track_id"] = -1
-                stats["no_candidate"] += 1
-                continue
-
-            # 1) IoU로 최댓값 매칭
-            best_iou, best_idx = -1.0, -1
-            bb = tuple(map(float, bbox))
-            for idx, d in enumerate(dets):
-                if idx in used:
-                    continue
-                iou = iou_xyxy(bb, d["bbox_xyxy"])
-                if iou > best_iou:
-                    best_iou, best_idx = iou, idx
-
-            if best_idx != -1 and best_iou >= max(0.0, min_iou):
-                inst["track_id"] = dets[best_idx]["track_id"]
-                used.add(best_idx)
-                stats["matched_iou"] += 1
-                continue
+        if matcher == "greedy":
+            dets = botsort_frames.get(frame_id, [])
+            _match_frame_greedy(instances, dets, min_iou, use_center_fallback, stats)
+        else:
+            tids, boxes = botsort_frames.frame_slice(frame_id)
+            _match_frame_hungarian(instances, tids, boxes, min_iou, use_center_fallback, stats)
+    return stats
 
-            # 2) (옵션) 중심점 거리 보조 매칭
-            if use_center_fallback and dets:
-                cx, cy = center_xyxy(bb)
-                best_d2, best_idx2 = float("inf"), -1
-                for idx, d in enumerate(dets):
-                    if idx in used:
-                        continue
-                    dcx, dcy = center_xyxy(d["bbox_xyxy"])
-                    d2 = (cx - dcx)**2 + (cy - dcy)**2
-                    if d2 < best_d2:
-                        best_d2, best_idx2 = d2, idx
-                if best_idx2 != -1:
-                    inst["track_id"] = dets[best_idx2]["track_id"]
-                    used.add(best_idx2)
-                    stats["matched_center"] += 1
-                    continue
+# ---------- 출력 ----------
+def write_tracked_store(kp_frames: List[dict], out_dir: str) -> int:
+    """
+    track_id가 부착된 프레임들을 컬럼형 스토어로 저장 (frame_id 오름차순, 같은 frame_id는 병합).
+    bbox가 없거나 [x1,y1,x2,y2] 가 아닌 인스턴스는 JSON 출력과 같이 남기되 bbox 는 NaN, track_id 는 -1
+    (매칭에서도 -1 이 된다) → 두 형식의 .skeleton 인원 수가 같다.
+    반환: 저장된 프레임 수
+    """
+    merged: Dict[int, List[dict]] = {}
+    for entry in kp_frames:
+        merged.setdefault(int(entry.get("frame_id", -1)), []).extend(entry.get("instances", []))
 
-            # 매칭 실패
-            inst["track_id"] = -1
-            stats["no_candidate"] += 1
-    return stats
+    with StoreWriter(out_dir, with_track_ids=True) as store:
+        for fid in sorted(merged):
+            with instrument.stage("serialize"):
+                insts = merged[fid]
+                valid = [i.get("bbox") is not None and len(i["bbox"]) == 4 for i in insts]
+                bboxes = np.array([(list(i["bbox"]) if ok else [np.nan] * 4) + [i.get("score", 1.0)]
+                                   for i, ok in zip(insts, valid)], dtype=np.float32).reshape(-1, 5)
+                kps = [np.asarray(i.get("keypoints") or np.zeros((0, 3)), dtype=np.float32) for i in insts]
+                kps_scores = [np.asarray(i.get("keypoint_scores") or [], dtype=np.float32) for i in insts]
+            with instrument.stage("write"):
+                store.add_frame(fid, bboxes, kps, kps_scores,
+                                track_ids=[i.get("track_id", -1) if ok else -1 for i, ok in zip(insts, valid)])
+    return len(merged)
 
 # ---------- 엔트리포인트 ----------
 def main():
     args = parse_args()
-    botsort_frames = load_botsort(args.botsort)
-    kp_frames = load_keypoint(args.keypoint)
+    instrument.setup(args, "json_plus_track")
+
+    manifest = CacheManifest.for_dir(os.path.dirname(os.path.abspath(args.out))) if args.cache else None
+    if manifest is not None:
+        key = f"json_plus_track:{os.path.abspath(args.out)}"
+        inputs = [args.botsort, args.keypoint]
+        options = {"min_iou": args.min_iou, "use_center_fallback": args.use_center_fallback,
+                   "matcher": args.matcher, "format": args.format, "pretty": args.pretty}
+        if manifest.is_fresh(key, inputs, options):
+            manifest.save()
+            print("[SKIP] up to date:", args.out)
+            return
+        in_fps = [fingerprint(p) for p in inputs]
+
+    with instrument.file(args.keypoint):
+        with instrument.stage("parse"):
+            botsort_frames = load_botsort_array(args.botsort)
+            kp_frames = load_keypoint(args.keypoint)
+        instrument.count("frames", len(kp_frames))
+        instrument.count("detections", len(botsort_frames.track_ids))
+
+        with instrument.stage("match"):
+            stats = assign_track_ids(
+                kp_frames, botsort_frames,
+                min_iou=args.min_iou,
+                use_center_fallback=args.use_center_fallback,
+                matcher=args.matcher,
+            )
+        for k, v in stats.items():
+            instrument.count(k, v)
 
-    stats = assign_track_ids(
-        kp_frames, botsort_frames,
-        min_iou=args.min_iou,
-        use_center_fallback=args.use_center_fallback
-    )
+        if args.format == "json":
+            with instrument.stage("serialize"):
+                data = fastjson.dumps(kp_frames, indent=2 if args.pretty else None)
+            with instrument.stage("write"), open(args.out, "wb") as f:
+                f.write(data)
+        else:
+            write_tracked_store(kp_frames, args.out)
 
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(kp_frames, f, ensure_ascii=False, indent=2)
+    if manifest is not None:
+        out_marker = args.out if args.format == "json" else os.path.join(args.out, "frame_offsets.npy")
+        manifest.record(key, in_fps, options, [out_marker])
+        manifest.save()
 
     print("[OK] wrote:", args.out)
     print("[stats]", stats)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Consolidated per-video keypoint store (one directory per video instead of one file per frame).
+
+Layout
+------
+<store_dir>/
+  frame_ids.npy        (F,)      int64    frame_id of each stored frame (ascending)
+  frame_offsets.npy    (F+1,)    int64    rows of frame i are [frame_offsets[i], frame_offsets[i+1])
+  bboxes_xyxy5.npy     (N,5)     float32  x1,y1,x2,y2,score per instance (x1..y2 NaN = no bbox)
+  keypoints_xyz.npy    (N,K,3)   float32  NaN padded to the max K of the video
+  keypoint_scores.npy  (N,K)     float32  NaN padded to the max K of the video
+  track_ids.npy        (N,)      int64    (optional) written by json_plus_track, -1 = unmatched
+
+Every array is a plain .npy, so it can be opened with np.load(mmap_mode='r') and sliced
+per frame without decompression:
+
+    store = open_store("dets_kps_store")
+    fr = store.frame(10)          # dict of zero-copy views for the 11th stored frame
+    i = store.index_of(2247)      # row of frame_id 2247 (or -1)
+    frames = store_to_frames(store)   # back to the [{"frame_id", "instances": [...]}, ...] JSON schema
+"""
+
+import os
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+def is_store_dir(path: str) -> bool:
+    return os.path.isdir(path) and os.path.isfile(os.path.join(path, "frame_offsets.npy"))
+
+# ---------- 쓰기 ----------
+def _fill_padded(raw_path: str, counts: np.ndarray, out: np.ndarray, inner: int,
+                 chunk_rows: int = 65536) -> None:
+    """
+    raw_path 에 인스턴스 순서대로 이어 붙인 float32 (K_i, inner) 블록을
+    NaN 패딩된 out (N, K[, inner]) 으로 옮긴다. K가 같은 연속 구간은 한 번에 복사.
+    """
+    n = len(counts)
+    if n == 0:
+        return
+    change = np.flatnonzero(np.diff(counts)) + 1
+    starts = np.concatenate([[0], change])
+    ends = np.concatenate([change, [n]])
+    with open(raw_path, "rb") as f:
+        for s, e in zip(starts, ends):
+            k = int(counts[s])
+            for c0 in range(int(s), int(e), chunk_rows):
+                c1 = min(int(e), c0 + chunk_rows)
+                if k == 0:
+                    continue
+                block = np.fromfile(f, dtype=np.float32, count=(c1 - c0) * k * inner)
+                shape = (c1 - c0, k, inner) if inner > 1 else (c1 - c0, k)
+                out[c0:c1, :k] = block.reshape(shape)
+
+class StoreWriter:
+    """
+    프레임을 순서대로 받아 스토어를 만든다. 인스턴스 데이터는 임시 raw 파일에
+    바로 append 하므로 메모리에는 인스턴스당 정수 몇 개만 남는다.
+    close() 에서 비디오 전체의 최대 K로 패딩된 .npy 들을 만든다.
+    실패하면 abort() 로 임시 raw 파일을 지운다 (with 블록에서 예외가 나면 자동).
+    """
+    def __init__(self, store_dir: str, with_track_ids: bool = False):
+        self.store_dir = store_dir
+        self.with_track_ids = with_track_ids
+        os.makedirs(store_dir, exist_ok=True)
+        names = ["bboxes_xyxy5", "keypoints_xyz", "keypoint_scores"] + (["track_ids"] if with_track_ids else [])
+        self._raw = {name: os.path.join(store_dir, f".{name}.bin") for name in names}
+        self._fh = {name: open(p, "wb") for name, p in self._raw.items()}
+        self.frame_ids = array("q")
+        self.frame_offsets = array("q", [0])
+        self.kp_counts = array("i")
+        self.kp_score_counts = array("i")
+
+    def add_frame(self,
+                  frame_id: int,
+                  bboxes_xyxy5: np.ndarray,
+                  keypoints: List[np.ndarray],
+                  keypoint_scores: List[np.ndarray],
+                  track_ids: Optional[Sequence[int]] = None) -> None:
+        """bboxes_xyxy5: (n,5), keypoints: n x (K_i,3), keypoint_scores: n x (K_i,), track_ids: (n,)"""
+        if self.frame_ids and frame_id <= self.frame_ids[-1]:
+            raise ValueError(f"frame_id must be strictly increasing (got {frame_id} after {self.frame_ids[-1]})")
+        n = len(bboxes_xyxy5)
+        if len(keypoints) != n or len(keypoint_scores) != n:
+            raise ValueError("bboxes/keypoints/keypoint_scores length mismatch")
+        if self.with_track_ids:
+            if track_ids is None or len(track_ids) != n:
+                raise ValueError("track_ids required (one per instance) for a store with track ids")
+            np.asarray(track_ids, dtype=np.int64).tofile(self._fh["track_ids"])
+
+        np.asarray(bboxes_xyxy5, dtype=np.float32).reshape(n, 5).tofile(self._fh["bboxes_xyxy5"])
+        for kps, sc in zip(keypoints, keypoint_scores):
+            kps = np.asarray(kps, dtype=np.float32).reshape(-1, 3)
+            sc = np.asarray(sc, dtype=np.float32).reshape(-1)
+            kps.tofile(self._fh["keypoints_xyz"])
+            sc.tofile(self._fh["keypoint_scores"])
+            self.kp_counts.append(len(kps))
+            self.kp_score_counts.append(len(sc))
+
+        self.frame_ids.append(int(frame_id))
+        self.frame_offsets.append(self.frame_offsets[-1] + n)
+
+    def close(self) -> int:
+        """스토어를 완성하고 저장된 프레임 수를 반환."""
+        for fh in self._fh.values():
+            fh.close()
+
+        n = self.frame_offsets[-1]
+        kp_counts = np.frombuffer(self.kp_counts, dtype=np.int32) if self.kp_counts else np.zeros(0, np.int32)
+        sc_counts = np.frombuffer(self.kp_score_counts, dtype=np.int32) if self.kp_score_counts else np.zeros(0, np.int32)
+        K = int(max(kp_counts.max(initial=0), sc_counts.max(initial=0)))
+
+        def _path(name):
+            return os.path.join(self.store_dir, f"{name}.npy")
+
+        np.save(_path("frame_ids"), np.frombuffer(self.frame_ids, dtype=np.int64) if self.frame_ids else np.zeros(0, np.int64))
+        np.save(_path("frame_offsets"), np.frombuffer(self.frame_offsets, dtype=np.int64))
+
+        bboxes = np.lib.format.open_memmap(_path("bboxes_xyxy5"), mode="w+", dtype=np.float32, shape=(n, 5))
+        if n:
+            bboxes[:] = np.fromfile(self._raw["bboxes_xyxy5"], dtype=np.float32).reshape(n, 5)
+        del bboxes
+
+        kps = np.lib.format.open_memmap(_path("keypoints_xyz"), mode="w+", dtype=np.float32, shape=(n, K, 3))
+        kps[:] = np.nan
+        _fill_padded(self._raw["keypoints_xyz"], kp_counts, kps, inner=3)
+        del kps
+
+        scores = np.lib.format.open_memmap(_path("keypoint_scores"), mode="w+", dtype=np.float32, shape=(n, K))
+        scores[:] = np.nan
+        _fill_padded(self._raw["keypoint_scores"], sc_counts, scores, inner=1)
+        del scores
+
+        if self.with_track_ids:
+            np.save(_path("track_ids"), np.fromfile(self._raw["track_ids"], dtype=np.int64))
+        elif os.path.exists(_path("track_ids")):
+            os.remove(_path("track_ids"))  # 이전 실행의 잔여 파일
+
+        for p in self._raw.values():
+            os.remove(p)
+        return len(self.frame_ids)
+
+    def abort(self) -> None:
+        """쓰던 임시 raw 파일을 닫고 지운다 (이전에 완성된 .npy 는 그대로)"""
+        for fh in self._fh.values():
+            fh.close()
+        for p in self._raw.values():
+            if os.path.exists(p):
+                os.remove(p)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+# ---------- 읽기 ----------
+class KpsStore:
+    """np.load(mmap_mode=...) 로 연 스토어. frame(i) 는 복사 없이 슬라이스를 반환."""
+    def __init__(self, store_dir: str, mmap_mode: Optional[str] = "r"):
+        if not is_store_dir(store_dir):
+            raise FileNotFoundError(f"Not a keypoint store: {store_dir}")
+        self.store_dir = store_dir
+        self.arrays: Dict[str, np.ndarray] = {}
+        for fn in sorted(os.listdir(store_dir)):
+            if fn.endswith(".npy"):
+                self.arrays[fn[:-4]] = np.load(os.path.join(store_dir, fn), mmap_mode=mmap_mode)
+        self.frame_ids = self.arrays["frame_ids"]
+        self.frame_offsets = self.arrays["frame_offsets"]
+
+    def __len__(self) -> int:
+        return len(self.frame_ids)
+
+    def index_of(self, frame_id: int) -> int:
+        i = int(np.searchsorted(self.frame_ids, frame_id))
+        if i < len(self.frame_ids) and self.frame_ids[i] == frame_id:
+            return i
+        return -1
+
+    def frame(self, i: int) -> Dict[str, np.ndarray]:
+        s, e = int(self.frame_offsets[i]), int(self.frame_offsets[i + 1])
+        out = {"frame_id": int(self.frame_ids[i])}
+        for name, arr in self.arrays.items():
+            if name not in ("frame_ids", "frame_offsets"):
+                out[name] = arr[s:e]
+        return out
+
+def open_store(store_dir: str, mmap_mode: Optional[str] = "r") -> KpsStore:
+    return KpsStore(store_dir, mmap_mode=mmap_mode)
+
+def _strip_nan_rows(a: np.ndarray) -> np.ndarray:
+    """뒤쪽 NaN 패딩 관절 제거"""
+    valid = ~np.isnan(a.reshape(len(a), -1)).all(axis=1)
+    k = int(np.flatnonzero(valid)[-1]) + 1 if valid.any() else 0
+    return a[:k]
+
+def store_to_frames(store: KpsStore) -> List[Dict[str, Any]]:
+    """
+    스토어를 convert_4bot / json_plus_track 의 JSON 스키마로 되돌린다.
+    (track_ids.npy 가 있으면 instance 마다 track_id 포함)
+    """
+    frames = []
+    for i in range(len(store)):
+        fr = store.frame(i)
+        insts = []
+        for j in range(len(fr["bboxes_xyxy5"])):
+            b = fr["bboxes_xyxy5"][j].tolist()
+            inst = {
+                "bbox": b[:4],
+                "score": b[4],
+                "keypoints": _strip_nan_rows(fr["keypoints_xyz"][j]).tolist(),
+                "keypoint_scores": _strip_nan_rows(fr["keypoint_scores"][j]).tolist(),
+            }
+            if b[0] != b[0]:   # NaN: 원본에 bbox 가 없던 인스턴스
+                del inst["bbox"]
+            if "track_ids" in fr:
+                inst["track_id"] = int(fr["track_ids"][j])
+            insts.append(inst)
+        frames.append({"frame_id": fr["frame_id"], "instances": insts})
+    return frames
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parallel driver for make_videos.sh: frame folders -> mp4, several ffmpeg encodes at once.
+
+For every direct sub-folder <ROOT>/<NAME> containing frame_*.jpg:
+  <OUT>/<NAME>.txt   ffmpeg concat list, frames in natural order (frame_2 < frame_10, like sort -V)
+  <OUT>/<NAME>.mp4   libx264 / yuv420p / +faststart at --fps
+
+Encodes run in a pool of --workers ffmpeg processes, each limited to --ffmpeg-threads
+threads so the pool does not oversubscribe the CPU. ffmpeg writes <NAME>.mp4.part and
+it is renamed only after a successful encode, so an interrupted or failed run leaves no
+truncated mp4: re-running the same command skips finished videos and redoes the rest
+(--force re-encodes everything). Failed jobs are retried --retries times.
+
+Usage
+-----
+python make_videos.py --root /root/Data/Training/Falling_Train --out /root/dhyee/dataset/subway --fps 15 --workers 4
+"""
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+
+_DIGITS = re.compile(r"(\d+)")
+
+def natural_key(name: str) -> List[object]:
+    """'frame_10.jpg' -> ['frame_', 10, '.jpg'] (sort -V 와 같은 순서)"""
+    return [int(tok) if tok.isdigit() else tok for tok in _DIGITS.split(name)]
+
+def list_frames(frame_dir: str, prefix: str = "frame_", ext: str = ".jpg") -> List[str]:
+    with os.scandir(frame_dir) as it:
+        names = [e.name for e in it if e.is_file() and e.name.startswith(prefix) and e.name.endswith(ext)]
+    return [os.path.join(frame_dir, n) for n in sorted(names, key=natural_key)]
+
+def find_frame_dirs(root: str) -> List[str]:
+    """root 바로 아래의 하위 디렉터리 (자연수 순서)"""
+    with os.scandir(root) as it:
+        dirs = [e.path for e in it if e.is_dir()]
+    return sorted(dirs, key=lambda p: natural_key(os.path.basename(p)))
+
+def write_concat_list(frames: List[str], list_path: str) -> None:
+    with open(list_path, "w", encoding="utf-8") as f:
+        for p in frames:
+            escaped = os.path.abspath(p).replace("'", "'\\''")   # concat 형식의 작은따옴표 이스케이프
+            f.write(f"file '{escaped}'\n")
+
+def ffmpeg_cmd(list_path: str, out_path: str, fps: float, threads: int, ffmpeg: str = "ffmpeg") -> List[str]:
+    return [ffmpeg, "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+            "-f", "concat", "-safe", "0", "-r", str(fps), "-i", list_path,
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+            "-threads", str(threads), "-f", "mp4", out_path]
+
+def encode_one(frame_dir: str, out_dir: str, fps: float, threads: int, retries: int,
+               ffmpeg: str) -> Tuple[str, int, float, Optional[str]]:
+    """반환: (mp4 경로, 프레임 수, 소요 초, 에러 메시지 or None). 프레임이 없으면 (.., 0, .., None)"""
+    t0 = time.perf_counter()
+    name = os.path.basename(frame_dir.rstrip(os.sep))
+    mp4 = os.path.join(out_dir, f"{name}.mp4")
+    part = mp4 + ".part"
+    frames = list_frames(frame_dir)
+    if not frames:
+        return mp4, 0, time.perf_counter() - t0, None
+    list_path = os.path.join(out_dir, f"{name}.txt")
+    write_concat_list(frames, list_path)
+
+    err = None
+    for _ in range(max(0, retries) + 1):
+        proc = subprocess.run(ffmpeg_cmd(list_path, part, fps, threads, ffmpeg),
+                              stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if proc.returncode == 0:
+            os.replace(part, mp4)
+            return mp4, len(frames), time.perf_counter() - t0, None
+        tail = proc.stderr.strip().splitlines()[-3:]
+        err = f"ffmpeg exit {proc.returncode}: " + " | ".join(tail)
+    if os.path.exists(part):
+        os.remove(part)
+    return mp4, len(frames), time.perf_counter() - t0, err
+
+def main():
+    cpus = os.cpu_count() or 1
+    ap = argparse.ArgumentParser(description="Encode every frame folder under --root to mp4 in parallel.")
+    ap.add_argument("--root", default="/root/Data/Training/Falling_Train", help="Folder whose sub-folders hold frame_*.jpg")
+    ap.add_argument("--out", default="/root/dhyee/dataset/subway", help="Output folder for <NAME>.mp4 / <NAME>.txt")
+    ap.add_argument("--fps", type=float, default=15, help="Output frame rate")
+    ap.add_argument("--workers", type=int, default=max(1, cpus // 4), help="Concurrent ffmpeg processes")
+    ap.add_argument("--ffmpeg-threads", type=int, default=None, help="Threads per ffmpeg (default: cpus / workers)")
+    ap.add_argument("--retries", type=int, default=1, help="Retries per failed encode")
+    ap.add_argument("--force", action="store_true", help="Re-encode videos whose mp4 already exists")
+    ap.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg executable")
+    args = ap.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"[ERROR] Not a folder: {args.root}", file=sys.stderr)
+        sys.exit(1)
+    if shutil.which(args.ffmpeg) is None:
+        print(f"[ERROR] ffmpeg not found: {args.ffmpeg}", file=sys.stderr)
+        sys.exit(1)
+    os.makedirs(args.out, exist_ok=True)
+    workers = max(1, args.workers)
+    threads = args.ffmpeg_threads or max(1, cpus // workers)
+
+    dirs = find_frame_dirs(args.root)
+    todo = [d for d in dirs
+            if args.force or not os.path.exists(os.path.join(args.out, f"{os.path.basename(d)}.mp4"))]
+    skipped = len(dirs) - len(todo)
+    print(f">>> {len(dirs)} folders, {skipped} already encoded, {len(todo)} to encode "
+          f"with {workers} workers x {threads} ffmpeg threads")
+
+    t0 = time.perf_counter()
+    done, failed, empty, total_frames, busy = 0, 0, 0, 0, 0.0
+    with ThreadPoolExecutor(max_workers=workers) as ex:   # 실제 작업은 ffmpeg 프로세스가 한다
+        futures = [ex.submit(encode_one, d, args.out, args.fps, threads, args.retries, args.ffmpeg) for d in todo]
+        for fut in as_completed(futures):
+            mp4, nframes, secs, err = fut.result()
+            busy += secs
+            if err is not None:
+                failed += 1
+                print(f"[FAIL] {mp4} ({secs:.2f}s): {err}", file=sys.stderr)
+                continue
+            if nframes == 0:
+                empty += 1
+                print(f"[SKIP] no frame_*.jpg for {mp4}")
+                continue
+            done += 1
+            total_frames += nframes
+            fps = nframes / secs if secs > 0 else 0.0
+            print(f"[OK] {mp4}: {nframes} frames in {secs:.2f}s ({fps:.1f} frames/s)")
+
+    wall = time.perf_counter() - t0
+    print(f"=== encoded {done}, skipped {skipped + empty}, failed {failed} | "
+          f"{total_frames} frames | wall {wall:.2f}s, job time {busy:.2f}s ===")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
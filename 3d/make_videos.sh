@@ -5,39 +5,11 @@ set -euo pipefail
 ROOT="/root/Data/Training/Falling_Train"
 OUT="/root/dhyee/dataset/subway"
 FPS=15
+WORKERS=$(( $(nproc) / 4 > 0 ? $(nproc) / 4 : 1 ))   # 동시에 돌릴 ffmpeg 개수 (각 ffmpeg 는 nproc/WORKERS 스레드)
 
-mkdir -p "$OUT"
-
-# 루트 바로 아래의 모든 하위 디렉터리를 순회
-find "$ROOT" -mindepth 1 -maxdepth 1 -type d | while read -r DIR; do
-  NAME="$(basename "$DIR")"
-  LIST="$OUT/${NAME}.txt"
-  MP4="$OUT/${NAME}.mp4"
-
-  echo ">> 처리중: $NAME"
-
-  # 1) concat 리스트 생성 (자연수 기준 정렬: sort -V)
-  #    파일명이 매우 많거나 공백/특수문자 포함해도 안전하게 처리
-  #    frame_*.jpg이 없으면 건너뜀
-  if ! find "$DIR" -maxdepth 1 -type f -name 'frame_*.jpg' | grep -q .; then
-    echo "   경고: 프레임이 없습니다: $DIR (건너뜀)"
-    continue
-  fi
-
-  # 리스트 파일 생성
-  # -print0 / -z 옵션으로 null-구분 정렬 → 안전한 파일명 처리
-  find "$DIR" -maxdepth 1 -type f -name 'frame_*.jpg' -print0 \
-    | sort -z -V \
-    | while IFS= read -r -d '' F; do
-        printf "file '%s'\n" "$F"
-      done > "$LIST"
-
-  # 2) ffmpeg로 mp4 생성
-  ffmpeg -y -f concat -safe 0 -r "$FPS" -i "$LIST" \
-    -c:v libx264 -pix_fmt yuv420p -movflags +faststart "$MP4"
-
-  echo "   완료: $MP4"
-done
+# 루트 바로 아래의 각 하위 디렉터리(frame_*.jpg)를 <OUT>/<NAME>.mp4 로 인코딩.
+# 프레임 자연수 정렬 / concat 리스트(<OUT>/<NAME>.txt) 생성 / 병렬 인코딩 / 이미 완성된 mp4 건너뛰기는
+# make_videos.py 가 처리한다. 실패한 폴더는 같은 명령을 다시 실행하면 이어서 처리된다.
+python make_videos.py --root "$ROOT" --out "$OUT" --fps "$FPS" --workers "$WORKERS"
 
 echo "=== 전체 처리 완료 ==="
-
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multi-camera fusion for one escalator covered by several CCTV cameras.
+
+Every camera runs the fall_service.py per-camera stages (track -> ring buffer ->
+rule gate -> classifier) in its own worker thread, so per-camera work overlaps
+(NumPy and the classifier release the GIL). Each worker turns frames into ticks on a
+shared clock, t = offset + frame_id / fps, and the fusion loop merges the camera
+queues in time order:
+
+  1) handoff: a local track that appears inside a zone overlapping a neighbour camera
+     takes over the global id of a track seen in that neighbour within
+     --handoff-window seconds (inside the neighbour's matching zone), picking the most
+     similar pose (root-centred OKS, online_tracker.pose_similarity)
+  2) dedup : a fall event is reported once per global id per --dedup-window seconds.
+     The handoff gives one person the same global id in every camera, so a fall seen
+     by two cameras is reported once; two people falling near a shared zone keep
+     separate ids and are both reported
+
+Camera config (--config, JSON):
+  {"cameras": [
+     {"name": "entrance", "source": "/data/cam1.jsonl", "fps": 15, "offset": 0.0,
+      "zones": {"middle1": [1400, 0, 1920, 1080]}},
+     {"name": "middle1",  "source": "tcp://0.0.0.0:9001", "fps": 15, "offset": 0.12,
+      "zones": {"entrance": [0, 0, 500, 1080], "middle2": [1400, 0, 1920, 1080]}},
+     ...]}
+  source : JSONL file / tcp:// / - (live, like fall_service.py), or a tracked JSON /
+           keypoint store (replayed)
+  zones  : per neighbour, the [x1, y1, x2, y2] pixel region of THIS camera's image that
+           the neighbour also sees
+  offset : seconds added to frame_id / fps to align the camera with the shared clock
+
+Fused events (JSON lines):
+  {"time", "global_id", "camera", "frame_id", "track_id", "score", "latency_ms"}
+
+Usage
+-----
+python multicam_fusion.py --config myeongdeok_escalator.json --gate rules --events falls.jsonl
+"""
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from fall_service import CLASSIFIERS, FallService, LatencyStats, add_detection_args, open_source, skip_bad_frame
+from json2_shiftgcn import load_frames
+from online_tracker import pose_similarity
+
+# ---------- 카메라 워커 ----------
+class Tick:
+    """카메라 한 프레임의 결과 (공유 시계 기준)"""
+    __slots__ = ("t", "cam", "frame_id", "obs", "events")
+
+    def __init__(self, t: float, cam: int, frame_id: int, obs: List[Tuple[int, List[float], np.ndarray]],
+                 events: List[Dict[str, Any]]):
+        self.t = t
+        self.cam = cam
+        self.frame_id = frame_id
+        self.obs = obs          # [(local track_id, bbox xyxy, keypoints (V,3)), ...]
+        self.events = events    # FallService 이벤트
+
+class _CameraService(FallService):
+    """이벤트를 파일 대신 리스트에 모으는 FallService"""
+    def __init__(self, args: argparse.Namespace, classifier):
+        super().__init__(args, classifier, events_out=None)
+        self.pending: List[Dict[str, Any]] = []
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        self.metrics.count("events")
+        self.pending.append(event)
+
+def is_live_source(source: str) -> bool:
+    return source == "-" or source.startswith("tcp://") or source.endswith(".jsonl")
+
+def iter_camera_frames(source: str, stop: threading.Event, follow: bool,
+                       metrics: Optional[LatencyStats] = None) -> Iterator[Dict[str, Any]]:
+    if not is_live_source(source):
+        yield from load_frames(Path(source))
+        return
+    for line in open_source(source, stop, follow=follow):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            frame = json.loads(line)
+        except ValueError:
+            if metrics is not None:
+                metrics.count("bad_lines")
+            continue
+        yield frame
+
+class CameraWorker(threading.Thread):
+    def __init__(self, idx: int, cam: Dict[str, Any], args: argparse.Namespace, classifier,
+                 out: "queue.Queue[Optional[Tick]]", stop: threading.Event):
+        super().__init__(name=f"cam-{cam['name']}", daemon=True)
+        self.idx = idx
+        self.cam = cam
+        self.fps = float(cam.get("fps", args.fps))
+        self.offset = float(cam.get("offset", 0.0))
+        self.follow = not args.no_follow
+        self.out = out
+        self.stop = stop
+        cam_args = argparse.Namespace(**vars(args))
+        cam_args.fps = self.fps
+        self.service = _CameraService(cam_args, classifier)
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        try:
+            for frame in iter_camera_frames(self.cam["source"], self.stop, self.follow, self.service.metrics):
+                if self.stop.is_set():
+                    break
+                try:
+                    tids, kps = self.service.process(time.perf_counter(), frame)
+                except ValueError as e:   # 잘못된 프레임 하나로 카메라가 빠지지 않게
+                    skip_bad_frame(self.service.metrics, e, self.cam["name"])
+                    continue
+                insts = frame.get("instances") or []
+                obs = [(tid, inst["bbox"][:4], k) for inst, tid, k in zip(insts, tids, kps) if tid >= 0]
+                events, self.service.pending = self.service.pending, []
+                frame_id = int(frame.get("frame_id", 0))
+                self.out.put(Tick(self.offset + frame_id / self.fps, self.idx, frame_id, obs, events))
+        except BaseException as e:  # 메인 스레드에서 보고
+            self.error = e
+        finally:
+            self.out.put(None)
+
+# ---------- 핸드오프 / 중복 제거 ----------
+def _centre(bbox) -> Tuple[float, float]:
+    return (bbox[0] + bbox[2]) * 0.5, (bbox[1] + bbox[3]) * 0.5
+
+def _in_zone(pt: Tuple[float, float], zone) -> bool:
+    return zone[0] <= pt[0] <= zone[2] and zone[1] <= pt[1] <= zone[3]
+
+class GlobalTracks:
+    def __init__(self, cameras: List[Dict[str, Any]], handoff_window: float = 2.0,
+                 min_pose_sim: float = 0.3, kappa: float = 0.1, idle: float = 30.0):
+        self.names = [c["name"] for c in cameras]
+        self.zones: List[Dict[str, List[float]]] = [c.get("zones", {}) for c in cameras]
+        self.handoff_window = handoff_window
+        self.min_pose_sim = min_pose_sim
+        self.kappa = kappa
+        self.idle = idle
+        self.local: Dict[Tuple[int, int], int] = {}                     # (cam, local tid) -> gid
+        self.seen: Dict[int, Dict[int, Tuple[float, Any, np.ndarray]]] = {}  # gid -> cam -> (t, bbox, pose)
+        self.next_gid = 1
+        self.handoffs = 0
+
+    def zones_hit(self, cam: int, bbox) -> List[int]:
+        """bbox 중심이 들어 있는 overlap zone 의 이웃 카메라 index"""
+        c = _centre(bbox)
+        return [self.names.index(n) for n, z in self.zones[cam].items() if n in self.names and _in_zone(c, z)]
+
+    def _claimed(self, cam: int, gid: int, t: float) -> bool:
+        last = self.seen.get(gid, {}).get(cam)
+        return last is not None and t - last[0] <= self.handoff_window
+
+    def _handoff(self, t: float, cam: int, bbox, pose: np.ndarray) -> Optional[int]:
+        best, best_sim = None, -1.0
+        for nb in self.zones_hit(cam, bbox):
+            back = self.zones[nb].get(self.names[cam])    # 이웃 이미지에서 이 카메라와 겹치는 영역
+            for gid, per_cam in self.seen.items():
+                last = per_cam.get(nb)
+                if last is None or t - last[0] > self.handoff_window or self._claimed(cam, gid, t):
+                    continue
+                if back is not None and not _in_zone(_centre(last[1]), back):
+                    continue
+                sim = float(pose_similarity(pose[None], last[2][None], self.kappa)[0, 0])
+                if sim > best_sim:
+                    best, best_sim = gid, sim
+        return best if best is not None and best_sim >= self.min_pose_sim else None
+
+    def observe(self, t: float, cam: int, tid: int, bbox, pose: np.ndarray) -> int:
+        gid = self.local.get((cam, tid))
+        if gid is None:
+            gid = self._handoff(t, cam, bbox, pose)
+            if gid is None:
+                gid = self.next_gid
+                self.next_gid += 1
+            else:
+                self.handoffs += 1
+            self.local[(cam, tid)] = gid
+        self.seen.setdefault(gid, {})[cam] = (t, bbox, pose)
+        return gid
+
+    def expire(self, t: float) -> None:
+        """idle 초 넘게 안 보인 전역 트랙 정리 (메모리 상한)"""
+        dead = [g for g, per_cam in self.seen.items() if all(t - v[0] > self.idle for v in per_cam.values())]
+        if not dead:
+            return
+        dead_set = set(dead)
+        for g in dead:
+            del self.seen[g]
+        self.local = {k: g for k, g in self.local.items() if g not in dead_set}
+
+class EventDedup:
+    def __init__(self, window: float = 5.0):
+        self.window = window
+        self.recent: List[Tuple[float, int]] = []   # (t, gid)
+        self.duplicates = 0
+
+    def accept(self, t: float, gid: int) -> bool:
+        """같은 전역 id 의 이벤트가 window 초 안에 이미 있으면 False (gid < 0 은 항상 보고)"""
+        self.recent = [e for e in self.recent if t - e[0] <= self.window]
+        if gid >= 0 and any(egid == gid for _, egid in self.recent):
+            self.duplicates += 1
+            return False
+        self.recent.append((t, gid))
+        return True
+
+# ---------- 융합 루프 ----------
+_POLL = 0.01   # 모든 카메라가 조용할 때 큐를 다시 확인하는 간격 (초)
+
+def _merge_ticks(queues: List["queue.Queue[Optional[Tick]]"], live: bool, sync_timeout: float,
+                 on_end: Optional[Callable[[int], None]] = None) -> Iterator[Tick]:
+    """
+    카메라 큐들을 시각 순으로 병합. 살아 있는 모든 카메라의 다음 tick 을 본 뒤 가장 이른 것을 낸다.
+    live 소스는 카메라마다 마감 (마지막 도착 + sync_timeout) 까지만 기다린다. 마감이 지난 카메라는
+    다시 보낼 때까지 기다리지 않고, 나머지 카메라의 tick 을 바로 낸다.
+    on_end(c) 는 카메라 c 의 종료 표시(None)를 받는 즉시 호출된다 (예외를 던지면 병합도 멈춘다).
+    """
+    heads: List[Optional[Tick]] = [None] * len(queues)
+    active = set(range(len(queues)))
+    deadline = [time.monotonic() + sync_timeout] * len(queues)
+
+    def take(c: int, item: Optional[Tick]) -> None:
+        if item is None:
+            active.discard(c)
+            if on_end is not None:
+                on_end(c)
+        else:
+            heads[c] = item
+            deadline[c] = time.monotonic() + sync_timeout
+
+    while active:
+        for c in list(active):
+            if heads[c] is None:
+                try:
+                    take(c, queues[c].get_nowait() if live else queues[c].get())
+                except queue.Empty:
+                    pass
+        now = time.monotonic()
+        ready = [c for c in range(len(heads)) if heads[c] is not None]
+        waiting = [c for c in active if heads[c] is None and deadline[c] > now]
+        if waiting or not ready:
+            if not active:
+                break
+            # 마감 전인 카메라는 마감까지, 전부 마감이 지났으면 짧게 기다린 뒤 다시 확인
+            if waiting:
+                c = min(waiting, key=deadline.__getitem__)
+                timeout = deadline[c] - now
+            else:
+                c = min(active, key=deadline.__getitem__)
+                timeout = min(sync_timeout, _POLL)
+            try:
+                take(c, queues[c].get(timeout=timeout))
+            except queue.Empty:
+                pass
+            continue
+        c = min(ready, key=lambda i: heads[i].t)
+        tick, heads[c] = heads[c], None
+        yield tick
+
+def run_fusion(args: argparse.Namespace, cameras: List[Dict[str, Any]], events_out) -> Dict[str, Any]:
+    classifier = CLASSIFIERS[args.classifier](args)
+    stop = threading.Event()
+    queues: List["queue.Queue[Optional[Tick]]"] = [queue.Queue(maxsize=args.queue_size) for _ in cameras]
+    workers = [CameraWorker(i, cam, args, classifier, queues[i], stop) for i, cam in enumerate(cameras)]
+    tracks = GlobalTracks(cameras, handoff_window=args.handoff_window, min_pose_sim=args.min_pose_sim)
+    dedup = EventDedup(window=args.dedup_window)
+    fusion = LatencyStats()
+    live = any(is_live_source(c["source"]) for c in cameras) and not args.no_follow
+
+    def _check_worker(c: int) -> None:
+        """죽은 카메라는 다른 카메라가 끝날 때까지 기다리지 않고 바로 실패시킨다 (live 소스는 끝나지 않는다)"""
+        w = workers[c]
+        if w.error is not None:
+            raise RuntimeError(f"camera {w.cam['name']}: {w.error}") from w.error
+
+    for w in workers:
+        w.start()
+    n_events = 0
+    last_expire = None
+    try:
+        for tick in _merge_ticks(queues, live, args.sync_timeout, on_end=_check_worker):
+            t0 = time.perf_counter()
+            gids = {tid: tracks.observe(tick.t, tick.cam, tid, bbox, pose) for tid, bbox, pose in tick.obs}
+            for ev in tick.events:
+                tid = ev["track_id"]
+                gid = gids.get(tid, tracks.local.get((tick.cam, tid), -1))
+                if not dedup.accept(tick.t, gid):
+                    continue
+                n_events += 1
+                events_out.write(json.dumps({"time": round(tick.t, 3), "global_id": gid,
+                                             "camera": cameras[tick.cam]["name"], **ev}) + "\n")
+                events_out.flush()
+            if last_expire is None or tick.t - last_expire > 1.0:
+                tracks.expire(tick.t)
+                last_expire = tick.t
+            fusion.add("fuse", time.perf_counter() - t0)
+            fusion.count("ticks")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+
+    for c in range(len(workers)):
+        _check_worker(c)   # Ctrl-C 로 병합이 먼저 끝난 경우
+    report = fusion.summary()
+    report["counters"].update(global_ids=tracks.next_gid - 1, handoffs=tracks.handoffs,
+                              events=n_events, duplicate_events=dedup.duplicates)
+    report["cameras"] = {w.cam["name"]: w.service.metrics.summary() for w in workers}
+    return report
+
+def load_config(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    cameras = cfg.get("cameras", [])
+    if not cameras:
+        raise ValueError(f"No cameras in {path}")
+    names = [c.get("name") for c in cameras]
+    if None in names or len(set(names)) != len(names):
+        raise ValueError("Every camera needs a unique 'name'")
+    for c in cameras:
+        if "source" not in c:
+            raise ValueError(f"Camera {c['name']} has no 'source'")
+        for nb in c.get("zones", {}):
+            if nb not in names:
+                raise ValueError(f"Camera {c['name']}: zone for unknown camera {nb}")
+    return cameras
+
+def main():
+    ap = argparse.ArgumentParser(description="Fuse per-camera fall detection for one escalator on a shared clock.")
+    ap.add_argument("--config", required=True, help="Camera config JSON (see module docstring)")
+    ap.add_argument("--no-follow", action="store_true", help="Replay file sources to EOF instead of tailing them")
+    ap.add_argument("--queue-size", type=int, default=256, help="Max buffered ticks per camera")
+    ap.add_argument("--sync-timeout", type=float, default=0.2,
+                    help="Live sources: seconds to wait for a lagging camera before fusing without it")
+    ap.add_argument("--handoff-window", type=float, default=2.0, help="Max seconds between sightings for a handoff")
+    ap.add_argument("--min-pose-sim", type=float, default=0.3, help="Min pose similarity for a handoff")
+    ap.add_argument("--dedup-window", type=float, default=5.0, help="Seconds during which one fall is reported once")
+    add_detection_args(ap)
+    ap.add_argument("--events", default=None, help="Append fused events (JSON lines) here instead of stdout")
+    ap.add_argument("--metrics", default=None, help="Write the final report (JSON) here")
+    args = ap.parse_args()
+
+    events_out = None
+    try:
+        cameras = load_config(args.config)
+        events_out = open(args.events, "a", encoding="utf-8") if args.events else sys.stdout
+        report = run_fusion(args, cameras, events_out)
+    except Exception as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if events_out is not None and events_out is not sys.stdout:
+            events_out.close()
+
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(f"[stats] {json.dumps(report['counters'])}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lightweight CPU-only online tracker for convert_4bot instances (no external BoT-SORT pass).
+
+Each frame:
+  1) Kalman predict for every live track at once (constant velocity on cx, cy, w, h;
+     state and covariance are (T,8) / (T,8,8) arrays, so predict/update are batched)
+  2) association cost = 1 - [(1-w) * IoU + w * pose similarity], solved with
+     json_plus_track.linear_assignment; pairs with IoU < --min-iou are rejected
+  3) matched tracks get a Kalman update, unmatched detections start new tracks,
+     tracks not seen for more than max_age frames are dropped
+
+Pose similarity is OKS-style on root-centred keypoints:
+  mean_j exp(-|k_det_j - k_trk_j|^2 / (2 * kappa^2))
+RTMPose3D keypoints are 3D and not in image pixels, so the poses are centred on their
+mean before comparison and kappa is in keypoint units. It separates overlapping people
+whose boxes alone are ambiguous. pose_weight=0 gives plain IoU tracking.
+
+Usage (module)
+--------------
+    tracker = OnlineTracker()
+    for fid, boxes_xyxy, keypoints in frames:
+        track_ids = tracker.update(fid, boxes_xyxy, keypoints)   # (n,) int, -1 = tentative
+
+    track_frames(frames)   # frames: [{"frame_id", "instances": [...]}, ...], attaches track_id in place
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from json_plus_track import iou_matrix, linear_assignment
+
+# 상태: [cx, cy, w, h, vx, vy, vw, vh]
+_F = np.eye(8)
+_F[:4, 4:] = np.eye(4)
+_H = np.eye(4, 8)
+
+def _xyxy_to_cxcywh(b: np.ndarray) -> np.ndarray:
+    return np.stack([(b[:, 0] + b[:, 2]) * 0.5, (b[:, 1] + b[:, 3]) * 0.5,
+                     b[:, 2] - b[:, 0], b[:, 3] - b[:, 1]], axis=1)
+
+def _cxcywh_to_xyxy(s: np.ndarray) -> np.ndarray:
+    half = s[:, 2:4] * 0.5
+    return np.concatenate([s[:, :2] - half, s[:, :2] + half], axis=1)
+
+def pose_similarity(a: np.ndarray, b: np.ndarray, kappa: float) -> np.ndarray:
+    """a: (N,V,3), b: (M,V,3) root-centred OKS 유사도 -> (N,M). NaN 관절은 제외."""
+    a = a - _nan_mean(a, axis=1)[:, None]
+    b = b - _nan_mean(b, axis=1)[:, None]
+    d2 = ((a[:, None] - b[None, :]) ** 2).sum(-1)            # (N,M,V)
+    valid = ~np.isnan(d2)
+    sim = np.where(valid, np.exp(-np.where(valid, d2, 0.0) / (2.0 * kappa ** 2)), 0.0)
+    return sim.sum(-1) / np.maximum(valid.sum(-1), 1)
+
+def _nan_mean(a: np.ndarray, axis: int) -> np.ndarray:
+    valid = ~np.isnan(a)
+    return np.where(valid, a, 0.0).sum(axis) / np.maximum(valid.sum(axis), 1)
+
+class OnlineTracker:
+    def __init__(self,
+                 min_iou: float = 0.1,
+                 pose_weight: float = 0.3,
+                 kappa: float = 0.1,
+                 max_age: int = 30,
+                 min_hits: int = 1,
+                 std_weight_position: float = 1.0 / 20,
+                 std_weight_velocity: float = 1.0 / 160):
+        self.min_iou = min_iou
+        self.pose_weight = pose_weight
+        self.kappa = kappa
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.std_pos = std_weight_position
+        self.std_vel = std_weight_velocity
+
+        self.mean = np.zeros((0, 8))
+        self.cov = np.zeros((0, 8, 8))
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.hits = np.zeros(0, dtype=np.int64)
+        self.misses = np.zeros(0, dtype=np.int64)
+        self.poses: Optional[np.ndarray] = None  # (T,V,3) 마지막 관측 포즈
+        self.next_id = 1
+        self.last_frame: Optional[int] = None
+
+    # ----- Kalman (모든 트랙 일괄) -----
+    def _noise(self, wh: np.ndarray, pos: float, vel: float) -> np.ndarray:
+        """wh: (T,2) -> 대각 공분산 (T,8,8)"""
+        w, h = wh[:, 0], wh[:, 1]
+        std = np.stack([pos * w, pos * h, pos * w, pos * h, vel * w, vel * h, vel * w, vel * h], axis=1)
+        return np.einsum("ti,ij->tij", np.maximum(std, 1e-3) ** 2, np.eye(8))
+
+    def _predict(self, steps: int) -> None:
+        for _ in range(steps):
+            Q = self._noise(self.mean[:, 2:4], self.std_pos, self.std_vel)
+            self.mean = self.mean @ _F.T
+            self.cov = _F @ self.cov @ _F.T + Q
+            self.mean[:, 2:4] = np.maximum(self.mean[:, 2:4], 1e-3)
+
+    def _update(self, idx: np.ndarray, z: np.ndarray) -> None:
+        m, P = self.mean[idx], self.cov[idx]
+        R = self._noise(z[:, 2:4], self.std_pos, 0.0)[:, :4, :4]
+        S = _H @ P @ _H.T + R                                   # (k,4,4)
+        K = P @ _H.T @ np.linalg.inv(S)                         # (k,8,4)
+        self.mean[idx] = m + np.einsum("kij,kj->ki", K, z - m[:, :4])
+        self.cov[idx] = (np.eye(8) - K @ _H) @ P
+
+    def _spawn(self, z: np.ndarray, poses: Optional[np.ndarray]) -> None:
+        n = len(z)
+        mean = np.concatenate([z, np.zeros((n, 4))], axis=1)
+        cov = self._noise(z[:, 2:4], 2 * self.std_pos, 10 * self.std_vel)
+        self.mean = np.concatenate([self.mean, mean])
+        self.cov = np.concatenate([self.cov, cov])
+        self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + n)])
+        self.hits = np.concatenate([self.hits, np.ones(n, dtype=np.int64)])
+        self.misses = np.concatenate([self.misses, np.zeros(n, dtype=np.int64)])
+        if self.poses is not None:
+            new_poses = poses if poses is not None else np.full((n,) + self.poses.shape[1:], np.nan)
+            self.poses = np.concatenate([self.poses, new_poses])
+        self.next_id += n
+
+    # ----- 공개 API -----
+    def update(self, frame_id: int, boxes_xyxy: np.ndarray, keypoints: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        boxes_xyxy: (n,4), keypoints: (n,V,3) 또는 None
+        반환: (n,) track_id (min_hits 미만의 신규 트랙은 -1)
+        """
+        boxes = np.asarray(boxes_xyxy, dtype=np.float64).reshape(-1, 4)
+        poses = None if keypoints is None else np.asarray(keypoints, dtype=np.float64)
+        if poses is not None and (poses.ndim != 3 or len(poses) != len(boxes)):
+            poses = None
+        n = len(boxes)
+        if poses is not None and self.poses is None:   # 처음 관측된 관절 수로 포즈 버퍼 생성
+            self.poses = np.full((len(self.mean),) + poses.shape[1:], np.nan)
+        if poses is not None and poses.shape[1:] != self.poses.shape[1:]:
+            poses = None                               # 관절 수가 다른 프레임은 IoU만 사용
+
+        steps = 1 if self.last_frame is None else max(1, min(frame_id - self.last_frame, self.max_age + 1))
+        self.last_frame = frame_id
+        if len(self.mean):
+            self._predict(steps)
+            self.misses += steps - 1
+
+        z = _xyxy_to_cxcywh(boxes)
+        det_track = np.full(n, -1, dtype=np.int64)   # det -> track 행 index
+        if len(self.mean) and n:
+            iou = iou_matrix(boxes, _cxcywh_to_xyxy(self.mean[:, :4]))
+            sim = iou
+            if self.pose_weight > 0 and poses is not None:
+                sim = (1 - self.pose_weight) * iou + self.pose_weight * pose_similarity(poses, self.poses, self.kappa)
+            rows, cols = linear_assignment(1.0 - sim)
+            ok = iou[rows, cols] >= max(self.min_iou, 1e-9)
+            rows, cols = rows[ok], cols[ok]
+            det_track[rows] = cols
+            if len(rows):
+                self._update(cols, z[rows])
+                self.hits[cols] += 1
+                self.misses[cols] = 0
+                if poses is not None:
+                    self.poses[cols] = poses[rows]
+
+        # 매칭 안 된 트랙 나이 증가 / 신규 트랙 생성
+        matched = np.zeros(len(self.mean), dtype=bool)
+        matched[det_track[det_track >= 0]] = True
+        self.misses[~matched] += 1
+        new = np.flatnonzero(det_track < 0)
+        if len(new):
+            start = len(self.mean)
+            self._spawn(z[new], None if poses is None else poses[new])
+            det_track[new] = np.arange(start, start + len(new))
+        out = self.ids[det_track] if n else np.zeros(0, dtype=np.int64)
+        out = np.where(self.hits[det_track] >= self.min_hits, out, -1) if n else out
+
+        # 오래된 트랙 제거
+        alive = self.misses <= self.max_age
+        if not alive.all():
+            self.mean, self.cov = self.mean[alive], self.cov[alive]
+            self.ids, self.hits, self.misses = self.ids[alive], self.hits[alive], self.misses[alive]
+            if self.poses is not None:
+                self.poses = self.poses[alive]
+        return out
+
+def _instance_poses(insts: List[Dict[str, Any]]) -> Optional[np.ndarray]:
+    """모든 인스턴스가 같은 관절 수면 (n,V,3), 아니면 None"""
+    try:
+        poses = np.asarray([i.get("keypoints") or [] for i in insts], dtype=np.float64)
+    except ValueError:
+        return None
+    if poses.ndim == 4 and poses.shape[1] == 1:   # [[[x,y,z],...]] 한 겹 더 감싼 경우
+        poses = poses[:, 0]
+    return poses if poses.ndim == 3 and poses.shape[-1] >= 3 else None
+
+def track_instances(tracker: OnlineTracker, frame_id: int, insts: List[Dict[str, Any]]) -> None:
+    """한 프레임의 instances 에 track_id 를 부착 (convert_4bot 의 instance 스키마)"""
+    if not insts:
+        tracker.update(frame_id, np.zeros((0, 4)))
+        return
+    boxes = np.asarray([i["bbox"] for i in insts], dtype=np.float64)
+    poses = _instance_poses(insts)
+    tids = tracker.update(frame_id, boxes, None if poses is None else poses[..., :3])
+    for inst, tid in zip(insts, tids.tolist()):
+        inst["track_id"] = tid
+
+def track_frames(frames: List[Dict[str, Any]], tracker: Optional[OnlineTracker] = None, **kwargs) -> Dict[str, int]:
+    """frames 전체를 순서대로 추적. 반환: 통계 dict"""
+    tracker = tracker or OnlineTracker(**kwargs)
+    n_inst = 0
+    for fr in frames:
+        insts = fr.get("instances", [])
+        track_instances(tracker, int(fr.get("frame_id", 0)), insts)
+        n_inst += len(insts)
+    return {"instances": n_inst, "tracks": tracker.next_id - 1}
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Single-pass pipeline for one video:
+  results_*.json -> (convert_4bot) -> [tracker stage] -> (json2_shiftgcn) -> .skeleton
+
+All stages run in memory; intermediate files are only written when asked for
+with --save-4bot-json / --save-convert-json / --save-tracked.
+
+Tracker stage (--tracker)
+  none    : no tracking; json2_shiftgcn falls back to within-frame order as track_id
+  botsort : merge an existing BoT-SORT txt (--botsort) like json_plus_track.py
+  online  : built-in Kalman + IoU/pose tracker (online_tracker.py), no external pass
+
+Other trackers can be plugged in with register_tracker(name, factory), where
+factory(args) returns a callable that attaches "track_id" to every instance of
+the frames list in place and returns a stats dict.
+
+Usage
+-----
+python pipeline.py --input /root/dhyee/output_rtm/2247456/results_2247456.json \
+       --out /root/dhyee/skeleton/001A001.skeleton --joints 17 \
+       --tracker botsort --botsort /root/dhyee/output_tracking/2247456/2247456_botsort.txt \
+       [--save-tracked /root/dhyee/output_tracking/2247456/2247456_botsort.kps]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+import fastjson
+from convert_4bot import JsonArrayWriter, iter_frames
+from json2_shiftgcn import write_skeleton_chunks
+from json_plus_track import MATCHERS, assign_track_ids, load_botsort_array, write_tracked_store
+from online_tracker import track_frames
+from pose_sequence import PoseSequence
+
+Frames = List[Dict[str, Any]]
+Tracker = Callable[[Frames], Dict[str, int]]
+
+# ---------- tracker 레지스트리 ----------
+TRACKERS: Dict[str, Callable[[argparse.Namespace], Tracker]] = {}
+
+def register_tracker(name: str, factory: Callable[[argparse.Namespace], Tracker]) -> None:
+    TRACKERS[name] = factory
+
+def _no_tracker(args: argparse.Namespace) -> Tracker:
+    return lambda frames: {}
+
+def _botsort_tracker(args: argparse.Namespace) -> Tracker:
+    if not args.botsort:
+        raise ValueError("--tracker botsort requires --botsort <txt>")
+
+    def _track(frames: Frames) -> Dict[str, int]:
+        return assign_track_ids(frames, load_botsort_array(args.botsort),
+                                min_iou=args.min_iou,
+                                use_center_fallback=args.use_center_fallback,
+                                matcher=args.matcher)
+    return _track
+
+def _online_tracker(args: argparse.Namespace) -> Tracker:
+    return lambda frames: track_frames(frames, min_iou=max(args.min_iou, 0.1))
+
+register_tracker("none", _no_tracker)
+register_tracker("botsort", _botsort_tracker)
+register_tracker("online", _online_tracker)
+
+# ---------- 파이프라인 ----------
+def run_pipeline(args: argparse.Namespace) -> Dict[str, Any]:
+    timings: Dict[str, float] = {}
+    tracker = TRACKERS[args.tracker](args)
+
+    # 1) convert (필요할 때만 중간 JSON 기록)
+    t0 = time.perf_counter()
+    bbox_writer = JsonArrayWriter(args.save_4bot_json) if args.save_4bot_json else None
+    kps_writer = JsonArrayWriter(args.save_convert_json) if args.save_convert_json else None
+    frames: Frames = []
+    try:
+        for fid, xyxy5, insts in iter_frames(args.input, args.min_score, stream=args.stream):
+            if bbox_writer is not None:
+                bbox_writer.write({"frame_id": fid, "dets_xyxy5": xyxy5})
+            if kps_writer is not None:
+                kps_writer.write({"frame_id": fid, "instances": insts})
+            frames.append({"frame_id": fid, "instances": insts})
+    except BaseException:
+        for w in (bbox_writer, kps_writer):
+            if w is not None:
+                w.abort()
+        raise
+    for w in (bbox_writer, kps_writer):
+        if w is not None:
+            w.close()
+    timings["convert"] = time.perf_counter() - t0
+
+    # 2) tracker
+    t0 = time.perf_counter()
+    track_stats = tracker(frames)
+    if args.save_tracked:
+        if args.save_tracked.lower().endswith(".json"):
+            fastjson.dump(frames, args.save_tracked)
+        else:
+            write_tracked_store(frames, args.save_tracked)
+    timings["track"] = time.perf_counter() - t0
+
+    # 3) Shift-GCN skeleton
+    t0 = time.perf_counter()
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    seq = PoseSequence.from_frames(frames, dtype=np.float64)   # tracker 가 붙인 track_id 포함
+    write_skeleton_chunks(seq.skeleton_chunks(args.joints, args.require_nonzero), args.out)
+    timings["skeleton"] = time.perf_counter() - t0
+
+    return {"frames": len(frames), "track_stats": track_stats, "timings": timings}
+
+def main():
+    ap = argparse.ArgumentParser(description="results_*.json -> tracked keypoints -> Shift-GCN skeleton in one pass.")
+    ap.add_argument("--input", required=True, help="RTMPose3D results_*.json")
+    ap.add_argument("--out", required=True, help="Output .skeleton path")
+    ap.add_argument("--joints", type=int, required=True, help="Joint count V (e.g., 17)")
+    ap.add_argument("--min-score", type=float, default=0.0, help="Minimum bbox score filter")
+    ap.add_argument("--stream", action="store_true", help="Parse results JSON incrementally")
+    ap.add_argument("--require-nonzero", action="store_true", help="Drop persons whose joints are all (0,0,0)")
+
+    ap.add_argument("--tracker", choices=sorted(TRACKERS), default="none", help="Tracker stage")
+    ap.add_argument("--botsort", default=None, help="BoT-SORT txt for --tracker botsort")
+    ap.add_argument("--matcher", choices=MATCHERS, default="hungarian", help="Matcher for --tracker botsort")
+    ap.add_argument("--min-iou", type=float, default=0.0, help="Minimum IoU for --tracker botsort/online (online uses at least 0.1)")
+    ap.add_argument("--use-center-fallback", action="store_true", help="Center-distance fallback for --tracker botsort")
+
+    ap.add_argument("--save-4bot-json", default=None, help="Also write the bbox-only JSON (BoT-SORT input)")
+    ap.add_argument("--save-convert-json", default=None, help="Also write the keypoint JSON")
+    ap.add_argument("--save-tracked", default=None, help="Also write tracked keypoints (.json file, otherwise store dir)")
+    args = ap.parse_args()
+
+    try:
+        result = run_pipeline(args)
+    except Exception as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(1)
+
+    t = result["timings"]
+    print(f"[OK] {args.input} -> {args.out} ({result['frames']} frames)")
+    print(f"[stats] {result['track_stats']}")
+    print(f"[time] convert {t['convert']:.2f}s | track {t['track']:.2f}s | skeleton {t['skeleton']:.2f}s")
+
+if __name__ == "__main__":
+    main()
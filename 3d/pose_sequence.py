@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Array-backed model of one video's detections: a struct-of-arrays instead of
+[{"frame_id", "instances": [{"bbox", "keypoints": [[x,y,z], ...], ...}]}] lists of dicts.
+
+  frame_ids        (F,)      int64    frame_id of every frame, in video order
+  offsets          (F+1,)    int64    rows of frame i are [offsets[i], offsets[i+1])
+  track_id         (N,)      int64    per instance; None if the source had no track ids
+  bbox             (N,4)     x1,y1,x2,y2 (NaN if the instance had none)
+  score            (N,)      bbox score
+  keypoints        (N,V,3)   NaN padded to the largest V of the video
+  keypoint_scores  (N,V)     NaN padded
+  num_keypoints    (N,)      int32    joints each instance really had (before padding)
+
+A 17-joint instance costs ~300 bytes as float32 arrays (~530 as float64) instead of ~4 KB
+as nested lists of Python floats, and every stage can work on whole columns at once.
+Float columns use the dtype given to the loader: float32 by default (the keypoint store's
+precision), float64 to keep JSON values exact (load_sequence keeps the source's precision).
+
+Loaders
+  PoseSequence.from_results(path)    RTMPose3D results_*.json, same filtering/merging as
+                                     convert_4bot (min_score, stream=True bounds memory)
+  PoseSequence.from_frames(frames)   convert_4bot / json_plus_track keypoint JSON schema
+  PoseSequence.from_store(dir)       kps_store directory (no parsing at all)
+  load_sequence(path)                store dir or frame-list JSON (json2_shiftgcn's inputs)
+
+Converters to the existing outputs
+  .to_frames()          keypoint JSON schema (track_id included when present)
+  .to_dets()            convert_4bot bbox JSON [{"frame_id", "dets_xyxy5"}]
+  .to_store(dir)        kps_store directory
+  .skeleton_chunks()    json2_shiftgcn .skeleton text (write_skeleton gives the same bytes)
+  .track_sequences()    per-track sequences (json2_shiftgcn windows / ragged export)
+  .to_tensor()          one (N,C,T,V,M) sample (json2_shiftgcn --export-tensor)
+
+These are the only implementation of the skeleton formatting, require_nonzero masking
+and motion-energy body selection; json2_shiftgcn's frame-list helpers wrap them.
+"""
+
+import os
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import fastjson
+from convert_4bot import extract_xyxy_from_bbox, iter_frames
+from kps_store import KpsStore, is_store_dir, open_store
+
+TRACK_ID_KEYS = ("track_id", "tracking_id", "id", "person_id")
+
+# ---------- dict -> 배열 ----------
+def _instance_track_id(inst: Dict[str, Any]) -> Optional[int]:
+    """TRACK_ID_KEYS 중 처음 있는 키의 정수값 (없거나 정수가 아니면 None)"""
+    for k in TRACK_ID_KEYS:
+        if k in inst:
+            try:
+                return int(inst[k])
+            except (TypeError, ValueError):
+                return None
+    return None
+
+def _keypoints_row(kpts: Any) -> np.ndarray:
+    """한 인스턴스의 keypoints -> (V,3). [[[...]]] 처럼 한 겹 더 감싼 경우도 허용"""
+    if isinstance(kpts, list) and len(kpts) == 1 and isinstance(kpts[0], list):
+        kpts = kpts[0]
+    try:
+        arr = np.asarray(kpts, dtype=np.float64)
+    except (ValueError, TypeError):
+        arr = None
+    if arr is not None and arr.size == 0:
+        return np.zeros((0, 3))
+    if arr is None or arr.ndim != 2 or arr.shape[1] < 3:
+        raise ValueError("Invalid keypoints structure; expected list of [x,y,z].")
+    return arr[:, :3]
+
+def _pad_rows(rows: List[np.ndarray], width: int, inner: Tuple[int, ...]) -> np.ndarray:
+    out = np.full((len(rows), width) + inner, np.nan)
+    for i, r in enumerate(rows):
+        out[i, :len(r)] = r
+    return out
+
+def _keypoints_block(kps_list: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """n 개 인스턴스의 keypoints -> (n,V,3) NaN 패딩, (n,) 관절 수. 관절 수가 같으면 한 번에 변환"""
+    n = len(kps_list)
+    if n and isinstance(kps_list[0], list) and kps_list[0] and isinstance(kps_list[0][0], list):
+        # 흔한 경우 ([[x,y,z], ...] 가 모두 같은 길이): 평탄화 fromiter 가 중첩 리스트 asarray 보다 ~2배 빠르다
+        v = len(kps_list[0])
+        if all(type(k) is list and len(k) == v for k in kps_list) and \
+                all(type(pt) is list and len(pt) == 3 for k in kps_list for pt in k):
+            try:
+                flat = np.fromiter(chain.from_iterable(chain.from_iterable(kps_list)),
+                                   dtype=np.float64, count=n * v * 3)
+                return flat.reshape(n, v, 3), np.full(n, v, dtype=np.int32)
+            except (ValueError, TypeError):
+                pass
+    try:
+        arr = np.asarray(kps_list, dtype=np.float64)
+    except (ValueError, TypeError):
+        arr = None
+    if arr is not None and arr.ndim == 4 and arr.shape[1] == 1:
+        arr = arr[:, 0]
+    if arr is not None and n and arr.ndim == 3 and arr.shape[2] >= 3:
+        return arr[:, :, :3], np.full(n, arr.shape[1], dtype=np.int32)
+    rows = [_keypoints_row(k) for k in kps_list]
+    counts = np.array([len(r) for r in rows], dtype=np.int32)
+    return _pad_rows(rows, int(counts.max(initial=0)), (3,)), counts
+
+def _scores_block(scores_list: List[Any]) -> np.ndarray:
+    """n 개 인스턴스의 keypoint_scores -> (n,V) NaN 패딩"""
+    try:
+        arr = np.asarray(scores_list, dtype=np.float64)
+        if arr.ndim >= 2 or (arr.ndim == 1 and len(arr) == 0):
+            return arr.reshape(len(scores_list), -1)
+    except (ValueError, TypeError):
+        pass
+    rows = [np.asarray(s if s is not None else [], dtype=np.float64).reshape(-1) for s in scores_list]
+    return _pad_rows(rows, max((len(r) for r in rows), default=0), ())
+
+def _bbox_block(insts: List[Dict[str, Any]]) -> np.ndarray:
+    """n 개 인스턴스의 bbox -> (n,4). [x1,y1,x2,y2] / [[x1,y1,x2,y2]] 가 섞이거나 없으면 한 행씩"""
+    n = len(insts)
+    try:
+        arr = np.asarray([i.get("bbox") for i in insts], dtype=np.float64)
+        if arr.shape == (n, 1, 4):
+            arr = arr[:, 0]
+        if arr.shape == (n, 4):
+            return arr
+    except (ValueError, TypeError):
+        pass
+    boxes = [extract_xyxy_from_bbox(i.get("bbox")) for i in insts]
+    return np.array([b if b is not None else [np.nan] * 4 for b in boxes], dtype=np.float64).reshape(n, 4)
+
+class _Columns:
+    """
+    프레임을 받아 인스턴스 dict 를 모았다가 chunk_rows 개마다 한 번에 배열 블록으로 바꾼다
+    (numpy 변환 호출 수를 줄이고, 스트리밍 로드에서는 dict 를 chunk 분량만 들고 있게 한다).
+    """
+    def __init__(self, chunk_rows: int = 65536):
+        self.chunk_rows = chunk_rows
+        self.frame_ids: List[int] = []
+        self.counts: List[int] = []
+        self.pending: List[Dict[str, Any]] = []
+        self.pending_counts: List[int] = []
+        self.blocks: Dict[str, List[np.ndarray]] = {k: [] for k in
+                                                    ("bbox", "score", "keypoints", "num_keypoints",
+                                                     "keypoint_scores", "track_id")}
+        self.has_track_ids = False
+
+    def add(self, frame_id: int, insts: List[Dict[str, Any]]) -> None:
+        self.frame_ids.append(int(frame_id))
+        self.counts.append(len(insts))
+        self.pending.extend(insts)
+        self.pending_counts.append(len(insts))
+        if len(self.pending) >= self.chunk_rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        insts, counts = self.pending, self.pending_counts
+        self.pending, self.pending_counts = [], []
+        n = len(insts)
+        if n == 0:
+            return
+        scores = np.array([i.get("bbox_score", i.get("score", None)) for i in insts], dtype=np.float64)
+        scores[np.isnan(scores)] = 1.0   # score 가 없으면 1.0 (convert_4bot 과 동일)
+        kps, nkp = _keypoints_block([i.get("keypoints") or [] for i in insts])
+
+        # track id 가 없으면 프레임 안 순서 (1부터) — json2_shiftgcn.get_track_id 와 같은 규칙
+        tids = [_instance_track_id(i) for i in insts]
+        missing = np.fromiter((t is None for t in tids), dtype=bool, count=n)
+        if not missing.all():
+            self.has_track_ids = True
+        tid_arr = np.array([-1 if t is None else t for t in tids], dtype=np.int64)
+        if missing.any():
+            starts = np.repeat(np.cumsum([0] + counts[:-1]), counts)
+            tid_arr[missing] = (np.arange(n) - starts + 1)[missing]
+
+        b = self.blocks
+        b["bbox"].append(_bbox_block(insts))
+        b["score"].append(scores)
+        b["keypoints"].append(kps)
+        b["num_keypoints"].append(nkp)
+        b["keypoint_scores"].append(_scores_block([i.get("keypoint_scores") or [] for i in insts]))
+        b["track_id"].append(tid_arr)
+
+    def build(self, dtype) -> "PoseSequence":
+        self._flush()
+        b = self.blocks
+        n = sum(self.counts)
+        V = max([k.shape[1] for k in b["keypoints"]] + [s.shape[1] for s in b["keypoint_scores"]], default=0)
+        kps = np.full((n, V, 3), np.nan, dtype=dtype)
+        kp_scores = np.full((n, V), np.nan, dtype=dtype)
+        pos = 0
+        for k, s in zip(b["keypoints"], b["keypoint_scores"]):
+            kps[pos:pos + len(k), :k.shape[1]] = k
+            kp_scores[pos:pos + len(s), :s.shape[1]] = s
+            pos += len(k)
+
+        def _cat(name, empty):
+            return np.concatenate(b[name]) if b[name] else empty
+
+        return PoseSequence(
+            frame_ids=np.asarray(self.frame_ids, dtype=np.int64),
+            offsets=np.concatenate([[0], np.cumsum(self.counts, dtype=np.int64)]),
+            bbox=_cat("bbox", np.zeros((0, 4))).astype(dtype, copy=False),
+            score=_cat("score", np.zeros(0)).astype(dtype, copy=False),
+            keypoints=kps,
+            keypoint_scores=kp_scores,
+            num_keypoints=_cat("num_keypoints", np.zeros(0, dtype=np.int32)),
+            track_id=_cat("track_id", np.zeros(0, dtype=np.int64)) if self.has_track_ids else None,
+        )
+
+def _motion_energy(s: np.ndarray) -> float:
+    """s: (T,V,3). 사람이 있는 프레임들의 x/y/z std 합 (Shift-GCN gendata 규칙)"""
+    s = s[s.reshape(len(s), -1).any(axis=1)]
+    if len(s) == 0:
+        return 0.0
+    return float(s[..., 0].std() + s[..., 1].std() + s[..., 2].std())
+
+# ---------- PoseSequence ----------
+class PoseSequence:
+    def __init__(self,
+                 frame_ids: np.ndarray,
+                 offsets: np.ndarray,
+                 bbox: np.ndarray,
+                 score: np.ndarray,
+                 keypoints: np.ndarray,
+                 keypoint_scores: np.ndarray,
+                 num_keypoints: Optional[np.ndarray] = None,
+                 track_id: Optional[np.ndarray] = None):
+        self.frame_ids = np.asarray(frame_ids, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.bbox = bbox
+        self.score = score
+        self.keypoints = keypoints
+        self.keypoint_scores = keypoint_scores
+        n = int(self.offsets[-1])
+        if num_keypoints is None:
+            num_keypoints = np.full(n, keypoints.shape[1], dtype=np.int32)
+        self.num_keypoints = np.asarray(num_keypoints, dtype=np.int32)
+        self.track_id = None if track_id is None else np.asarray(track_id, dtype=np.int64)
+        if len(self.offsets) != len(self.frame_ids) + 1:
+            raise ValueError(f"offsets must have F+1 = {len(self.frame_ids) + 1} entries, got {len(self.offsets)}")
+        for name in ("bbox", "score", "keypoints", "keypoint_scores", "num_keypoints", "track_id"):
+            a = getattr(self, name)
+            if a is not None and len(a) != n:
+                raise ValueError(f"{name} has {len(a)} rows, offsets say {n}")
+
+    # ---------- 기본 정보 ----------
+    def __len__(self) -> int:
+        """인스턴스(행) 수"""
+        return int(self.offsets[-1])
+
+    @property
+    def num_frames(self) -> int:
+        return len(self.frame_ids)
+
+    @property
+    def num_joints(self) -> int:
+        return self.keypoints.shape[1]
+
+    @property
+    def has_track_ids(self) -> bool:
+        return self.track_id is not None
+
+    @property
+    def frame_index(self) -> np.ndarray:
+        """(N,) 각 행의 프레임 위치 (0..F-1)"""
+        return np.repeat(np.arange(self.num_frames, dtype=np.int64), np.diff(self.offsets))
+
+    @property
+    def frame_id(self) -> np.ndarray:
+        """(N,) 각 행의 frame_id"""
+        return self.frame_ids[self.frame_index]
+
+    def track_ids(self) -> np.ndarray:
+        """(N,) track_id, 없으면 프레임 안 순서 (1부터; json2_shiftgcn 의 fallback 과 동일)"""
+        if self.track_id is not None:
+            return self.track_id
+        return np.arange(len(self), dtype=np.int64) - np.repeat(self.offsets[:-1], np.diff(self.offsets)) + 1
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.frame_ids, self.offsets, self.bbox, self.score, self.keypoints,
+                  self.keypoint_scores, self.num_keypoints, self.track_id)
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    def frame(self, i: int) -> Dict[str, Any]:
+        """i 번째 프레임의 행들 (복사 없는 view)"""
+        s, e = int(self.offsets[i]), int(self.offsets[i + 1])
+        out = {"frame_id": int(self.frame_ids[i]), "bbox": self.bbox[s:e], "score": self.score[s:e],
+               "keypoints": self.keypoints[s:e], "keypoint_scores": self.keypoint_scores[s:e],
+               "num_keypoints": self.num_keypoints[s:e]}
+        if self.track_id is not None:
+            out["track_id"] = self.track_id[s:e]
+        return out
+
+    # ---------- 로더 ----------
+    @classmethod
+    def from_frames(cls, frames: List[Dict[str, Any]], dtype=np.float32) -> "PoseSequence":
+        """[{"frame_id", "instances": [...]}, ...] (순서 그대로; frame_id 가 없으면 -1)"""
+        cols = _Columns()
+        for fr in frames:
+            cols.add(fr.get("frame_id", -1), fr.get("instances", []) or [])
+        return cols.build(dtype)
+
+    @classmethod
+    def from_results(cls, path: str, min_score: float = 0.0, stream: bool = False,
+                     dtype=np.float32) -> "PoseSequence":
+        """
+        RTMPose3D results_*.json. convert_4bot 과 같은 규칙 (bbox 없는 인스턴스 / min_score 미만 제외,
+        같은 frame_id 병합, 유효 인스턴스가 없는 프레임 제외).
+        stream=True 면 한 프레임씩 읽어서 dict 는 배열로 바꾸기 전의 한 chunk 분량만 메모리에 있다.
+        """
+        cols = _Columns()
+        for fid, _, insts in iter_frames(path, min_score, stream=stream):
+            cols.add(fid, insts)   # insts 는 parse_frame_entry 가 bbox/score 를 정리한 것
+        return cols.build(dtype)
+
+    @classmethod
+    def from_store(cls, store: Any, dtype=np.float32) -> "PoseSequence":
+        """kps_store 디렉터리 또는 KpsStore. 관절 수는 뒤쪽 NaN 패딩을 빼고 센다"""
+        if not isinstance(store, KpsStore):
+            store = open_store(str(store))
+        a = store.arrays
+        boxes = np.asarray(a["bboxes_xyxy5"], dtype=dtype)
+        kps = np.asarray(a["keypoints_xyz"], dtype=dtype)
+        valid = ~np.isnan(kps).all(axis=2)                                    # (N,V)
+        nkp = np.zeros(len(kps), dtype=np.int32)
+        if kps.shape[1]:
+            nkp = np.where(valid.any(axis=1), kps.shape[1] - np.argmax(valid[:, ::-1], axis=1), 0)
+        return cls(frame_ids=np.array(store.frame_ids), offsets=np.array(store.frame_offsets),
+                   bbox=boxes[:, :4].copy(), score=boxes[:, 4].copy(), keypoints=kps,
+                   keypoint_scores=np.asarray(a["keypoint_scores"], dtype=dtype),
+                   num_keypoints=nkp,
+                   track_id=np.array(a["track_ids"]) if "track_ids" in a else None)
+
+    # ---------- 기존 출력 형식으로 ----------
+    def to_frames(self) -> List[Dict[str, Any]]:
+        """convert_4bot / json_plus_track 의 keypoint JSON 스키마 (kps_store.store_to_frames 와 같은 모양)"""
+        tids = self.track_id.tolist() if self.track_id is not None else None
+        bbox, score, nkp = self.bbox.tolist(), self.score.tolist(), self.num_keypoints.tolist()
+        frames = []
+        for i in range(self.num_frames):
+            s, e = int(self.offsets[i]), int(self.offsets[i + 1])
+            insts = []
+            for r in range(s, e):
+                k = nkp[r]
+                sc = self.keypoint_scores[r]
+                inst = {"bbox": bbox[r], "score": score[r],
+                        "keypoints": self.keypoints[r, :k].tolist(),
+                        "keypoint_scores": sc[:int(np.flatnonzero(~np.isnan(sc))[-1]) + 1].tolist()
+                        if (~np.isnan(sc)).any() else []}
+                if tids is not None:
+                    inst["track_id"] = tids[r]
+                insts.append(inst)
+            frames.append({"frame_id": int(self.frame_ids[i]), "instances": insts})
+        return frames
+
+    def to_dets(self) -> List[Dict[str, Any]]:
+        """convert_4bot 의 bbox JSON: [{"frame_id", "dets_xyxy5": [[x1,y1,x2,y2,score], ...]}]"""
+        xyxy5 = np.concatenate([self.bbox, self.score[:, None]], axis=1).tolist()
+        return [{"frame_id": int(fid), "dets_xyxy5": xyxy5[int(s):int(e)]}
+                for fid, s, e in zip(self.frame_ids, self.offsets[:-1], self.offsets[1:])]
+
+    def to_store(self, store_dir: str) -> int:
+        """
+        kps_store 디렉터리로 저장 (frame_id 는 오름차순이어야 하고, 같은 frame_id 는 한 프레임으로 병합).
+        반환: 저장된 프레임 수
+        """
+        fids = self.frame_ids
+        if np.any(np.diff(fids) < 0):
+            raise ValueError("frame_ids must be ascending to write a store")
+        first = np.concatenate([[True], fids[1:] != fids[:-1]]) if len(fids) else np.zeros(0, dtype=bool)
+        os.makedirs(store_dir, exist_ok=True)
+
+        def _save(name, arr):
+            np.save(os.path.join(store_dir, f"{name}.npy"), arr)
+
+        _save("frame_ids", fids[first])
+        _save("frame_offsets", np.append(self.offsets[:-1][first], self.offsets[-1]).astype(np.int64))
+        _save("bboxes_xyxy5", np.concatenate([self.bbox, self.score[:, None]], axis=1).astype(np.float32))
+        _save("keypoints_xyz", self.keypoints.astype(np.float32, copy=False))
+        _save("keypoint_scores", self.keypoint_scores.astype(np.float32, copy=False))
+        track_path = os.path.join(store_dir, "track_ids.npy")
+        if self.track_id is not None:
+            _save("track_ids", self.track_id)
+        elif os.path.exists(track_path):
+            os.remove(track_path)  # 이전 실행의 잔여 파일
+        return int(first.sum())
+
+    def _check_joints(self, joints: int, rows: Optional[np.ndarray] = None) -> None:
+        """rows (기본: 전체) 중 관절 수가 joints 가 아닌 첫 행이 있으면 json2_shiftgcn 과 같은 ValueError"""
+        nkp = self.num_keypoints if rows is None else self.num_keypoints[rows]
+        bad = np.flatnonzero(nkp != joints)
+        if len(bad):
+            r = int(bad[0]) if rows is None else int(np.flatnonzero(rows)[bad[0]])
+            raise ValueError(
+                f"keypoints length {int(self.num_keypoints[r])} != --joints {joints} "
+                f"(frame_id={int(self.frame_id[r])}, track_id={int(self.track_ids()[r])})"
+            )
+
+    def _rows_by_frame(self, keep: np.ndarray) -> np.ndarray:
+        """
+        keep 인 행들을 (프레임, track_id) 순으로 정렬한 인덱스. 같은 프레임에 같은 track_id 가
+        여러 번 있으면 마지막 행만 남긴다 (dict 에 덮어쓰던 기존 동작과 동일).
+        """
+        rows = np.flatnonzero(keep)
+        t, tid = self.frame_index[rows], self.track_ids()[rows]
+        order = np.lexsort((rows, tid, t))
+        rows, t, tid = rows[order], t[order], tid[order]
+        last = np.ones(len(rows), dtype=bool)
+        last[:-1] = (t[1:] != t[:-1]) | (tid[1:] != tid[:-1])
+        return rows[last]
+
+    def skeleton_chunks(self, joints: int, require_nonzero: bool = False) -> Iterator[str]:
+        """Shift-GCN .skeleton 텍스트를 프레임 단위로 yield (json2_shiftgcn.iter_skeleton_chunks 가 이것을 쓴다)"""
+        self._check_joints(joints)
+        keep = np.ones(len(self), dtype=bool)
+        if require_nonzero:
+            keep &= self.keypoints.any(axis=(1, 2))
+        rows = self._rows_by_frame(keep)
+        bounds = np.searchsorted(self.frame_index[rows], np.arange(self.num_frames + 1))
+        tids = self.track_ids()
+        fmt = "%d\n" + f"{int(joints)}\n" + "%r %r %r\n" * joints
+
+        yield f"{self.num_frames}\n"
+        for f in range(self.num_frames):
+            sel = rows[bounds[f]:bounds[f + 1]]
+            vals = self.keypoints[sel].astype(np.float64).reshape(len(sel), joints * 3).tolist()
+            parts = [f"{len(sel)}\n"]
+            for tid, v in zip(tids[sel].tolist(), vals):
+                parts.append(fmt % (tid, *v))
+            yield "".join(parts)
+
+    def track_sequences(self, joints: int,
+                        require_nonzero: bool = False) -> Dict[int, Tuple[int, np.ndarray, np.ndarray]]:
+        """{tid: (첫 프레임 위치, (F,V,3) float32, (F,) present)}. 음수 track_id 는 제외"""
+        self._check_joints(joints)
+        tids = self.track_ids()
+        keep = tids >= 0
+        if require_nonzero:
+            keep &= self.keypoints.any(axis=(1, 2))
+        rows = self._rows_by_frame(keep)
+        if len(rows) == 0:
+            return {}
+        rows = rows[np.argsort(tids[rows], kind="stable")]                   # track 별로, 프레임 순서 유지
+        t_all = self.frame_index
+        out = {}
+        for r in np.split(rows, np.flatnonzero(np.diff(tids[rows])) + 1):
+            ts = t_all[r]
+            first = int(ts[0])
+            seq = np.zeros((int(ts[-1]) - first + 1, joints, 3), dtype=np.float32)
+            seq[ts - first] = self.keypoints[r]
+            present = np.zeros(len(seq), dtype=bool)
+            present[ts - first] = True
+            out[int(tids[r[0]])] = (first, seq, present)
+        return out
+
+    def to_tensor(self, joints: int, max_frames: int = 300, max_bodies: int = 2,
+                  require_nonzero: bool = False) -> np.ndarray:
+        """(C=3, max_frames, V, max_bodies) float32 샘플. motion energy 가 큰 max_bodies 개 track"""
+        in_range = self.frame_index < max_frames
+        self._check_joints(joints, in_range)
+        keep = in_range.copy()
+        if require_nonzero:
+            keep &= self.keypoints.any(axis=(1, 2))
+        rows = self._rows_by_frame(keep)
+        tids = self.track_ids()[rows]
+        t = self.frame_index[rows]
+
+        per_track: Dict[int, np.ndarray] = {}
+        energy: Dict[int, float] = {}
+        for tid in np.unique(tids).tolist():
+            m = tids == tid
+            buf = np.zeros((max_frames, joints, 3), dtype=np.float32)
+            buf[t[m]] = self.keypoints[rows[m]]
+            per_track[tid] = buf
+            energy[tid] = _motion_energy(buf)
+        chosen = sorted(per_track, key=lambda tid: (-energy[tid], tid))[:max_bodies]
+        out = np.zeros((3, max_frames, joints, max_bodies), dtype=np.float32)
+        for m, tid in enumerate(chosen):
+            out[:, :, :, m] = per_track[tid].transpose(2, 0, 1)
+        return out
+
+def load_sequence(path: str, dtype=None) -> PoseSequence:
+    """
+    kps_store 디렉터리, 또는 프레임 리스트 / {"instance_info": [...]} JSON 을 읽는다.
+    dtype=None 이면 원본 정밀도 (스토어 float32, JSON float64 — 출력 텍스트가 기존과 같음).
+    JSON 은 json2_shiftgcn.extract_frames 와 같이 frame_id 기준 안정 정렬만 하고 인스턴스는 거르지 않는다
+    (convert_4bot 의 bbox/min_score 규칙이 필요하면 PoseSequence.from_results).
+    """
+    if is_store_dir(path):
+        return PoseSequence.from_store(path, dtype=dtype or np.float32)
+    dtype = dtype or np.float64
+    obj = fastjson.load_frames(path)
+    if isinstance(obj, dict) and "instance_info" in obj:
+        obj = obj["instance_info"]
+    elif not isinstance(obj, list):
+        raise ValueError("Unsupported JSON root structure. Expect a list of frames or dict with 'instance_info'.")
+    return PoseSequence.from_frames(sorted(obj, key=lambda fr: fr.get("frame_id", 0)), dtype=dtype)
@@ -9,10 +9,12 @@ set -uo pipefail
 JSON_PLUS="python json_plus_track.py"       # json_plus_track.py 실행 커맨드
 TRACK_ROOT="/root/dhyee/output_tracking"    # *_botsort.txt가 들어 있는 상위 폴더 (<ID> 하위에 존재)
 RTM_ROOT="/root/dhyee/output_rtm"           # <ID>/<ID>_4shift.json 등 키포인트 JSON이 있는 상위 폴더
-OUT_ROOT="/root/dhyee/output_tracking"      # 최종 출력 JSON 저장 폴더(예: /root/dhyee/output_tracking/<ID>_botsort.json)
+OUT_ROOT="/root/dhyee/output_tracking"      # 최종 출력 저장 폴더(예: /root/dhyee/output_tracking/<ID>/<ID>_botsort.kps)
+FORMAT="store"                              # store(컬럼형 .npy 스토어 디렉터리) | json(기존 JSON)
 
 MIN_IOU="0.05"
 USE_CENTER="--use_center_fallback"          # 빼고 싶으면 빈 문자열로
+MATCHER="hungarian"                         # greedy(기존) | hungarian(프레임별 최적 할당)
 
 # 2) 보조 함수: ID에 해당하는 keypoint JSON 찾기
 find_key_json() {
@@ -44,8 +46,12 @@ while IFS= read -r -d '' BOTSORT_TXT; do
     continue
   }
 
-  # 출력 경로 (예시: /root/dhyee/output_tracking/2247456_botsort.json)
-  OUT_JSON="$OUT_ROOT/${id}/${id}_botsort.json"
+  # 출력 경로 (예시: /root/dhyee/output_tracking/2247456/2247456_botsort.kps)
+  if [[ "$FORMAT" == "json" ]]; then
+    OUT_JSON="$OUT_ROOT/${id}/${id}_botsort.json"
+  else
+    OUT_JSON="$OUT_ROOT/${id}/${id}_botsort.kps"
+  fi
 
   echo ">>> JSON Merge 실행: ID=$id"
   echo "    botsort: $BOTSORT_TXT"
@@ -58,6 +64,8 @@ while IFS= read -r -d '' BOTSORT_TXT; do
     --keypoint "$KEY_JSON" \
     --out "$OUT_JSON" \
     --min_iou "$MIN_IOU" \
+    --matcher "$MATCHER" \
+    --format "$FORMAT" \
     $USE_CENTER \
     || { echo "실패: ID=$id (계속 진행)"; continue; }
 
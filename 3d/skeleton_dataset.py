@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memory-mapped reader for the skeleton arrays written by json2_shiftgcn.
+
+Two layouts in one directory, picked by which files exist for NAME:
+
+  fixed  (--export-tensor NAME [--window T])
+    NAME_data_joint.npy   (N, 3, T, V, M) float32
+    NAME_label.pkl        (sample_names, labels)
+  ragged (--export-sequences NAME)
+    NAME_seq_joint.npy    (total_frames, V, 3) float32
+    NAME_seq_offsets.npy  (N+1,) int64, sample i = rows [offsets[i], offsets[i+1])
+    NAME_seq_label.pkl    (older exports: NAME_label.pkl)
+
+When both layouts exist for NAME, pass layout="fixed" or layout="ragged".
+
+Arrays are opened with np.load(mmap_mode='r'), so sample i is an O(1) slice of the page
+cache and the corpus never has to fit in RAM. The dataset holds only paths when pickled:
+each DataLoader worker reopens the maps on first access and shares the OS pages instead
+of receiving a copy of the data.
+
+    ds = SkeletonDataset("/root/dhyee/shiftgcn_data", "train")
+    data, label, i = ds[i]          # Shift-GCN Feeder order; data (3,T,V,M)
+    ds = SkeletonDataset(dir, "seqs", max_frames=300)   # ragged -> crop/zero-pad to (3,300,V,1)
+
+Any object with __len__/__getitem__ works as a torch Dataset, so it can be handed to
+torch.utils.data.DataLoader directly; torch is not needed to use it.
+"""
+
+import os
+import pickle
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+def dataset_layout(root: str, name: str) -> str:
+    """"fixed" | "ragged" (없으면 FileNotFoundError, 둘 다 있으면 ValueError)"""
+    ragged = os.path.isfile(os.path.join(root, f"{name}_seq_joint.npy"))
+    fixed = os.path.isfile(os.path.join(root, f"{name}_data_joint.npy"))
+    if ragged and fixed:
+        raise ValueError(f"Both {name}_data_joint.npy and {name}_seq_joint.npy in {root}; pass layout=")
+    if ragged:
+        return "ragged"
+    if fixed:
+        return "fixed"
+    raise FileNotFoundError(f"No {name}_data_joint.npy or {name}_seq_joint.npy in {root}")
+
+def label_path(root: str, name: str, layout: str) -> str:
+    if layout == "ragged":
+        path = os.path.join(root, f"{name}_seq_label.pkl")
+        if os.path.isfile(path) or not os.path.isfile(os.path.join(root, f"{name}_label.pkl")):
+            return path
+        # 예전 --export-sequences 출력은 NAME_label.pkl 을 썼다 (윈도우 export 와 같은 이름)
+    return os.path.join(root, f"{name}_label.pkl")
+
+class SkeletonDataset:
+    def __init__(self, root: str, name: str, max_frames: Optional[int] = None, copy: bool = True,
+                 layout: Optional[str] = None):
+        """
+        max_frames: ragged 샘플을 (3,max_frames,V,1) 로 자르거나 0 패딩 (None 이면 (F,V,3) 그대로)
+        copy: True 면 샘플을 복사해서 반환 (False 면 memmap view)
+        layout: "fixed" | "ragged" (None 이면 있는 파일로 판단)
+        """
+        if layout not in (None, "fixed", "ragged"):
+            raise ValueError(f"layout must be 'fixed' or 'ragged': {layout}")
+        self.root = root
+        self.name = name
+        self.layout = layout or dataset_layout(root, name)
+        self.max_frames = max_frames
+        self.copy = copy
+        with open(label_path(root, name, self.layout), "rb") as f:
+            self.sample_names, labels = pickle.load(f)
+        self.labels = np.asarray(labels, dtype=np.int64)
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+        n = len(self._open()["data"]) if self.layout == "fixed" else len(self._open()["offsets"]) - 1
+        if n != len(self.labels):
+            raise ValueError(f"{name}: {n} samples but {len(self.labels)} labels")
+
+    def _open(self) -> Dict[str, np.ndarray]:
+        if self._arrays is None:
+            if self.layout == "fixed":
+                self._arrays = {"data": np.load(os.path.join(self.root, f"{self.name}_data_joint.npy"), mmap_mode="r")}
+            else:
+                self._arrays = {
+                    "data": np.load(os.path.join(self.root, f"{self.name}_seq_joint.npy"), mmap_mode="r"),
+                    # offsets 는 작으므로 메모리에 올린다 (인덱싱마다 페이지 접근 방지)
+                    "offsets": np.load(os.path.join(self.root, f"{self.name}_seq_offsets.npy")),
+                }
+        return self._arrays
+
+    # pickle 시 memmap 은 빼고 경로만 보낸다 (워커에서 다시 연다)
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_arrays"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def sample_length(self, i: int) -> int:
+        """샘플 i 의 프레임 수 (fixed 는 T)"""
+        a = self._open()
+        if self.layout == "fixed":
+            return a["data"].shape[2]
+        return int(a["offsets"][i + 1] - a["offsets"][i])
+
+    def get(self, i: int) -> np.ndarray:
+        a = self._open()
+        if self.layout == "fixed":
+            x = a["data"][i]
+        else:
+            x = a["data"][a["offsets"][i]:a["offsets"][i + 1]]           # (F,V,3)
+            if self.max_frames is not None:
+                out = np.zeros((3, self.max_frames, x.shape[1], 1), dtype=np.float32)
+                n = min(self.max_frames, len(x))
+                out[:, :n, :, 0] = x[:n].transpose(2, 0, 1)
+                return out
+        return np.array(x) if self.copy else x
+
+    def __getitem__(self, i: int) -> Tuple[np.ndarray, int, int]:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.get(i), int(self.labels[i]), i
+
+    def names(self) -> List[str]:
+        return list(self.sample_names)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 3d/ 의 스크립트들은 패키지가 아니라 서로 형제 모듈로 import 한다
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
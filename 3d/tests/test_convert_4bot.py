@@ -0,0 +1,82 @@
+import io
+import json
+import os
+
+import pytest
+
+from convert_4bot import _InstanceInfoScanner, convert, iter_frames
+from convert_4bot_batch import output_paths, shared_dirs
+
+DOC = {
+    "meta_info": {"dataset_name": "coco", "skeleton_links": [[0, 1], [1, 2]], "note": "a \"quoted\" ]}, 값"},
+    "instance_info": [
+        {"frame_id": 1, "instances": [{"bbox": [[1.5, 2.25, 3e2, -4.125e-1]], "bbox_score": 0.98765,
+                                       "keypoints": [[0.1, -2, 3.000001]], "name": "p\\u00e9 \\n ]"}]},
+        {"frame_id": 2, "instances": []},
+        {"frame_id": 12345, "instances": [{"bbox": [0, 0, 1, 1], "flag": True, "x": None}]},
+    ],
+    "tail": [1, 2, 3],
+}
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_scanner_matches_json_load_at_every_chunk_size(indent):
+    text = json.dumps(DOC, indent=indent, ensure_ascii=False)
+    for chunk_size in list(range(1, 40)) + [len(text), 1 << 20]:
+        frames = list(_InstanceInfoScanner(io.StringIO(text), chunk_size))
+        assert frames == DOC["instance_info"], chunk_size
+
+def test_scanner_bare_values_cut_at_chunk_end():
+    # 객체 밖의 숫자/리터럴은 버퍼 끝에서 잘려도 raw_decode 가 성공하므로 더 읽어 봐야 한다
+    text = '{"count": 123456789, "ok": true, "instance_info": [123456789, -0.125e+3, null, {"frame_id": 7}]}'
+    for chunk_size in range(1, len(text) + 1):
+        assert list(_InstanceInfoScanner(io.StringIO(text), chunk_size)) == [123456789, -125.0, None, {"frame_id": 7}]
+
+@pytest.mark.parametrize("text", ['[{"frame_id": 1}]', '{"instance_info": [{"frame_id": 1}'])
+def test_scanner_rejects_malformed(text):
+    with pytest.raises(ValueError):
+        list(_InstanceInfoScanner(io.StringIO(text), 4))
+
+def _results(path, fids):
+    inst = {"bbox": [0, 0, 10, 10], "bbox_score": 0.9, "keypoints": [[1, 2, 3]], "keypoint_scores": [0.5]}
+    path.write_text(json.dumps({"meta_info": {}, "instance_info": [
+        {"frame_id": f, "instances": [inst]} for f in fids]}))
+    return str(path)
+
+def test_stream_merges_consecutive_frames_like_full_load(tmp_path):
+    path = _results(tmp_path / "r.json", [1, 2, 2, 5])
+    full = [(fid, len(x)) for fid, x, _ in iter_frames(path)]
+    assert [(fid, len(x)) for fid, x, _ in iter_frames(path, stream=True)] == full == [(1, 1), (2, 2), (5, 1)]
+
+@pytest.mark.parametrize("fids", [[2, 1, 2], [1, 3, 2]])
+def test_stream_rejects_unsorted_frame_ids(tmp_path, fids):
+    path = _results(tmp_path / "r.json", fids)
+    assert [fid for fid, _, _ in iter_frames(path)] == sorted(set(fids))
+    with pytest.raises(ValueError, match="without --stream"):
+        list(iter_frames(path, stream=True))
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_failed_store_conversion_leaves_no_raw_files(tmp_path, stream):
+    bad = {"bbox": [0, 0, 10, 10], "bbox_score": 0.9, "keypoints": [[1, 2]], "keypoint_scores": [0.5]}
+    path = _results(tmp_path / "r.json", [1, 2])
+    doc = json.loads((tmp_path / "r.json").read_text())
+    doc["instance_info"][1]["instances"] = [bad]
+    (tmp_path / "r.json").write_text(json.dumps(doc))
+
+    store_dir = tmp_path / "dets_kps_store"
+    with pytest.raises(ValueError):
+        convert(path, str(tmp_path / "b.json"), str(tmp_path / "npy"), str(tmp_path / "k.json"),
+                str(tmp_path / "npz"), stream=stream, out_format="store", out_store_dir=str(store_dir))
+    assert list(store_dir.iterdir()) == []
+    assert not (tmp_path / "b.json").exists() and not (tmp_path / "k.json").exists()
+
+def test_batch_inputs_sharing_a_folder_get_their_own_array_dirs(tmp_path):
+    inputs = [str(tmp_path / "a" / "results_x.json"), str(tmp_path / "a" / "results_y.json"),
+              str(tmp_path / "b" / "results_z.json")]
+    shared = shared_dirs(inputs)
+    assert shared == {str(tmp_path / "a")}
+
+    x, y, z = (output_paths(p, os.path.dirname(p) in shared) for p in inputs)
+    for key in ("out_npy_dir", "out_npz_dir", "out_store_dir"):
+        assert x[key] != y[key]
+    assert z["out_store_dir"] == str(tmp_path / "b" / "dets_kps_store")
+    assert x["out_store_dir"] == str(tmp_path / "a" / "x_dets_kps_store")
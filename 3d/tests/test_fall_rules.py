@@ -0,0 +1,50 @@
+import argparse
+import json
+import sys
+
+import numpy as np
+import pytest
+
+import fall_rules
+from fall_rules import MIN_JOINTS, FallRules
+from fall_service import FallService, add_detection_args
+
+def _args(*argv):
+    ap = argparse.ArgumentParser()
+    add_detection_args(ap)
+    return ap.parse_args(list(argv))
+
+def test_service_rejects_too_few_joints_at_startup():
+    with pytest.raises(ValueError, match="joints=10"):
+        FallService(_args("--gate", "rules", "--joints", "10"), classifier=None, events_out=None)
+    FallService(_args("--joints", "10"), classifier=None, events_out=None)   # 규칙 게이트 없으면 허용
+
+def test_features_reject_too_few_joints():
+    n = 4
+    with pytest.raises(ValueError, match=f"< {MIN_JOINTS}"):
+        FallRules().features(np.zeros(n), np.arange(n), np.zeros((n, MIN_JOINTS - 1, 3)), np.zeros((n, 4)))
+    feats = FallRules().features(np.zeros(n), np.arange(n), np.zeros((n, MIN_JOINTS, 3)), np.zeros((n, 4)))
+    assert len(feats["hip_vel"]) == n
+
+def test_cli_passes_joints_to_loader(tmp_path, monkeypatch, capsys):
+    kps = np.zeros((26, 3)).tolist()
+    path = tmp_path / "tracked.json"
+    path.write_text(json.dumps([{"frame_id": f, "instances": [{"track_id": 1, "bbox": [0, 0, 10, 20], "keypoints": kps}]}
+                                for f in range(3)]))
+    seen = []
+
+    def _load(p, joints=17):
+        rows = load(p, joints=joints)
+        seen.append(rows[2].shape)
+        return rows
+
+    load = fall_rules.load_tracked_rows
+    monkeypatch.setattr(fall_rules, "load_tracked_rows", _load)
+    monkeypatch.setattr(sys, "argv", ["fall_rules.py", "--input", str(path), "--joints", "26"])
+    fall_rules.main()
+    assert seen == [(3, 26, 3)]
+
+    monkeypatch.setattr(sys, "argv", ["fall_rules.py", "--input", str(path), "--joints", "10"])
+    with pytest.raises(SystemExit):
+        fall_rules.main()
+    assert "joints=10" in capsys.readouterr().err
@@ -0,0 +1,37 @@
+import argparse
+import io
+
+import pytest
+
+from fall_service import FallService, add_detection_args
+
+A, B = [0, 0, 10, 10], [500, 500, 510, 510]
+FRAMES = [
+    {"frame_id": 1, "instances": [{"track_id": 1, "bbox": A}]},
+    {"frame_id": 2, "instances": [{"bbox": B}, {"track_id": 1, "bbox": A}]},
+]
+
+def _service(*argv):
+    ap = argparse.ArgumentParser()
+    add_detection_args(ap)
+    return FallService(ap.parse_args(list(argv)), classifier=None, events_out=io.StringIO())
+
+@pytest.mark.parametrize("mode", ["auto", "input"])
+def test_input_ids_reject_frames_without_track_id(mode):
+    svc = _service("--track-ids", mode)
+    assert svc.process(0.0, FRAMES[0])[0] == [1]
+    with pytest.raises(ValueError, match="without track_id"):
+        svc.process(0.0, FRAMES[1])
+    assert svc.buffers.window(1)["bboxes"].tolist() == [A]    # 다른 사람의 bbox 가 섞이지 않는다
+
+def test_tracker_ids_ignore_input_ids():
+    svc = _service("--track-ids", "tracker")
+    for fr in FRAMES:
+        svc.process(0.0, fr)
+    for tid in svc.buffers.track_ids():
+        boxes = svc.buffers.window(tid)["bboxes"].tolist()
+        assert boxes in ([A, A], [B])
+
+def test_auto_rejects_mixed_first_frame():
+    with pytest.raises(ValueError, match="only some instances"):
+        _service().process(0.0, FRAMES[1])
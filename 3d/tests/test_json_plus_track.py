@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import json_plus_track
+from json_plus_track import write_tracked_store
+from kps_store import open_store, store_to_frames
+
+def _inst(**kw):
+    return {"score": 0.8, "keypoints": [[1.0, 2.0, 3.0]] * 2, "keypoint_scores": [0.5, 0.5], **kw}
+
+def test_store_keeps_instances_without_bbox(tmp_path):
+    frames = [
+        {"frame_id": 3, "instances": [_inst(bbox=[0, 0, 10, 10], track_id=2),
+                                      _inst(track_id=-1),
+                                      _inst(bbox=[[0, 0, 5, 5]], track_id=-1),
+                                      _inst(bbox=[5, 5, 20, 20], track_id=3)]},
+    ]
+    write_tracked_store(frames, str(tmp_path / "t.kps"))
+    store = open_store(str(tmp_path / "t.kps"))
+    fr = store.frame(0)
+    assert fr["track_ids"].tolist() == [2, -1, -1, 3]
+    assert np.isnan(fr["bboxes_xyxy5"][1:3, :4]).all()
+
+    back = store_to_frames(store)[0]["instances"]
+    assert ["bbox" in i for i in back] == [True, False, False, True]
+    assert [i["track_id"] for i in back] == [2, -1, -1, 3]
+
+def _brute_force_cost(cost):
+    from itertools import permutations
+    n, m = cost.shape
+    if n <= m:
+        return min(cost[np.arange(n), list(p)].sum() for p in permutations(range(m), n))
+    return min(cost[list(p), np.arange(m)].sum() for p in permutations(range(n), m))
+
+@pytest.mark.parametrize("shape", [(1, 1), (1, 4), (3, 3), (3, 5), (5, 3), (4, 6), (6, 4)])
+def test_builtin_assignment_is_optimal(monkeypatch, shape):
+    monkeypatch.setattr(json_plus_track, "_scipy_lsa", None)   # 내장 JV 경로 강제
+    rng = np.random.default_rng(shape[0] * 10 + shape[1])
+    for trial in range(20):
+        cost = rng.random(shape) if trial % 2 else rng.integers(0, 3, shape).astype(float)   # 동점 포함
+        rows, cols = json_plus_track.linear_assignment(cost)
+        assert len(rows) == min(shape)
+        assert len(set(rows.tolist())) == len(rows) and len(set(cols.tolist())) == len(cols)
+        assert rows.tolist() == sorted(rows.tolist())
+        assert cost[rows, cols].sum() == pytest.approx(_brute_force_cost(cost))
+
+def test_assignment_empty():
+    rows, cols = json_plus_track.linear_assignment(np.zeros((0, 3)))
+    assert len(rows) == len(cols) == 0
@@ -0,0 +1,34 @@
+import argparse
+import io
+import threading
+
+from fall_service import add_detection_args
+from multicam_fusion import run_fusion
+
+def _args(*argv):
+    ap = argparse.ArgumentParser()
+    add_detection_args(ap)
+    args = ap.parse_args(["--gate", "rules", *argv])
+    args.no_follow = False
+    args.queue_size, args.sync_timeout = 16, 0.05
+    args.handoff_window, args.min_pose_sim, args.dedup_window = 2.0, 0.3, 5.0
+    return args
+
+def test_dead_camera_fails_without_waiting_for_live_cameras(tmp_path):
+    live = tmp_path / "live.jsonl"
+    live.write_text('{"frame_id": 1, "instances": []}\n')
+    cameras = [{"name": "dead", "source": str(tmp_path / "missing.json")},
+               {"name": "live", "source": str(live)}]   # tail 하므로 스스로 끝나지 않는다
+    result = {}
+
+    def _run():
+        try:
+            run_fusion(_args(), cameras, io.StringIO())
+        except RuntimeError as e:
+            result["error"] = str(e)
+
+    t = threading.Thread(target=_run, daemon=True)
+    t.start()
+    t.join(timeout=10)
+    assert not t.is_alive(), "run_fusion waited for the live camera"
+    assert result["error"].startswith("camera dead:")
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from json2_shiftgcn import frames_to_tensor, iter_skeleton_chunks, track_sequences
+from pose_sequence import PoseSequence, load_sequence
+
+V = 4
+
+def _inst(tid, kps, **extra):
+    return {"track_id": tid, "bbox": [0, 0, 10, 20], "score": 0.9, "keypoints": kps, **extra}
+
+def _kps(seed):
+    return np.random.default_rng(seed).normal(size=(V, 3)).round(3).tolist()
+
+EMPTY_INPUTS = {
+    "no_frames": ([], "0\n"),
+    "no_instances": ([{"frame_id": 0, "instances": []}, {"frame_id": 1, "instances": []}], "2\n0\n0\n"),
+}
+
+@pytest.mark.parametrize("frames,text", EMPTY_INPUTS.values(), ids=EMPTY_INPUTS.keys())
+@pytest.mark.parametrize("require_nonzero", [False, True])
+def test_empty_input(frames, text, require_nonzero):
+    seq = PoseSequence.from_frames(frames, dtype=np.float64)
+    assert len(seq) == 0
+    assert "".join(seq.skeleton_chunks(V, require_nonzero)) == text
+    assert seq.track_sequences(V, require_nonzero) == {}
+    assert not seq.to_tensor(V, 8, 2, require_nonzero).any()
+
+def test_empty_json_file(tmp_path):
+    p = tmp_path / "empty.json"
+    p.write_text("[]")
+    seq = load_sequence(str(p))
+    assert "".join(seq.skeleton_chunks(V, require_nonzero=True)) == "0\n"
+
+ZERO = [[0, 0, 0]] * 2
+FRAMES = [
+    {"frame_id": 0, "instances": [_inst(2, [[1, 2, 3], [4, 5, 6]]), _inst(1, [[0.5, 0, 0], [0, 0, 0.25]])]},
+    {"frame_id": 1, "instances": [_inst(2, ZERO)]},
+    {"frame_id": 2, "instances": []},
+    # track_id 없는 인스턴스는 프레임 안 순서 (1) -> 뒤의 track 1 이 덮어쓴다
+    {"frame_id": 3, "instances": [{"bbox": [0, 0, 1, 1], "keypoints": [[7, 8, 9], [1, 1, 1]]},
+                                  _inst(1, [[2, 2, 2], [3, 3, 3]])]},
+]
+
+@pytest.mark.parametrize("require_nonzero", [False, True])
+def test_skeleton_text(require_nonzero):
+    frame1 = "0\n" if require_nonzero else "1\n2\n2\n0.0 0.0 0.0\n0.0 0.0 0.0\n"
+    want = ("4\n"
+            "2\n1\n2\n0.5 0.0 0.0\n0.0 0.0 0.25\n2\n2\n1.0 2.0 3.0\n4.0 5.0 6.0\n"
+            + frame1 +
+            "0\n"
+            "1\n1\n2\n2.0 2.0 2.0\n3.0 3.0 3.0\n")
+    assert "".join(PoseSequence.from_frames(FRAMES, dtype=np.float64).skeleton_chunks(2, require_nonzero)) == want
+    assert "".join(iter_skeleton_chunks(FRAMES, 2, require_nonzero)) == want
+
+@pytest.mark.parametrize("require_nonzero", [False, True])
+def test_track_sequences(require_nonzero):
+    for got in (PoseSequence.from_frames(FRAMES).track_sequences(2, require_nonzero),
+                track_sequences(FRAMES, 2, require_nonzero)):
+        assert sorted(got) == [1, 2]
+        first, seq, present = got[1]
+        assert first == 0 and present.tolist() == [True, False, False, True]
+        np.testing.assert_array_equal(seq[[0, 3]], [[[0.5, 0, 0], [0, 0, 0.25]], [[2, 2, 2], [3, 3, 3]]])
+        assert not seq[1:3].any()
+        first, seq, present = got[2]
+        assert first == 0 and present.tolist() == ([True] if require_nonzero else [True, True])
+        np.testing.assert_array_equal(seq[0], [[1, 2, 3], [4, 5, 6]])
+
+def test_tensor_keeps_bodies_by_motion_energy():
+    want = np.zeros((3, 4, 2, 1), dtype=np.float32)
+    want[:, 0, :, 0] = np.array([[1, 2, 3], [4, 5, 6]]).T                 # track 2 가 움직임이 더 크다
+    np.testing.assert_array_equal(PoseSequence.from_frames(FRAMES).to_tensor(2, 4, 1), want)
+    np.testing.assert_array_equal(frames_to_tensor(FRAMES, 2, 4, 1), want)
+
+    both = frames_to_tensor(FRAMES, 2, 2, 2)                              # 처음 2 프레임만
+    np.testing.assert_array_equal(both[:, 0, :, 1], np.array([[0.5, 0, 0], [0, 0, 0.25]]).T)
+
+def test_wrong_joint_count_raises():
+    with pytest.raises(ValueError, match="!= --joints 3"):
+        list(iter_skeleton_chunks(FRAMES, 3))
+
+def test_frames_round_trip():
+    frames = [{"frame_id": 5, "instances": [_inst(3, _kps(4), keypoint_scores=[0.5] * V)]}]
+    back = PoseSequence.from_frames(frames, dtype=np.float64).to_frames()
+    assert [f["frame_id"] for f in back] == [5]
+    inst = back[0]["instances"][0]
+    assert inst["track_id"] == 3
+    np.testing.assert_allclose(inst["keypoints"], frames[0]["instances"][0]["keypoints"])
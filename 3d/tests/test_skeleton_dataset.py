@@ -0,0 +1,40 @@
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from json2_shiftgcn import export_sequences, export_windows
+from skeleton_dataset import SkeletonDataset
+
+V = 4
+
+def _write_input(path, frames=12):
+    rng = np.random.default_rng(0)
+    data = [{"frame_id": f, "instances": [
+                {"track_id": tid, "bbox": [0, 0, 1, 1], "keypoints": rng.normal(size=(V, 3)).tolist()}
+                for tid in (1, 2)]}
+            for f in range(frames)]
+    path.write_text(json.dumps(data))
+    return path
+
+def test_windows_and_sequences_share_outdir(tmp_path):
+    fp = _write_input(tmp_path / "a.json")
+    out = tmp_path / "out"
+    out.mkdir()
+    export_windows([fp], out, "train", ["001A001"], label=0, joints=V, window=4, stride=4)
+    export_sequences([fp], out, "train", ["001A001"], label=0, joints=V)
+
+    with (out / "train_label.pkl").open("rb") as f:
+        win_names, _ = pickle.load(f)
+    assert win_names[0] == "001A001_t1_f000000" and len(win_names) == 6
+    assert np.load(out / "train_index.npy").shape == (6, 3)
+    assert np.load(out / "train_seq_index.npy").shape == (2, 3)
+
+    with pytest.raises(ValueError, match="layout"):
+        SkeletonDataset(str(out), "train")
+    win = SkeletonDataset(str(out), "train", layout="fixed")
+    seq = SkeletonDataset(str(out), "train", layout="ragged")
+    assert len(win) == 6 and win[0][0].shape == (3, 4, V, 1)
+    assert seq.names() == ["001A001_t1", "001A001_t2"] and seq.sample_length(0) == 12
+    np.testing.assert_array_equal(win[0][0][:, :, :, 0], seq[0][0][:4].transpose(2, 0, 1))
@@ -0,0 +1,86 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from track_buffer import TrackRingBuffer
+
+T, V = 5, 3
+
+def _kps(frame_id, tid):
+    return np.full((V, 3), frame_id * 10 + tid, dtype=np.float32)
+
+class NaiveBuffer:
+    """기준 구현: 트랙마다 deque(maxlen=T)"""
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self.frames = {}
+        self.last_seen = {}
+
+    def append(self, frame_id, tid):
+        self.frames.setdefault(tid, deque(maxlen=T)).append(frame_id)
+        self.last_seen[tid] = frame_id
+
+    def evict(self, frame_id):
+        old = [t for t, f in self.last_seen.items() if frame_id - f > self.max_age]
+        for t in old:
+            del self.frames[t], self.last_seen[t]
+        return old
+
+def _check(buf, ref):
+    assert sorted(buf.track_ids()) == sorted(ref.frames)
+    for tid, frames in ref.frames.items():
+        w = buf.window(tid)
+        assert w["frame_ids"].tolist() == list(frames)
+        np.testing.assert_array_equal(w["keypoints"], np.stack([_kps(f, tid) for f in frames]))
+        np.testing.assert_array_equal(w["bboxes"][:, 0], np.asarray(frames, dtype=np.float32))
+    full = [t for t, fr in ref.frames.items() if len(fr) == T]
+    assert sorted(buf.full_tracks()) == sorted(full)
+    if full:
+        kps, boxes = buf.windows(full)
+        fids = buf.window_frame_ids(full)
+        for b, tid in enumerate(full):
+            assert fids[b].tolist() == list(ref.frames[tid])
+            np.testing.assert_array_equal(kps[b], buf.window(tid)["keypoints"])
+            np.testing.assert_array_equal(boxes[b], buf.window(tid)["bboxes"])
+
+def test_matches_naive_deque_across_wraparound_and_growth():
+    rng = np.random.default_rng(0)
+    buf = TrackRingBuffer(T, V, max_tracks=2, max_age=4)   # 슬롯 2개 -> 트랙이 늘면 _grow
+    ref = NaiveBuffer(max_age=4)
+    for frame_id in range(60):
+        for tid in rng.choice(6, size=rng.integers(0, 5), replace=False).tolist():
+            buf.append(frame_id, tid, _kps(frame_id, tid), bbox=[frame_id, 0, 1, 1])
+            ref.append(frame_id, tid)
+        assert sorted(buf.evict(frame_id)) == sorted(ref.evict(frame_id))
+        _check(buf, ref)
+
+def test_evicts_only_after_max_age():
+    buf = TrackRingBuffer(T, V, max_age=3)
+    buf.append(10, 7, _kps(10, 7))
+    assert buf.evict(13) == []          # 정확히 max_age 프레임 동안은 유지
+    assert buf.evict(14) == [7]
+    assert 7 not in buf and buf.frames_stored(7) == 0
+
+def test_append_after_eviction_starts_empty():
+    buf = TrackRingBuffer(T, V, max_tracks=1, max_age=2)
+    for f in range(T + 2):
+        buf.append(f, 1, _kps(f, 1))
+    assert buf.is_full(1)
+    buf.evict(T + 10)
+    buf.append(T + 10, 1, _kps(T + 10, 1))                # 같은 슬롯을 다시 쓴다
+    w = buf.window(1)
+    assert buf.frames_stored(1) == 1 and not buf.is_full(1)
+    assert w["frame_ids"].tolist() == [T + 10]
+    np.testing.assert_array_equal(w["keypoints"][0], _kps(T + 10, 1))
+
+def test_joints_are_cut_or_zero_padded():
+    buf = TrackRingBuffer(T, V)
+    buf.append(0, 1, np.ones((V + 2, 3)), scores=np.ones(V - 1))
+    w = buf.window(1)
+    assert w["keypoints"].shape == (1, V, 3) and w["keypoints"].all()
+    assert w["scores"][0].tolist() == [1.0] * (V - 1) + [0.0]
+
+def test_rejects_empty_window():
+    with pytest.raises(ValueError):
+        TrackRingBuffer(0, V)
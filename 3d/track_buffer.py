@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-track ring buffer of the last T frames of skeletons (online inference / windowed data).
+
+Storage is preallocated per slot (one slot per live track):
+  keypoints  (S, 2T, V, 3) float32
+  scores     (S, 2T, V)    float32
+  bboxes     (S, 2T, 4)    float32
+  frame_ids  (S, 2T)       int64
+
+Every frame is written twice, at i and i+T (i = write position mod T), so the last T
+frames of a track are always the contiguous range [i+1, i+1+T) and window() returns
+views into the buffer without copying. Appending is O(1); the slot table doubles when
+more tracks are live than slots. Tracks not seen for more than max_age frames are
+freed by evict().
+
+    buf = TrackRingBuffer(window=30, joints=17, max_age=30)
+    buf.append(frame_id, track_id, keypoints, scores, bbox)
+    if buf.is_full(track_id):
+        w = buf.window(track_id)          # {"keypoints": (T,V,3), ...} zero-copy views
+    kps, boxes = buf.windows(ready_ids)   # (B,T,V,3), (B,T,4) batched copies
+    buf.evict(frame_id)
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+class TrackRingBuffer:
+    def __init__(self, window: int, joints: int, max_tracks: int = 16, max_age: int = 30):
+        if window < 1 or joints < 1:
+            raise ValueError("window and joints must be >= 1")
+        self.T = window
+        self.joints = joints
+        self.max_age = max_age
+        S, T2 = max(1, max_tracks), 2 * window
+        self.keypoints = np.zeros((S, T2, joints, 3), dtype=np.float32)
+        self.scores = np.zeros((S, T2, joints), dtype=np.float32)
+        self.bboxes = np.zeros((S, T2, 4), dtype=np.float32)
+        self.frame_ids = np.full((S, T2), -1, dtype=np.int64)
+        self.pos = np.zeros(S, dtype=np.int64)      # 다음 쓰기 위치 (mod T)
+        self.count = np.zeros(S, dtype=np.int64)    # 저장된 프레임 수 (최대 T)
+        self.last_seen = np.zeros(S, dtype=np.int64)
+        self.slot_of: Dict[int, int] = {}
+        self.free: List[int] = list(range(S - 1, -1, -1))
+
+    # ----- 슬롯 관리 -----
+    def _grow(self) -> None:
+        S = len(self.pos)
+        for name in ("keypoints", "scores", "bboxes", "frame_ids", "pos", "count", "last_seen"):
+            a = getattr(self, name)
+            grown = np.zeros((2 * S,) + a.shape[1:], dtype=a.dtype)
+            grown[:S] = a
+            setattr(self, name, grown)
+        self.frame_ids[S:] = -1
+        self.free.extend(range(2 * S - 1, S - 1, -1))
+
+    def _slot(self, track_id: int) -> int:
+        s = self.slot_of.get(track_id)
+        if s is None:
+            if not self.free:
+                self._grow()
+            s = self.free.pop()
+            self.slot_of[track_id] = s
+            self.pos[s] = 0
+            self.count[s] = 0
+        return s
+
+    def __len__(self) -> int:
+        return len(self.slot_of)
+
+    def __contains__(self, track_id: int) -> bool:
+        return track_id in self.slot_of
+
+    def track_ids(self) -> List[int]:
+        return list(self.slot_of)
+
+    # ----- 쓰기 -----
+    def append(self,
+               frame_id: int,
+               track_id: int,
+               keypoints: np.ndarray,
+               scores: Optional[np.ndarray] = None,
+               bbox: Optional[Sequence[float]] = None) -> None:
+        """keypoints: (V',3) (V 보다 많으면 자르고 모자라면 0), scores: (V',), bbox: xyxy"""
+        s = self._slot(track_id)
+        i = int(self.pos[s])
+        T, V = self.T, self.joints
+        kps = np.asarray(keypoints, dtype=np.float32).reshape(-1, 3)[:V]
+        row = np.zeros((V, 4), dtype=np.float32)     # x,y,z,score 를 한 번에 만들어 두 위치에 복사
+        row[:len(kps), :3] = kps
+        if scores is not None:
+            sc = np.asarray(scores, dtype=np.float32).reshape(-1)[:V]
+            row[:len(sc), 3] = sc
+        t = [i, i + T]
+        self.keypoints[s, t] = row[:, :3]
+        self.scores[s, t] = row[:, 3]
+        self.bboxes[s, t] = 0.0 if bbox is None else np.asarray(bbox, dtype=np.float32)[:4]
+        self.frame_ids[s, t] = frame_id
+        self.pos[s] = (i + 1) % T
+        self.count[s] = min(self.count[s] + 1, T)
+        self.last_seen[s] = frame_id
+
+    def evict(self, frame_id: int) -> List[int]:
+        """frame_id 기준 max_age 프레임 넘게 안 보인 트랙을 비우고 그 track_id 목록을 반환"""
+        old = [tid for tid, s in self.slot_of.items() if frame_id - self.last_seen[s] > self.max_age]
+        for tid in old:
+            self.free.append(self.slot_of.pop(tid))
+        return old
+
+    # ----- 읽기 -----
+    def frames_stored(self, track_id: int) -> int:
+        s = self.slot_of.get(track_id)
+        return 0 if s is None else int(self.count[s])
+
+    def is_full(self, track_id: int) -> bool:
+        return self.frames_stored(track_id) == self.T
+
+    def full_tracks(self) -> List[int]:
+        return [tid for tid, s in self.slot_of.items() if self.count[s] == self.T]
+
+    def window(self, track_id: int) -> Dict[str, np.ndarray]:
+        """최근 min(count,T) 프레임 (오래된 것부터). 버퍼를 가리키는 view 이므로 다음 append 전에 사용/복사."""
+        s = self.slot_of[track_id]
+        end = int(self.pos[s]) + self.T
+        start = end - int(self.count[s])
+        return {"keypoints": self.keypoints[s, start:end],
+                "scores": self.scores[s, start:end],
+                "bboxes": self.bboxes[s, start:end],
+                "frame_ids": self.frame_ids[s, start:end]}
+
+    def windows(self, track_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """꽉 찬 트랙들의 (B,T,V,3) keypoints, (B,T,4) bboxes 를 한 번의 gather 로 복사"""
+        slots = np.asarray([self.slot_of[t] for t in track_ids], dtype=np.int64)
+        rows = slots[:, None]
+        cols = self.pos[slots][:, None] + np.arange(self.T)
+        return self.keypoints[rows, cols], self.bboxes[rows, cols]
+
+    def window_frame_ids(self, track_ids: Sequence[int]) -> np.ndarray:
+        """windows() 와 같은 순서의 (B,T) frame_id"""
+        slots = np.asarray([self.slot_of[t] for t in track_ids], dtype=np.int64)
+        return self.frame_ids[slots[:, None], self.pos[slots][:, None] + np.arange(self.T)]